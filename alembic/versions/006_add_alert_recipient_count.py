@@ -0,0 +1,30 @@
+"""add recipient count to alerts
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('alerts', sa.Column('recipient_count', sa.Integer(), nullable=False, server_default='0'))
+    op.execute("""
+        UPDATE alerts SET recipient_count = counts.n
+        FROM (SELECT alert_id, count(*) AS n FROM notifications WHERE alert_id IS NOT NULL GROUP BY alert_id) AS counts
+        WHERE alerts.id = counts.alert_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('alerts', 'recipient_count')
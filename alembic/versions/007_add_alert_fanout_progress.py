@@ -0,0 +1,44 @@
+"""add fan-out progress and resume cursor to alerts
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Labels are FanoutStatus's values, as Alert.fanout_status stores them (tests/test_alerts.py checks)
+    op.execute("""
+        DO $$ BEGIN
+            CREATE TYPE fanoutstatus AS ENUM ('pending', 'queued', 'running', 'completed');
+        EXCEPTION
+            WHEN duplicate_object THEN null;
+        END $$;
+    """)
+    op.add_column('alerts', sa.Column('recipient_total', sa.Integer(), nullable=True))
+    op.add_column('alerts', sa.Column('fanout_status', postgresql.ENUM('pending', 'queued', 'running', 'completed', name='fanoutstatus', create_type=False), nullable=False, server_default='pending'))
+    op.add_column('alerts', sa.Column('fanout_cursor', sa.Integer(), nullable=False, server_default='0'))
+    # Alerts sent before this migration were fanned out inline
+    op.execute("""
+        UPDATE alerts SET fanout_status = 'completed', recipient_total = recipient_count
+        WHERE sent_at IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('alerts', 'fanout_cursor')
+    op.drop_column('alerts', 'fanout_status')
+    op.drop_column('alerts', 'recipient_total')
+    op.execute('DROP TYPE fanoutstatus')
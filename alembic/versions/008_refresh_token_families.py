@@ -0,0 +1,28 @@
+"""store refresh tokens as HMAC digests with token families
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('refresh_token_family', sa.String(), nullable=True))
+    # Existing bcrypt hashes can't be checked against HMAC digests; users log in again
+    op.execute("UPDATE users SET hashed_refresh_token = NULL")
+
+
+def downgrade() -> None:
+    op.execute("UPDATE users SET hashed_refresh_token = NULL")
+    op.drop_column('users', 'refresh_token_family')
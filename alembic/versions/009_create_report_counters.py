@@ -0,0 +1,43 @@
+"""create report counters
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'report_counters',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.execute("""
+        INSERT INTO report_counters (name, value)
+        SELECT 'total_donors', count(*)
+        FROM donor_profiles JOIN users ON users.id = donor_profiles.user_id
+        WHERE users.status = 'ACTIVE'
+        UNION ALL
+        SELECT 'available_donors', count(*)
+        FROM donor_profiles JOIN users ON users.id = donor_profiles.user_id
+        WHERE users.status = 'ACTIVE' AND donor_profiles.availability = 'available'
+        UNION ALL
+        SELECT 'total_donations', count(*) FROM donations
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('report_counters')
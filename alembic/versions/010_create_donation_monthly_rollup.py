@@ -0,0 +1,43 @@
+"""create donation monthly rollup
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'donation_monthly_rollup',
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('blood_type', postgresql.ENUM(name='bloodtype', create_type=False), nullable=False),
+        sa.Column('location', sa.String(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('units', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('month', 'blood_type', 'location')
+    )
+    op.execute("""
+        INSERT INTO donation_monthly_rollup (month, blood_type, location, count, units)
+        SELECT date_trunc('month', donation_date)::date, blood_type, location, count(*), sum(units)
+        FROM donations
+        GROUP BY 1, 2, 3
+    """)
+    # Partial first/last months of a date filter are counted from donations
+    op.create_index(op.f('ix_donations_donation_date'), 'donations', ['donation_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_donations_donation_date'), table_name='donations')
+    op.drop_table('donation_monthly_rollup')
@@ -0,0 +1,44 @@
+"""composite indexes for the notification inbox
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built concurrently: notifications is the largest table and takes writes from alert fan-out
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_notifications_user_read_created',
+            'notifications',
+            ['user_id', 'is_read', sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_notifications_user_created',
+            'notifications',
+            ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        # Both new indexes lead with user_id
+        op.drop_index('ix_notifications_user_id', table_name='notifications', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_notifications_user_id'), 'notifications', ['user_id'], unique=False)
+    op.drop_index('ix_notifications_user_created', table_name='notifications')
+    op.drop_index('ix_notifications_user_read_created', table_name='notifications')
@@ -0,0 +1,47 @@
+"""create notification inbox state
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '012'
+down_revision: Union[str, None] = '011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'notification_inbox',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('last_read_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('unread_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+    # No watermark yet: existing per-row read flags stay authoritative
+    op.execute("""
+        INSERT INTO notification_inbox (user_id, unread_count)
+        SELECT user_id, count(*) FILTER (WHERE NOT is_read)
+        FROM notifications
+        GROUP BY user_id
+    """)
+
+
+def downgrade() -> None:
+    # Fold watermarks back into per-row flags before dropping them
+    op.execute("""
+        UPDATE notifications SET is_read = true
+        FROM notification_inbox
+        WHERE notification_inbox.user_id = notifications.user_id
+          AND notifications.created_at <= notification_inbox.last_read_at
+          AND NOT notifications.is_read
+    """)
+    op.drop_table('notification_inbox')
@@ -0,0 +1,60 @@
+"""store alert notifications without copies of the alert text
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '013'
+down_revision: Union[str, None] = '012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 50000
+
+
+def upgrade() -> None:
+    op.alter_column('notifications', 'title', existing_type=sa.String(), nullable=True)
+    op.alter_column('notifications', 'message', existing_type=sa.Text(), nullable=True)
+    op.create_check_constraint(
+        'ck_notifications_text_or_alert',
+        'notifications',
+        'alert_id IS NOT NULL OR (title IS NOT NULL AND message IS NOT NULL)',
+    )
+
+    # Batches by id, each committed, so the largest table is never locked
+    # end to end; rows whose text differs from their alert's keep it
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        last_id = bind.execute(sa.text("SELECT coalesce(max(id), 0) FROM notifications")).scalar()
+        for lower in range(0, last_id, BATCH_SIZE):
+            bind.execute(
+                sa.text("""
+                    UPDATE notifications SET title = NULL, message = NULL
+                    FROM alerts
+                    WHERE alerts.id = notifications.alert_id
+                      AND notifications.id > :lower AND notifications.id <= :upper
+                      AND notifications.title = alerts.title
+                      AND notifications.message = alerts.message
+                """),
+                {"lower": lower, "upper": lower + BATCH_SIZE},
+            )
+    # Freed space is reused by new rows after VACUUM; run VACUUM FULL or
+    # pg_repack in a maintenance window to return it to the filesystem
+
+
+def downgrade() -> None:
+    op.execute("""
+        UPDATE notifications SET title = alerts.title, message = alerts.message
+        FROM alerts
+        WHERE alerts.id = notifications.alert_id AND notifications.title IS NULL
+    """)
+    op.drop_constraint('ck_notifications_text_or_alert', 'notifications', type_='check')
+    op.alter_column('notifications', 'message', existing_type=sa.Text(), nullable=False)
+    op.alter_column('notifications', 'title', existing_type=sa.String(), nullable=False)
@@ -0,0 +1,41 @@
+"""pull delivery for broadcast alerts
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = '014'
+down_revision: Union[str, None] = '013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Labels are DeliveryMode's values, as Alert.delivery_mode stores them (tests/test_alerts.py checks)
+    op.execute("""
+        DO $$ BEGIN
+            CREATE TYPE deliverymode AS ENUM ('push', 'pull');
+        EXCEPTION
+            WHEN duplicate_object THEN null;
+        END $$;
+    """)
+    op.add_column('alerts', sa.Column('delivery_mode', postgresql.ENUM('push', 'pull', name='deliverymode', create_type=False), nullable=False, server_default='push'))
+    op.add_column('alerts', sa.Column('pull_seq', sa.Integer(), nullable=True))
+    op.create_unique_constraint('alerts_pull_seq_key', 'alerts', ['pull_seq'])
+    op.add_column('notification_inbox', sa.Column('pulled_seq', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('notification_inbox', 'pulled_seq')
+    op.drop_constraint('alerts_pull_seq_key', 'alerts', type_='unique')
+    op.drop_column('alerts', 'pull_seq')
+    op.drop_column('alerts', 'delivery_mode')
+    op.execute('DROP TYPE deliverymode')
@@ -0,0 +1,107 @@
+"""range-partition notifications by month
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '015'
+down_revision: Union[str, None] = '014'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Matches NOTIFICATION_PARTITIONS_AHEAD's default; the daily task keeps it topped up
+MONTHS_AHEAD = 3
+
+INDEXES = ('ix_notifications_user_read_created', 'ix_notifications_user_created')
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    # Rewrites the table: run in a maintenance window. Index names are
+    # schema-wide, so the old table's are moved aside first
+    op.execute("ALTER TABLE notifications RENAME TO notifications_unpartitioned")
+    op.execute("ALTER TABLE notifications_unpartitioned RENAME CONSTRAINT notifications_pkey TO notifications_unpartitioned_pkey")
+    for index in INDEXES:
+        op.execute(f"ALTER INDEX {index} RENAME TO {index}_unpartitioned")
+    op.execute("ALTER SEQUENCE notifications_id_seq OWNED BY NONE")
+
+    op.execute("""
+        CREATE TABLE notifications (
+            id integer NOT NULL DEFAULT nextval('notifications_id_seq'),
+            user_id integer NOT NULL REFERENCES users (id),
+            title varchar,
+            message text,
+            notification_type notificationtype NOT NULL,
+            is_read boolean NOT NULL DEFAULT false,
+            alert_id integer REFERENCES alerts (id),
+            created_at timestamp with time zone NOT NULL DEFAULT now(),
+            CONSTRAINT notifications_pkey PRIMARY KEY (id, created_at),
+            CONSTRAINT ck_notifications_text_or_alert
+                CHECK (alert_id IS NOT NULL OR (title IS NOT NULL AND message IS NOT NULL))
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("ALTER SEQUENCE notifications_id_seq OWNED BY notifications.id")
+    op.execute("CREATE INDEX ix_notifications_user_read_created ON notifications (user_id, is_read, created_at DESC, id DESC)")
+    op.execute("CREATE INDEX ix_notifications_user_created ON notifications (user_id, created_at DESC, id DESC)")
+
+    bind = op.get_bind()
+    oldest = bind.execute(sa.text(
+        "SELECT (date_trunc('month', min(created_at) AT TIME ZONE 'UTC'))::date FROM notifications_unpartitioned"
+    )).scalar()
+    current = bind.execute(sa.text("SELECT (date_trunc('month', now() AT TIME ZONE 'UTC'))::date")).scalar()
+    month = min(oldest or current, current)
+    while month <= add_months(current, MONTHS_AHEAD):
+        following = add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE notifications_y{month.year:04d}m{month.month:02d} PARTITION OF notifications "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{following.isoformat()} 00:00:00+00')"
+        )
+        month = following
+
+    op.execute("""
+        INSERT INTO notifications (id, user_id, title, message, notification_type, is_read, alert_id, created_at)
+        SELECT id, user_id, title, message, notification_type, is_read, alert_id, coalesce(created_at, now())
+        FROM notifications_unpartitioned
+    """)
+    op.execute("DROP TABLE notifications_unpartitioned")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE notifications RENAME TO notifications_partitioned")
+    op.execute("ALTER TABLE notifications_partitioned RENAME CONSTRAINT notifications_pkey TO notifications_partitioned_pkey")
+    for index in INDEXES:
+        op.execute(f"ALTER INDEX {index} RENAME TO {index}_partitioned")
+    op.execute("ALTER SEQUENCE notifications_id_seq OWNED BY NONE")
+    op.execute("""
+        CREATE TABLE notifications (
+            id integer NOT NULL DEFAULT nextval('notifications_id_seq'),
+            user_id integer NOT NULL REFERENCES users (id),
+            title varchar,
+            message text,
+            notification_type notificationtype NOT NULL,
+            is_read boolean NOT NULL DEFAULT false,
+            alert_id integer REFERENCES alerts (id),
+            created_at timestamp with time zone DEFAULT now(),
+            CONSTRAINT notifications_pkey PRIMARY KEY (id),
+            CONSTRAINT ck_notifications_text_or_alert
+                CHECK (alert_id IS NOT NULL OR (title IS NOT NULL AND message IS NOT NULL))
+        )
+    """)
+    op.execute("ALTER SEQUENCE notifications_id_seq OWNED BY notifications.id")
+    op.execute("INSERT INTO notifications SELECT * FROM notifications_partitioned")
+    # Drops every partition with it
+    op.execute("DROP TABLE notifications_partitioned")
+    op.execute("CREATE INDEX ix_notifications_user_read_created ON notifications (user_id, is_read, created_at DESC, id DESC)")
+    op.execute("CREATE INDEX ix_notifications_user_created ON notifications (user_id, created_at DESC, id DESC)")
@@ -0,0 +1,46 @@
+"""(sort key, id) indexes for keyset-paginated lists
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '016'
+down_revision: Union[str, None] = '015'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ('ix_messages_created', 'messages', 'created_at'),
+    ('ix_donor_registrations_created', 'donor_registrations', 'created_at'),
+    ('ix_donor_profiles_created', 'donor_profiles', 'created_at'),
+    ('ix_alerts_created', 'alerts', 'created_at'),
+    ('ix_blood_requests_created', 'blood_requests', 'created_at'),
+    ('ix_donations_date', 'donations', 'donation_date'),
+)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, column in INDEXES:
+            op.create_index(
+                name,
+                table,
+                [sa.text(f'{column} DESC'), sa.text('id DESC')],
+                unique=False,
+                postgresql_concurrently=True,
+            )
+        # Leads ix_donations_date, which serves the same date ranges
+        op.drop_index('ix_donations_donation_date', table_name='donations', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_donations_donation_date'), 'donations', ['donation_date'], unique=False)
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,36 @@
+"""pg_trgm GIN indexes for donor search
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '017'
+down_revision: Union[str, None] = '016'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        for column in ('full_name', 'contact_number'):
+            op.create_index(
+                f'ix_users_{column}_trgm',
+                'users',
+                [column],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    for column in ('full_name', 'contact_number'):
+        op.drop_index(f'ix_users_{column}_trgm', table_name='users')
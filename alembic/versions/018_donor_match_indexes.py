@@ -0,0 +1,42 @@
+"""Partial indexes on available donors for blood request matching
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '018'
+down_revision: Union[str, None] = '017'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_donor_profiles_available_local',
+            'donor_profiles',
+            ['blood_type', 'municipality', sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_where=sa.text("availability = 'available'"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_donor_profiles_available',
+            'donor_profiles',
+            ['blood_type', sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_where=sa.text("availability = 'available'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_donor_profiles_available', table_name='donor_profiles')
+    op.drop_index('ix_donor_profiles_available_local', table_name='donor_profiles')
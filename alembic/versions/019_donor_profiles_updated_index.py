@@ -0,0 +1,31 @@
+"""donor_profiles.updated_at index for audience snapshot catch-up
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '019'
+down_revision: Union[str, None] = '018'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_donor_profiles_updated',
+            'donor_profiles',
+            ['updated_at'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_donor_profiles_updated', table_name='donor_profiles')
@@ -0,0 +1,32 @@
+"""(donor_profile_id, donation_date) index for audience recency
+
+Revision ID: 020
+Revises: 019
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '020'
+down_revision: Union[str, None] = '019'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_donations_donor_date',
+            'donations',
+            ['donor_profile_id', sa.text('donation_date DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_donations_donor_date', table_name='donations')
@@ -0,0 +1,58 @@
+"""Donation aggregates and eligibility on donor_profiles
+
+Revision ID: 021
+Revises: 020
+Create Date: 2026-10-19 01:00:00.000000
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '021'
+down_revision: Union[str, None] = '020'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same default as settings.donation_deferral_days
+DEFERRAL_DAYS = int(os.getenv('DONATION_DEFERRAL_DAYS', '90'))
+
+
+def upgrade() -> None:
+    op.add_column('donor_profiles', sa.Column('last_donation_date', sa.Date(), nullable=True))
+    op.add_column('donor_profiles', sa.Column('next_eligible_date', sa.Date(), nullable=True))
+    op.add_column('donor_profiles', sa.Column('donation_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('donor_profiles', sa.Column('total_units', sa.Integer(), server_default='0', nullable=False))
+    op.execute(f"""
+        UPDATE donor_profiles AS p
+        SET last_donation_date = d.last_date,
+            next_eligible_date = d.last_date + {DEFERRAL_DAYS},
+            donation_count = d.donations,
+            total_units = d.units
+        FROM (
+            SELECT donor_profile_id, max(donation_date) AS last_date, count(*) AS donations, sum(units) AS units
+            FROM donations
+            GROUP BY donor_profile_id
+        ) AS d
+        WHERE p.id = d.donor_profile_id
+    """)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_donor_profiles_eligible',
+            'donor_profiles',
+            [sa.text('created_at DESC'), sa.text('id DESC'), 'next_eligible_date'],
+            unique=False,
+            postgresql_where=sa.text("availability = 'available'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_donor_profiles_eligible', table_name='donor_profiles')
+    op.drop_column('donor_profiles', 'total_units')
+    op.drop_column('donor_profiles', 'donation_count')
+    op.drop_column('donor_profiles', 'next_eligible_date')
+    op.drop_column('donor_profiles', 'last_donation_date')
@@ -0,0 +1,33 @@
+"""Partial next_eligible_date index for donor availability recovery
+
+Revision ID: 022
+Revises: 021
+Create Date: 2026-10-19 02:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '022'
+down_revision: Union[str, None] = '021'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_donor_profiles_recovery',
+            'donor_profiles',
+            ['next_eligible_date'],
+            unique=False,
+            postgresql_where=sa.text("availability = 'recently_donated'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_donor_profiles_recovery', table_name='donor_profiles')
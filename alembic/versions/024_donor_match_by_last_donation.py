@@ -0,0 +1,52 @@
+"""Order the donor match indexes by last donation instead of registration
+
+Revision ID: 024
+Revises: 023
+Create Date: 2026-10-19 04:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '024'
+down_revision: Union[str, None] = '023'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_match_indexes(order_column: str) -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_donor_profiles_available_local',
+            'donor_profiles',
+            ['blood_type', 'municipality', sa.text(f'{order_column} DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_where=sa.text("availability = 'available'"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_donor_profiles_available',
+            'donor_profiles',
+            ['blood_type', sa.text(f'{order_column} DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_where=sa.text("availability = 'available'"),
+            postgresql_concurrently=True,
+        )
+
+
+def _drop_match_indexes() -> None:
+    op.drop_index('ix_donor_profiles_available', table_name='donor_profiles')
+    op.drop_index('ix_donor_profiles_available_local', table_name='donor_profiles')
+
+
+def upgrade() -> None:
+    _drop_match_indexes()
+    _create_match_indexes('last_donation_date')
+
+
+def downgrade() -> None:
+    _drop_match_indexes()
+    _create_match_indexes('created_at')
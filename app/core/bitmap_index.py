@@ -0,0 +1,163 @@
+"""
+Memory-mapped bitmap snapshots.
+
+A snapshot file holds named bitsets over one id space: bit i of a bitset
+is set when id i is in it. A bitset is stored dense (one bit per id up to
+the largest) after a small JSON header, so a reader turns it into a Python
+int with one copy out of the mapping and combines bitsets with the int's
+C-level &, | and bit_count. Every process maps the same file, so its pages
+live once in the OS page cache rather than once per worker. Writers
+replace the file atomically; readers notice the new inode and remap.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+MAGIC = b"BITMAPS1"
+HEADER_SIZE = struct.Struct("<Q")
+
+
+class BitsetBuilder:
+    """Collects ids into named bitsets for `write_snapshot`."""
+
+    def __init__(self):
+        self.bitsets: Dict[str, bytearray] = {}
+
+    def add(self, name: str, id_: int) -> None:
+        bitset = self.bitsets.setdefault(name, bytearray())
+        byte = id_ >> 3
+        if byte >= len(bitset):
+            bitset.extend(bytes(max(byte + 1 - len(bitset), len(bitset))))
+        bitset[byte] |= 1 << (id_ & 7)
+
+
+def bits_from_ids(ids) -> int:
+    builder = BitsetBuilder()
+    for id_ in ids:
+        builder.add("", id_)
+    return int.from_bytes(builder.bitsets.get("", b""), "little")
+
+
+def _words(bits: int) -> array:
+    words = array("Q")
+    words.frombytes(bits.to_bytes(-(-bits.bit_length() // 64) * 8, "little"))
+    if sys.byteorder == "big":
+        words.byteswap()
+    return words
+
+
+def positions(bits: int, after: int = -1, limit: Optional[int] = None) -> List[int]:
+    """Set bit positions greater than `after`, ascending, at most `limit`."""
+    base = after + 1
+    found: List[int] = []
+    for index, word in enumerate(_words(bits >> base)):
+        while word:
+            low = word & -word
+            found.append(base + index * 64 + low.bit_length() - 1)
+            if len(found) == limit:
+                return found
+            word ^= low
+    return found
+
+
+def highest_positions(bits: int, limit: int) -> List[int]:
+    """The `limit` highest set bit positions, descending."""
+    # Only the top of a large bitset is converted, widening until it holds enough
+    window = 4096
+    while True:
+        base = max(bits.bit_length() - window, 0)
+        top = bits >> base
+        if base == 0 or top.bit_count() >= limit:
+            break
+        window *= 4
+    found: List[int] = []
+    words = _words(top)
+    for index in range(len(words) - 1, -1, -1):
+        word = words[index]
+        while word and len(found) < limit:
+            high = word.bit_length() - 1
+            found.append(base + index * 64 + high)
+            word ^= 1 << high
+        if len(found) == limit:
+            break
+    return found
+
+
+def write_snapshot(path: str, bitsets: Dict[str, bytearray], meta: Dict[str, Any]) -> int:
+    """Write `bitsets` and `meta` to `path`, replacing it atomically; returns the file size."""
+    nbytes = -(-max((len(bitset) for bitset in bitsets.values()), default=0) // 8) * 8
+    names = sorted(bitsets)
+    header = {"meta": meta, "nbytes": nbytes, "bitsets": {}}
+    # Offsets depend on the header's own length; fix them once it stops growing
+    start = 0
+    while True:
+        header["bitsets"] = {name: start + i * nbytes for i, name in enumerate(names)}
+        encoded = json.dumps(header).encode()
+        needed = -(-(len(MAGIC) + HEADER_SIZE.size + len(encoded)) // 8) * 8
+        if needed == start:
+            break
+        start = needed
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    partial = f"{path}.{os.getpid()}.tmp"
+    with open(partial, "wb") as f:
+        f.write(MAGIC + HEADER_SIZE.pack(len(encoded)) + encoded)
+        f.write(bytes(start - f.tell()))
+        for name in names:
+            f.write(bitsets[name])
+            f.write(bytes(nbytes - len(bitsets[name])))
+        f.flush()
+        os.fsync(f.fileno())
+        size = f.tell()
+    os.replace(partial, path)
+    return size
+
+
+class BitmapSnapshot:
+    """One mapped snapshot file."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a bitmap snapshot")
+        (length,) = HEADER_SIZE.unpack_from(self._map, len(MAGIC))
+        start = len(MAGIC) + HEADER_SIZE.size
+        header = json.loads(self._map[start:start + length])
+        self.meta: Dict[str, Any] = header["meta"]
+        self.nbytes: int = header["nbytes"]
+        self._offsets: Dict[str, int] = header["bitsets"]
+
+    def get(self, name: str) -> int:
+        """The named bitset as an int; 0 when it does not exist."""
+        offset = self._offsets.get(name)
+        if offset is None:
+            return 0
+        return int.from_bytes(self._map[offset:offset + self.nbytes], "little")
+
+
+class SnapshotFile:
+    """This process's mapping of a snapshot path, remapped when the file is replaced."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._snapshot: Optional[BitmapSnapshot] = None
+        self._identity: Optional[Tuple[int, int, int]] = None
+
+    def current(self) -> Optional[BitmapSnapshot]:
+        """The latest snapshot written to the path, or None if there is none."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._snapshot = self._identity = None
+            return None
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if identity != self._identity:
+            # The replaced mapping is unmapped once nothing refers to it
+            self._snapshot, self._identity = BitmapSnapshot(self.path), identity
+        return self._snapshot
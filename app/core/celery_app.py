@@ -6,10 +6,13 @@ celery_app = Celery(
     "blood_donor_api",
     broker=settings.redis_url,
     backend=settings.redis_url,
+    # Task modules are imported by workers through include
     include=[
         "app.services.notification_service",
         "app.services.alert_service",
+        "app.services.audience_service",
         "app.services.donation_service",
+        "app.services.report_service",
     ],
 )
 
@@ -34,17 +37,29 @@ celery_app.conf.beat_schedule = {
         "task": "app.services.alert_service.process_scheduled_alerts",
         "schedule": 60.0,  # seconds
     },
+    # Rewrite the alert audience bitmap snapshot
+    "rebuild-audience-index": {
+        "task": "app.services.audience_service.rebuild_audience_index",
+        "schedule": float(settings.audience_index_refresh_seconds),
+    },
+    # Make donors available again once their donation deferral is over
+    "update-donor-availability": {
+        "task": "app.services.donation_service.update_donor_availability",
+        "schedule": 3600.0,  # 1 hour
+    },
     # Clean up old notifications daily
     "cleanup-old-notifications": {
         "task": "app.services.notification_service.cleanup_old_notifications",
         "schedule": 86400.0,  # 24 hours
     },
+    # Recount report summary counters hourly to fix any drift
+    "reconcile-report-counters": {
+        "task": "app.services.report_service.reconcile_report_counters",
+        "schedule": 3600.0,  # 1 hour
+    },
+    # Regenerate the monthly donation rollup daily
+    "rebuild-donation-rollup": {
+        "task": "app.services.report_service.rebuild_donation_rollup",
+        "schedule": 86400.0,  # 24 hours
+    },
 }
-
-# Import tasks after configuration
-from app.services.notification_service import send_notification_task
-from app.services.alert_service import (
-    process_scheduled_alerts,
-    send_alert_notifications,
-)
-from app.services.donation_service import update_donor_availability
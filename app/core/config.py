@@ -17,6 +17,22 @@ class Settings:
             raise ValueError("DATABASE_URL environment variable is not set. Please configure your database connection.")
         return database_url
 
+    @property
+    def async_database_url(self) -> str:
+        """Get database URL rewritten for the async driver (asyncpg/aiosqlite)."""
+        database_url = os.getenv("ASYNC_DATABASE_URL")
+        if database_url:
+            return database_url
+        database_url = self.database_url
+        for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+            if database_url.startswith(prefix):
+                # asyncpg spells libpq's sslmode as ssl
+                rest = database_url[len(prefix):].replace("sslmode=", "ssl=")
+                return "postgresql+asyncpg://" + rest
+        if database_url.startswith("sqlite://"):
+            return "sqlite+aiosqlite://" + database_url[len("sqlite://"):]
+        return database_url
+
     # JWT
     secret_key: str = os.getenv(
         "SECRET_KEY", "your-super-secret-key-change-in-production"
@@ -26,6 +42,14 @@ class Settings:
         os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
     )
     refresh_token_expire_days: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+    # Key for the HMAC digests of stored refresh tokens
+    refresh_token_hmac_key: str = os.getenv("REFRESH_TOKEN_HMAC_KEY", secret_key)
+    # Key signing list pagination cursors
+    cursor_signing_key: str = os.getenv("CURSOR_SIGNING_KEY", secret_key)
+
+    # Authenticated-user cache (per process); 0 seconds disables it
+    user_cache_ttl_seconds: int = int(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+    user_cache_size: int = int(os.getenv("USER_CACHE_SIZE", "10000"))
 
     # Application
     app_name: str = os.getenv("APP_NAME", "Blood Donor API")
@@ -46,6 +70,47 @@ class Settings:
     # Redis
     redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+    # Donor typeahead index (per process): loaded at startup, rebuilt this often
+    donor_suggest_preload: bool = os.getenv("DONOR_SUGGEST_PRELOAD", "True").lower() == "true"
+    donor_suggest_refresh_seconds: int = int(os.getenv("DONOR_SUGGEST_REFRESH_SECONDS", "600"))
+
+    # Report response cache: "memory" (per process) or "redis"; 0 seconds disables it
+    report_cache_backend: str = os.getenv("REPORT_CACHE_BACKEND", "memory")
+    report_cache_ttl_seconds: int = int(os.getenv("REPORT_CACHE_TTL_SECONDS", "60"))
+    report_cache_size: int = int(os.getenv("REPORT_CACHE_SIZE", "1024"))
+
+    # Live notification events: "redis" (shared by all workers) or "memory" (single process)
+    pubsub_backend: str = os.getenv("PUBSUB_BACKEND", "redis")
+    notification_stream_queue_size: int = int(os.getenv("NOTIFICATION_STREAM_QUEUE_SIZE", "100"))
+    notification_stream_ping_seconds: int = int(os.getenv("NOTIFICATION_STREAM_PING_SECONDS", "15"))
+
+    # Notifications are partitioned by month (PostgreSQL); months older than
+    # the retention are detached, then dropped unless the action is "detach"
+    notification_retention_months: int = int(os.getenv("NOTIFICATION_RETENTION_MONTHS", "12"))
+    notification_retention_action: str = os.getenv("NOTIFICATION_RETENTION_ACTION", "drop")
+    notification_partitions_ahead: int = int(os.getenv("NOTIFICATION_PARTITIONS_AHEAD", "3"))
+
+    # Days after a donation before the donor may give again
+    donation_deferral_days: int = int(os.getenv("DONATION_DEFERRAL_DAYS", "90"))
+    # Donors made available again per UPDATE once their deferral is over
+    donor_recovery_batch_size: int = int(os.getenv("DONOR_RECOVERY_BATCH_SIZE", "5000"))
+    # Upload rows validated and written together by the bulk donation import
+    donation_import_chunk_size: int = int(os.getenv("DONATION_IMPORT_CHUNK_SIZE", "5000"))
+
+    # Alerts
+    alert_fanout_chunk_size: int = int(os.getenv("ALERT_FANOUT_CHUNK_SIZE", "1000"))
+    # General announcements reaching at least this many donors are pulled
+    # into inboxes on read instead of fanned out; 0 always fans out
+    alert_pull_threshold: int = int(os.getenv("ALERT_PULL_THRESHOLD", "10000"))
+    # Deliveries queued or running with no progress for this long are queued again
+    alert_fanout_stall_seconds: int = int(os.getenv("ALERT_FANOUT_STALL_SECONDS", "600"))
+
+    # Alert audience bitmap index: a file every worker maps, rewritten by
+    # Celery beat; older snapshots are ignored in favour of SQL
+    audience_index_path: str = os.getenv("AUDIENCE_INDEX_PATH", "data/audience_index.bin")
+    audience_index_refresh_seconds: int = int(os.getenv("AUDIENCE_INDEX_REFRESH_SECONDS", "300"))
+    audience_index_max_age_seconds: int = int(os.getenv("AUDIENCE_INDEX_MAX_AGE_SECONDS", "3600"))
+
     # Logging
     log_level: str = os.getenv("LOG_LEVEL", "INFO")
     log_format: str = os.getenv("LOG_FORMAT", "json")
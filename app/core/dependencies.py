@@ -1,20 +1,44 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from dataclasses import dataclass
 from typing import Optional
 
 from app.db.dependencies import get_db
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.security import verify_token
-from app.models.user import User, UserRole
+from app.models.user import User, UserRole, UserStatus
 from app.schemas.auth import TokenData
 
 security = HTTPBearer()
 
 
+@dataclass(frozen=True)
+class CurrentUser:
+    """The user fields authentication and authorization need."""
+
+    id: int
+    role: UserRole
+    status: UserStatus
+
+
+# Per-process cache of CurrentUser by id; the TTL bounds staleness across workers
+user_cache = TTLCache(
+    maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl_seconds
+)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop a user from the auth cache after their role/status/profile changes."""
+    user_cache.delete(user_id)
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
+    db: AsyncSession = Depends(get_db),
+) -> CurrentUser:
     """Get current authenticated user."""
     token = credentials.credentials
     payload = verify_token(token, db)
@@ -32,12 +56,18 @@ async def get_current_user(
             detail="Invalid token payload",
         )
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-        )
+    user = user_cache.get(int(user_id))
+    if user is None:
+        row = (await db.execute(
+            select(User.id, User.role, User.status).where(User.id == int(user_id))
+        )).first()
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+            )
+        user = CurrentUser(id=row.id, role=row.role, status=row.status)
+        user_cache.set(user.id, user)
     
     if user.status != "active":
         raise HTTPException(
@@ -49,8 +79,8 @@ async def get_current_user(
 
 
 async def get_current_admin(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: CurrentUser = Depends(get_current_user),
+) -> CurrentUser:
     """Require admin role."""
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -61,8 +91,8 @@ async def get_current_admin(
 
 
 async def get_current_donor(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: CurrentUser = Depends(get_current_user),
+) -> CurrentUser:
     """Require donor role."""
     if current_user.role != UserRole.DONOR:
         raise HTTPException(
@@ -0,0 +1,135 @@
+"""
+Sorted-array prefix index.
+
+Maps normalized byte-string keys to integer ids for prefix lookups. Bulk
+data is built into one immutable sorted run: every key's bytes packed into
+a single blob with an array of offsets and an array of ids beside it, so a
+key costs its length plus 12 bytes rather than a Python object. Changes
+after the build go to a small sorted overlay, and ids whose run entries
+are out of date are masked; the next `build` folds everything back into
+one run. PackedStrings stores an id -> label map the same way.
+"""
+import bisect
+import heapq
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+class PrefixIndex:
+    """Prefix search over (key, id) pairs; an id may have several keys."""
+
+    def __init__(self):
+        self._blob = b""
+        self._offsets = array("Q", [0])  # key i is blob[offsets[i]:offsets[i + 1]]
+        self._ids = array("i")
+        self._overlay: List[Tuple[bytes, int]] = []
+        self._overlay_keys: Dict[int, List[bytes]] = {}
+        self._masked: Set[int] = set()
+
+    @classmethod
+    def build(cls, entries: Iterable[Tuple[bytes, int]]) -> "PrefixIndex":
+        index = cls()
+        entries = sorted(entries)
+        index._blob = b"".join(key for key, _ in entries)
+        end = 0
+        for key, _ in entries:
+            end += len(key)
+            index._offsets.append(end)
+        index._ids = array("i", (id_ for _, id_ in entries))
+        return index
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the packed run (the overlay is small and not counted)."""
+        return (
+            len(self._blob)
+            + self._offsets.itemsize * len(self._offsets)
+            + self._ids.itemsize * len(self._ids)
+        )
+
+    def _key(self, i: int) -> bytes:
+        return self._blob[self._offsets[i]:self._offsets[i + 1]]
+
+    def _run_from(self, prefix: bytes) -> Iterator[Tuple[bytes, int]]:
+        i = bisect.bisect_left(range(len(self._ids)), prefix, key=self._key)
+        while i < len(self._ids):
+            if self._ids[i] not in self._masked:
+                yield self._key(i), self._ids[i]
+            i += 1
+
+    def _overlay_from(self, prefix: bytes) -> Iterator[Tuple[bytes, int]]:
+        i = bisect.bisect_left(self._overlay, (prefix,))
+        return iter(self._overlay[i:])
+
+    def search(self, prefix: bytes, limit: int) -> List[int]:
+        """Up to `limit` distinct ids with a key starting with `prefix`, in key order."""
+        found: List[int] = []
+        for key, id_ in heapq.merge(self._run_from(prefix), self._overlay_from(prefix)):
+            if not key.startswith(prefix):
+                break
+            if id_ not in found:
+                found.append(id_)
+                if len(found) == limit:
+                    break
+        return found
+
+    def remove(self, id_: int) -> None:
+        for key in self._overlay_keys.pop(id_, ()):
+            del self._overlay[bisect.bisect_left(self._overlay, (key, id_))]
+        self._masked.add(id_)
+
+    def upsert(self, id_: int, keys: Iterable[bytes]) -> None:
+        """Replace every key of `id_` with `keys`."""
+        self.remove(id_)
+        keys = sorted(set(keys))
+        for key in keys:
+            bisect.insort(self._overlay, (key, id_))
+        self._overlay_keys[id_] = keys
+
+
+class PackedStrings:
+    """Read-mostly id -> str map: a packed run sorted by id, later writes in a dict."""
+
+    def __init__(self):
+        self._blob = b""
+        self._offsets = array("Q", [0])
+        self._ids = array("i")
+        self._changed: Dict[int, str] = {}
+
+    @classmethod
+    def build(cls, items: Iterable[Tuple[int, str]]) -> "PackedStrings":
+        packed = cls()
+        encoded = sorted((id_, value.encode()) for id_, value in items)
+        packed._blob = b"".join(value for _, value in encoded)
+        end = 0
+        for _, value in encoded:
+            end += len(value)
+            packed._offsets.append(end)
+        packed._ids = array("i", (id_ for id_, _ in encoded))
+        return packed
+
+    def __len__(self) -> int:
+        return len(self._ids) + sum(1 for id_ in self._changed if self._find(id_) is None)
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            len(self._blob)
+            + self._offsets.itemsize * len(self._offsets)
+            + self._ids.itemsize * len(self._ids)
+        )
+
+    def _find(self, id_: int) -> Optional[int]:
+        i = bisect.bisect_left(self._ids, id_)
+        return i if i < len(self._ids) and self._ids[i] == id_ else None
+
+    def get(self, id_: int) -> Optional[str]:
+        if id_ in self._changed:
+            return self._changed[id_]
+        i = self._find(id_)
+        if i is None:
+            return None
+        return self._blob[self._offsets[i]:self._offsets[i + 1]].decode()
+
+    def set(self, id_: int, value: str) -> None:
+        self._changed[id_] = value
@@ -0,0 +1,200 @@
+"""
+Live notification delivery.
+
+Each API worker keeps one NotificationHub: the SSE connections open on that
+worker, indexed by user id. Publishers (request handlers, Celery workers)
+send events through the configured backend:
+
+* memory - events are dispatched straight to this process's hub. Only
+  correct for a single process (tests, local development).
+* redis - events are PUBLISHed on one channel; every API worker holds a
+  single subscription to it and dispatches to its own hub.
+
+An event is a dict {"event": name, "user_ids": [...], "data": {...}}.
+Besides the users' streams, handlers registered with `NotificationHub.on`
+see every event of their name, so an API worker can react to changes made
+by Celery workers (see donation_service).
+"""
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One connected client's bounded event queue."""
+
+    __slots__ = ("user_id", "queue", "overflowed")
+
+    def __init__(self, user_id: int, maxsize: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def push(self, event: str, data: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait((event, data))
+        except asyncio.QueueFull:
+            # A client this far behind refetches instead of replaying
+            self.overflowed = True
+
+
+class NotificationHub:
+    """Per-process registry of live subscriptions by user id."""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._handlers: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+
+    def on(self, event: str, handler: Callable[[Dict[str, Any]], None]) -> None:
+        """Call `handler(message)` for every `event` dispatched here, whoever it targets (idempotent)."""
+        handlers = self._handlers.setdefault(event, [])
+        if handler not in handlers:
+            handlers.append(handler)
+
+    def subscribe(self, user_id: int) -> Subscription:
+        self.loop = asyncio.get_running_loop()
+        subscription = Subscription(user_id, self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+
+    def dispatch(self, message: Dict[str, Any]) -> int:
+        """Queue an event for every local subscriber it targets; must run on the hub's loop."""
+        for handler in self._handlers.get(message["event"], ()):
+            try:
+                handler(message)
+            except Exception as exc:
+                logger.warning(f"Handling {message['event']} failed: {exc}")
+        delivered = 0
+        for user_id in message["user_ids"]:
+            for subscription in self._subscribers.get(user_id, ()):
+                subscription.push(message["event"], message["data"])
+                delivered += 1
+        return delivered
+
+    @property
+    def connections(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+class MemoryBackend:
+    def __init__(self, hub: NotificationHub):
+        self.hub = hub
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def apublish(self, message: Dict[str, Any]) -> None:
+        self.hub.dispatch(message)
+
+    def publish(self, message: Dict[str, Any]) -> None:
+        loop = self.hub.loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self.hub.dispatch(message)
+        else:
+            loop.call_soon_threadsafe(self.hub.dispatch, message)
+
+
+class RedisBackend:
+    def __init__(self, hub: NotificationHub, url: str, channel: str = "notifications"):
+        import redis
+        import redis.asyncio as aioredis
+
+        self.hub = hub
+        self.channel = channel
+        self.client = aioredis.from_url(url)
+        self.sync_client = redis.Redis.from_url(url)
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start this worker's single channel subscription (idempotent)."""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.client.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        self.hub.dispatch(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning(f"Notification subscription lost, retrying: {exc}")
+                await asyncio.sleep(1)
+
+    async def apublish(self, message: Dict[str, Any]) -> None:
+        await self.client.publish(self.channel, json.dumps(message))
+
+    def publish(self, message: Dict[str, Any]) -> None:
+        self.sync_client.publish(self.channel, json.dumps(message))
+
+
+class NotificationBus:
+    """Publishes notification events to whichever workers hold the users' streams."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hub: NotificationHub = backend.hub
+
+    async def start(self) -> None:
+        await self.backend.start()
+
+    async def stop(self) -> None:
+        await self.backend.stop()
+
+    @staticmethod
+    def _message(event: str, user_ids: Iterable[int], data: Dict[str, Any]) -> Dict[str, Any]:
+        return {"event": event, "user_ids": list(user_ids), "data": data}
+
+    async def apublish(self, event: str, user_ids: Iterable[int], data: Dict[str, Any]) -> None:
+        """Publish from async code; failures are logged, never raised."""
+        try:
+            await self.backend.apublish(self._message(event, user_ids, data))
+        except Exception as exc:
+            logger.warning(f"Publishing {event} failed: {exc}")
+
+    def publish(self, event: str, user_ids: Iterable[int], data: Dict[str, Any]) -> None:
+        """Publish from sync code (Celery tasks, threadpool); failures are logged."""
+        try:
+            self.backend.publish(self._message(event, user_ids, data))
+        except Exception as exc:
+            logger.warning(f"Publishing {event} failed: {exc}")
+
+
+def _make_backend():
+    hub = NotificationHub(queue_size=settings.notification_stream_queue_size)
+    if settings.pubsub_backend == "redis":
+        return RedisBackend(hub, settings.redis_url)
+    return MemoryBackend(hub)
+
+
+notification_bus = NotificationBus(_make_backend())
@@ -0,0 +1,190 @@
+"""
+Cache for report responses.
+
+Entries are keyed by endpoint, normalized query params and the current
+version of each tag the report depends on. Writes invalidate a tag by
+bumping its version, so stale entries are never read again and simply age
+out. The memory backend is per process; the redis backend shares entries
+and tag versions between workers.
+
+`fetch` serves report endpoints; `lookup` is the same read-through without
+the HTTP caching headers, for values embedded in other responses (the
+donor list's exact totals).
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi import Response
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Tags: what a report is computed from
+DONATIONS = "donations"
+DONORS = "donors"
+
+
+class MemoryBackend:
+    """In-process LRU of entries plus a dict of tag versions."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: Any) -> None:
+        self.entries.set(key, value)
+
+    async def versions(self, tags: Tuple[str, ...]) -> Tuple[int, ...]:
+        return tuple(self._versions.get(tag, 0) for tag in tags)
+
+    async def bump(self, tags: Iterable[str]) -> None:
+        self.bump_sync(tags)
+
+    def bump_sync(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def clear(self) -> None:
+        self.entries.clear()
+        with self._lock:
+            self._versions.clear()
+
+
+class RedisBackend:
+    """Entries as JSON strings with SETEX; tag versions as INCR counters."""
+
+    def __init__(self, url: str, ttl: int, prefix: str = "report-cache"):
+        import redis
+        import redis.asyncio as aioredis
+
+        self.client = aioredis.from_url(url)
+        self.sync_client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self.client.get(f"{self.prefix}:entry:{key}")
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any) -> None:
+        await self.client.set(f"{self.prefix}:entry:{key}", json.dumps(value), ex=self.ttl)
+
+    async def versions(self, tags: Tuple[str, ...]) -> Tuple[int, ...]:
+        values = await self.client.mget([f"{self.prefix}:tag:{tag}" for tag in tags])
+        return tuple(int(value or 0) for value in values)
+
+    async def bump(self, tags: Iterable[str]) -> None:
+        async with self.client.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.incr(f"{self.prefix}:tag:{tag}")
+            await pipe.execute()
+
+    def bump_sync(self, tags: Iterable[str]) -> None:
+        with self.sync_client.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.incr(f"{self.prefix}:tag:{tag}")
+            pipe.execute()
+
+
+class ReportCache:
+    """Read-through cache for report payloads with tag invalidation."""
+
+    def __init__(self, backend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def make_key(endpoint: str, params: Dict[str, Any], versions: Tuple[int, ...]) -> str:
+        # Unset and empty params select the same rows
+        normalized = {name: str(value) for name, value in params.items() if value not in (None, "")}
+        raw = json.dumps([endpoint, normalized, versions], sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    async def lookup(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        tags: Tuple[str, ...],
+        compute: Callable[[], Awaitable[Any]],
+    ) -> Tuple[Any, Optional[float]]:
+        """Return the cached payload and when it was stored, or compute and store it (None)."""
+        if not self.enabled:
+            return await compute(), None
+
+        key = None
+        try:
+            key = self.make_key(endpoint, params, await self.backend.versions(tags))
+            entry = await self.backend.get(key)
+        except Exception as exc:
+            # A cache outage must not take the reports down with it
+            logger.warning(f"Report cache unavailable: {exc}")
+            entry = None
+
+        if entry is not None:
+            stored_at, payload = entry
+            return payload, stored_at
+
+        payload = await compute()
+        if key is not None:
+            try:
+                await self.backend.set(key, [time.time(), payload])
+            except Exception as exc:
+                logger.warning(f"Report cache unavailable: {exc}")
+        return payload, None
+
+    async def fetch(
+        self,
+        response: Response,
+        endpoint: str,
+        params: Dict[str, Any],
+        tags: Tuple[str, ...],
+        compute: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Return the cached payload or compute and store it; sets Cache-Control/Age."""
+        payload, stored_at = await self.lookup(endpoint, params, tags, compute)
+        if not self.enabled:
+            response.headers["Cache-Control"] = "no-store"
+            return payload
+        response.headers["Cache-Control"] = f"private, max-age={self.ttl}"
+        response.headers["Age"] = "0" if stored_at is None else str(max(0, int(time.time() - stored_at)))
+        return payload
+
+    async def invalidate(self, *tags: str) -> None:
+        """Make every entry that depends on any of `tags` unreachable."""
+        try:
+            await self.backend.bump(tags)
+        except Exception as exc:
+            logger.warning(f"Report cache invalidation failed for {tags}: {exc}")
+
+    def invalidate_sync(self, *tags: str) -> None:
+        """`invalidate` for sync code (Celery tasks). Only the redis backend reaches the API workers."""
+        try:
+            self.backend.bump_sync(tags)
+        except Exception as exc:
+            logger.warning(f"Report cache invalidation failed for {tags}: {exc}")
+
+
+def _make_backend():
+    if settings.report_cache_backend == "redis":
+        return RedisBackend(settings.redis_url, ttl=settings.report_cache_ttl_seconds)
+    return MemoryBackend(
+        maxsize=settings.report_cache_size, ttl=settings.report_cache_ttl_seconds
+    )
+
+
+report_cache = ReportCache(_make_backend(), ttl=settings.report_cache_ttl_seconds)
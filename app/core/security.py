@@ -1,3 +1,6 @@
+import hashlib
+import hmac
+import secrets
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from jose import JWTError, jwt
@@ -20,6 +23,29 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def hash_refresh_token(token: str) -> str:
+    """Keyed HMAC-SHA256 digest of a refresh token for storage.
+
+    Refresh tokens are long random JWTs, so a fast keyed hash is enough; bcrypt
+    would only burn CPU on the event loop.
+    """
+    return hmac.new(
+        settings.refresh_token_hmac_key.encode(), token.encode(), hashlib.sha256
+    ).hexdigest()
+
+
+def refresh_token_matches(token: str, digest: Optional[str]) -> bool:
+    """Constant-time check of a presented refresh token against its stored digest."""
+    if not digest:
+        return False
+    return hmac.compare_digest(hash_refresh_token(token), digest)
+
+
+def new_token_family() -> str:
+    """Identifier shared by a login's chain of rotated refresh tokens."""
+    return secrets.token_urlsafe(16)
+
+
 def create_access_token(
     data: Dict[str, Any], expires_delta: Optional[timedelta] = None
 ) -> str:
@@ -49,7 +75,8 @@ def create_refresh_token(
     else:
         expire = datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
 
-    to_encode.update({"exp": expire, "type": "refresh"})
+    # jti keeps tokens issued within the same second distinct
+    to_encode.update({"exp": expire, "type": "refresh", "jti": secrets.token_urlsafe(16)})
     encoded_jwt = jwt.encode(
         to_encode, settings.secret_key, algorithm=settings.algorithm
     )
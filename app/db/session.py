@@ -1,10 +1,12 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
 # Create engine - automatically use psycopg2 for PostgreSQL connections
+# Used by Alembic, Celery workers and scripts; request handlers use async_engine.
 engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,  # Verify connections before use
@@ -15,14 +17,28 @@ engine = create_engine(
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for the request path, so DB round trips don't block the event loop
+async_engine = create_async_engine(
+    settings.async_database_url,
+    pool_pre_ping=True,
+    pool_recycle=300,
+    echo=settings.debug,
+)
+
+# expire_on_commit=False: attributes can't be lazily reloaded outside a greenlet
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Create Base class for models
 Base = declarative_base()
 
 
-def get_db():
-    """Dependency to get database session."""
-    db = SessionLocal()
-    try:
+async def get_db():
+    """Dependency to get async database session."""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
@@ -0,0 +1,8 @@
+"""Column types shared by the models."""
+from sqlalchemy import DateTime
+from sqlalchemy.dialects import sqlite
+
+# SQLite's CURRENT_TIMESTAMP has no fractional seconds; store Python values
+# the same way so keyset cursors and read watermarks compare equal to
+# server-defaulted rows
+timestamp_tz = DateTime(timezone=True).with_variant(sqlite.DATETIME(truncate_microseconds=True), "sqlite")
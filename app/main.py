@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
@@ -7,11 +9,26 @@ from slowapi.errors import RateLimitExceeded
 
 from app.core.config import settings
 from app.core.logging import setup_logging
+from app.core.pubsub import notification_bus
 from app.middleware.exception_handler import setup_exception_handlers
+from app.services.donation_service import watch_availability_changes
+from app.services.donor_search import donor_suggest
 
 limiter = Limiter(key_func=get_remote_address)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.donor_suggest_preload:
+        # In the background: the app serves requests while the index loads
+        donor_suggest.start()
+    # Events from Celery workers reach this worker through its bus subscription
+    watch_availability_changes()
+    await notification_bus.start()
+    yield
+    await notification_bus.stop()
+
+
 def create_app() -> FastAPI:
     """Create FastAPI application with all configurations."""
 
@@ -25,6 +42,7 @@ def create_app() -> FastAPI:
         debug=settings.debug,
         docs_url="/docs" if settings.debug else None,
         redoc_url="/redoc" if settings.debug else None,
+        lifespan=lifespan,
     )
 
     # Add rate limiter
@@ -38,6 +56,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["Link", "X-Total-Count", "X-Total-Count-Mode"],
     )
 
     # Add trusted host middleware for production
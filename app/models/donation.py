@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, Enum, DateTime, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, Enum, ForeignKey, Date, Index
 from sqlalchemy.sql import func
 import enum
 
 from app.db.session import Base
+from app.db.types import timestamp_tz
 from app.models.donor import BloodType
 
 
@@ -13,16 +14,29 @@ class UrgencyLevel(str, enum.Enum):
     CRITICAL = "critical"
 
 
+# Stored by value ("O+"), matching the bloodtype type created in migration 003
+blood_type_enum = Enum(
+    BloodType, name="bloodtype", values_callable=lambda members: [m.value for m in members]
+)
+
+
 class Donation(Base):
     __tablename__ = "donations"
 
     id = Column(Integer, primary_key=True, index=True)
     donor_profile_id = Column(Integer, ForeignKey("donor_profiles.id"), nullable=False)
     donation_date = Column(Date, nullable=False)
-    blood_type = Column(Enum(BloodType), nullable=False)
+    blood_type = Column(blood_type_enum, nullable=False)
     units = Column(Integer, default=1, nullable=False)
     location = Column(String, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(timestamp_tz, server_default=func.now())
+
+    __table_args__ = (
+        # Date-range reports and the donation list's (donation_date, id) pages
+        Index("ix_donations_date", donation_date.desc(), id.desc()),
+        # A donor's donations by date: audience recency probes and donor histories
+        Index("ix_donations_donor_date", donor_profile_id, donation_date.desc()),
+    )
 
 
 class BloodRequest(Base):
@@ -30,10 +44,14 @@ class BloodRequest(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     patient_name = Column(String, nullable=False)
-    blood_type = Column(Enum(BloodType), nullable=False)
+    blood_type = Column(blood_type_enum, nullable=False)
     units_needed = Column(Integer, nullable=False)
     urgency = Column(Enum(UrgencyLevel), default=UrgencyLevel.MEDIUM, nullable=False)
     hospital = Column(String, nullable=False)
     contact_number = Column(String, nullable=False)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(timestamp_tz, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_blood_requests_created", created_at.desc(), id.desc()),
+    )
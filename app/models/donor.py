@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, String, Enum, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Date, Integer, String, Enum, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
 
 from app.db.session import Base
+from app.db.types import timestamp_tz
 
 
 class BloodType(str, enum.Enum):
@@ -55,9 +56,13 @@ class DonorRegistration(Base):
     review_reason = Column(Text, nullable=True)
     reviewed_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     reviewed_at = Column(DateTime(timezone=True), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(timestamp_tz, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        Index("ix_donor_registrations_created", created_at.desc(), id.desc()),
+    )
+
 
 class DonorProfile(Base):
     __tablename__ = "donor_profiles"
@@ -78,5 +83,44 @@ class DonorProfile(Base):
         default="available",
         nullable=False,
     )
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Donation aggregates, maintained with each donation (donation_service)
+    last_donation_date = Column(Date, nullable=True)
+    next_eligible_date = Column(Date, nullable=True)
+    donation_count = Column(Integer, default=0, server_default="0", nullable=False)
+    total_units = Column(Integer, default=0, server_default="0", nullable=False)
+    created_at = Column(timestamp_tz, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_donor_profiles_created", created_at.desc(), id.desc()),
+        # Eligible donors (available, past next_eligible_date) newest first
+        Index(
+            "ix_donor_profiles_eligible",
+            created_at.desc(), id.desc(), next_eligible_date,
+            postgresql_where=availability == "available",
+            sqlite_where=availability == "available",
+        ),
+        # Availability recovery: recently donated donors by end of deferral
+        Index(
+            "ix_donor_profiles_recovery",
+            next_eligible_date,
+            postgresql_where=availability == "recently_donated",
+            sqlite_where=availability == "recently_donated",
+        ),
+        # Audience snapshot catch-up: profiles changed since it was read
+        Index("ix_donor_profiles_updated", updated_at),
+        # Blood request matching: available donors of a type, latest donation
+        # first, in one municipality or in any
+        Index(
+            "ix_donor_profiles_available_local",
+            blood_type, municipality, last_donation_date.desc(), id.desc(),
+            postgresql_where=availability == "available",
+            sqlite_where=availability == "available",
+        ),
+        Index(
+            "ix_donor_profiles_available",
+            blood_type, last_donation_date.desc(), id.desc(),
+            postgresql_where=availability == "available",
+            sqlite_where=availability == "available",
+        ),
+    )
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Index
 from sqlalchemy.sql import func
 
 from app.db.session import Base
+from app.db.types import timestamp_tz
 
 
 class Message(Base):
@@ -12,5 +13,9 @@ class Message(Base):
     subject = Column(String, nullable=False)
     content = Column(Text, nullable=False)
     is_closed = Column(Boolean, default=False, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(timestamp_tz, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_messages_created", created_at.desc(), id.desc()),
+    )
@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Enum, DateTime, Text, ForeignKey, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Enum, DateTime, Text, ForeignKey, Boolean, JSON, Index, CheckConstraint
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
 
 from app.db.session import Base
+from app.db.types import timestamp_tz
 
 
 class AlertType(str, enum.Enum):
@@ -18,6 +20,18 @@ class Priority(str, enum.Enum):
     CRITICAL = "critical"
 
 
+class FanoutStatus(str, enum.Enum):
+    PENDING = "pending"
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+
+
+class DeliveryMode(str, enum.Enum):
+    PUSH = "push"  # one notification row per recipient, written by fan-out
+    PULL = "pull"  # stored once, copied into each matching donor's inbox when they read it
+
+
 class NotificationType(str, enum.Enum):
     ALERT = "alert"
     MESSAGE_REPLY = "message_reply"
@@ -36,18 +50,67 @@ class Alert(Base):
     send_now = Column(Boolean, default=True, nullable=False)
     schedule_at = Column(DateTime(timezone=True), nullable=True)
     sent_at = Column(DateTime(timezone=True), nullable=True)
+    recipient_count = Column(Integer, default=0, nullable=False)
+    recipient_total = Column(Integer, nullable=True)
+    # Stored by value ("pending"), matching the fanoutstatus type created in migration 007
+    fanout_status = Column(
+        Enum(FanoutStatus, values_callable=lambda members: [m.value for m in members]),
+        default=FanoutStatus.PENDING,
+        nullable=False,
+    )
+    fanout_cursor = Column(Integer, default=0, nullable=False)
+    # When delivery was last queued or advanced a chunk; stalled deliveries are re-queued
+    fanout_updated_at = Column(DateTime(timezone=True), nullable=True)
+    # Stored by value ("push"), matching the deliverymode type created in migration 014
+    delivery_mode = Column(
+        Enum(DeliveryMode, values_callable=lambda members: [m.value for m in members]),
+        default=DeliveryMode.PUSH,
+        nullable=False,
+    )
+    # Publication order of pull alerts; inboxes remember the last one merged
+    pull_seq = Column(Integer, unique=True, nullable=True)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(timestamp_tz, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_alerts_created", created_at.desc(), id.desc()),
+    )
 
 
 class Notification(Base):
     __tablename__ = "notifications"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    title = Column(String, nullable=False)
-    message = Column(Text, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # NULL on alert notifications: the text is read from the alert
+    title = Column(String, nullable=True)
+    message = Column(Text, nullable=True)
     notification_type = Column(Enum(NotificationType), nullable=False)
     is_read = Column(Boolean, default=False, nullable=False)
     alert_id = Column(Integer, ForeignKey("alerts.id"), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Partition key on PostgreSQL, where the primary key is (id, created_at)
+    created_at = Column(timestamp_tz, server_default=func.now(), nullable=False)
+
+    alert = relationship(Alert, lazy="raise")
+
+    __table_args__ = (
+        # Inbox pages, newest first, optionally filtered on is_read; unread-count
+        Index("ix_notifications_user_read_created", user_id, is_read, created_at.desc(), id.desc()),
+        Index("ix_notifications_user_created", user_id, created_at.desc(), id.desc()),
+        CheckConstraint(
+            "alert_id IS NOT NULL OR (title IS NOT NULL AND message IS NOT NULL)",
+            name="ck_notifications_text_or_alert",
+        ),
+    )
+
+
+class NotificationInbox(Base):
+    """Per-user inbox state: the read-all watermark and the unread counter."""
+    __tablename__ = "notification_inbox"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    # Notifications created at or before this are read, whatever their is_read
+    last_read_at = Column(timestamp_tz, nullable=True)
+    unread_count = Column(Integer, default=0, server_default="0", nullable=False)
+    # Pull alerts up to this Alert.pull_seq have been merged into the inbox
+    pulled_seq = Column(Integer, default=0, server_default="0", nullable=False)
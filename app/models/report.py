@@ -0,0 +1,23 @@
+from sqlalchemy import BigInteger, Column, Date, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+from app.models.donation import blood_type_enum
+
+
+class ReportCounter(Base):
+    __tablename__ = "report_counters"
+
+    name = Column(String, primary_key=True)
+    value = Column(BigInteger, default=0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class DonationMonthlyRollup(Base):
+    __tablename__ = "donation_monthly_rollup"
+
+    month = Column(Date, primary_key=True)  # first day of the month
+    blood_type = Column(blood_type_enum, primary_key=True)
+    location = Column(String, primary_key=True)
+    count = Column(Integer, default=0, nullable=False)
+    units = Column(BigInteger, default=0, nullable=False)
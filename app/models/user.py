@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Enum, DateTime, Boolean, DDL, Index, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -34,5 +34,25 @@ class User(Base):
     status = Column(Enum(UserStatus), default=UserStatus.ACTIVE, nullable=False)
     theme_preference = Column(Enum(ThemePreference), default=ThemePreference.SYSTEM, nullable=False)
     hashed_refresh_token = Column(String, nullable=True)
+    refresh_token_family = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        # Substring search (ILIKE '%x%') on PostgreSQL, via pg_trgm
+        Index(
+            "ix_users_full_name_trgm", full_name,
+            postgresql_using="gin", postgresql_ops={"full_name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_users_contact_number_trgm", contact_number,
+            postgresql_using="gin", postgresql_ops={"contact_number": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+event.listen(
+    User.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
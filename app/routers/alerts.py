@@ -1,90 +1,121 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
 from app.db.dependencies import get_db
-from app.core.dependencies import get_current_admin
-from app.models.user import User
+from app.core.dependencies import CurrentUser, get_current_admin
 from app.models.donor import DonorProfile
-from app.models.notification import Alert, Notification
-from app.schemas.notification import AlertCreate, AlertResponse
+from app.models.notification import Alert
+from app.models.user import User
+from app.schemas.notification import AlertCreate, AlertPreview, AlertResponse, AudiencePreview, TargetAudience
+from app.schemas.pagination import CursorPage
+from app.services.alert_service import enqueue_delivery, mark_queued
+from app.services.audience_service import preview_audience, unindexed_tables
+from app.utils.pagination import keyset, link_next, page_of
 
 router = APIRouter()
 
 
-def fan_out_notifications(db: Session, alert: Alert):
-    """Create notifications for matching donors."""
-    query = db.query(DonorProfile)
-    
-    if alert.target_audience:
-        if "blood_type" in alert.target_audience:
-            query = query.filter(DonorProfile.blood_type == alert.target_audience["blood_type"])
-        if "municipality" in alert.target_audience:
-            query = query.filter(DonorProfile.municipality == alert.target_audience["municipality"])
-        if "availability" in alert.target_audience:
-            query = query.filter(DonorProfile.availability == alert.target_audience["availability"])
-    
-    profiles = query.all()
-    
-    for profile in profiles:
-        notification = Notification(
-            user_id=profile.user_id,
-            title=alert.title,
-            message=alert.message,
-            notification_type="alert",
-            alert_id=alert.id,
-        )
-        db.add(notification)
-
-
 @router.post("", response_model=AlertResponse, status_code=status.HTTP_201_CREATED)
 async def create_alert(
     alert: AlertCreate,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+    admin: CurrentUser = Depends(get_current_admin),
 ):
-    """Create alert and optionally send notifications."""
+    """Create alert and optionally queue its notifications."""
+    scanned = await unindexed_tables(db, alert.target_audience or TargetAudience())
+    if scanned:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Target audience cannot be served by an index (full scan of {', '.join(scanned)})",
+        )
     db_alert = Alert(
         title=alert.title,
         message=alert.message,
         alert_type=alert.alert_type,
         priority=alert.priority,
-        target_audience=alert.target_audience,
+        target_audience=alert.target_audience.model_dump(exclude_none=True) if alert.target_audience else None,
         send_now=alert.send_now,
         schedule_at=alert.schedule_at,
         created_by=admin.id,
     )
     
     if alert.send_now:
-        db_alert.sent_at = datetime.utcnow()
-        db.add(db_alert)
-        db.flush()
-        fan_out_notifications(db, db_alert)
-    else:
-        db.add(db_alert)
+        mark_queued(db_alert)
+    db.add(db_alert)
     
-    db.commit()
-    db.refresh(db_alert)
+    await db.commit()
+    await db.refresh(db_alert)
+    if alert.send_now:
+        # If the broker is unreachable, beat queues the delivery again once it stalls
+        await run_in_threadpool(enqueue_delivery, db_alert.id)
     return db_alert
 
 
-@router.get("", response_model=List[AlertResponse])
+@router.post("/preview", response_model=AudiencePreview)
+async def preview_alert(
+    preview: AlertPreview,
+    db: AsyncSession = Depends(get_db),
+    admin: CurrentUser = Depends(get_current_admin),
+):
+    """Exact recipient count and newest donors for a target_audience (admin)."""
+    count, sample_ids = await preview_audience(db, preview.target_audience or TargetAudience(), preview.sample_size)
+    sample = []
+    if sample_ids:
+        rows = await db.execute(
+            select(
+                DonorProfile.id,
+                DonorProfile.user_id,
+                User.full_name,
+                DonorProfile.blood_type,
+                DonorProfile.municipality,
+                DonorProfile.availability,
+            )
+            .join(User, DonorProfile.user_id == User.id)
+            .where(DonorProfile.id.in_(sample_ids))
+            .order_by(DonorProfile.id.desc())
+        )
+        sample = rows.mappings().all()
+    return AudiencePreview(recipient_count=count, sample=sample)
+
+
+@router.get("", response_model=CursorPage[AlertResponse])
 async def list_alerts(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
 ):
-    """List all alerts (public)."""
-    return db.query(Alert).order_by(Alert.created_at.desc()).all()
+    """List alerts, newest first, one page at a time (public)."""
+    result = await db.scalars(keyset(select(Alert), Alert.created_at, Alert.id, cursor, limit))
+    items, next_cursor = page_of(result.all(), limit, Alert.created_at, Alert.id)
+    link_next(request, response, next_cursor)
+    return CursorPage(items=items, next_cursor=next_cursor)
+
+
+@router.get("/{alert_id}", response_model=AlertResponse)
+async def get_alert(
+    alert_id: int,
+    db: AsyncSession = Depends(get_db),
+):
+    """Get alert with delivery progress (public)."""
+    alert = await db.scalar(select(Alert).where(Alert.id == alert_id))
+    if not alert:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    return alert
 
 
 @router.post("/{alert_id}/send", response_model=AlertResponse)
 async def send_alert(
     alert_id: int,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+    admin: CurrentUser = Depends(get_current_admin),
 ):
-    """Send scheduled alert."""
-    alert = db.query(Alert).filter(Alert.id == alert_id).first()
+    """Send scheduled alert; notifications are written by a worker."""
+    alert = await db.scalar(select(Alert).where(Alert.id == alert_id))
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
     
@@ -94,8 +125,8 @@ async def send_alert(
             detail="Alert already sent"
         )
     
-    alert.sent_at = datetime.utcnow()
-    fan_out_notifications(db, alert)
-    db.commit()
-    db.refresh(alert)
+    mark_queued(alert)
+    await db.commit()
+    await db.refresh(alert)
+    await run_in_threadpool(enqueue_delivery, alert.id)
     return alert
@@ -1,27 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 from app.db.dependencies import get_db
+from app.core.dependencies import CurrentUser, get_current_user, invalidate_user
 from app.schemas.auth import LoginRequest, TokenResponse, RefreshRequest
 from app.models.user import User
 from app.core.security import (
     create_access_token,
     create_refresh_token,
     verify_refresh_token,
-    get_password_hash,
+    hash_refresh_token,
+    refresh_token_matches,
+    new_token_family,
 )
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 limiter = Limiter(key_func=get_remote_address)
+logger = logging.getLogger(__name__)
 
 
 @router.post("/login", response_model=TokenResponse)
 @limiter.limit("5/minute")
-async def login(request: LoginRequest, db: Session = Depends(get_db)):
+async def login(
+    request: Request,
+    credentials: LoginRequest,
+    db: AsyncSession = Depends(get_db),
+):
     """Login using contact number."""
-    user = db.query(User).filter(User.contact_number == request.contact_number).first()
+    user = await db.scalar(
+        select(User).where(User.contact_number == credentials.contact_number)
+    )
     
     if not user:
         raise HTTPException(
@@ -35,11 +48,14 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
             detail="Account is not active",
         )
     
+    # A new login starts a new refresh-token family, replacing any previous one
+    family = new_token_family()
     access_token = create_access_token(data={"sub": str(user.id), "role": user.role})
-    refresh_token = create_refresh_token(data={"sub": str(user.id)})
+    refresh_token = create_refresh_token(data={"sub": str(user.id), "fam": family})
     
-    user.hashed_refresh_token = get_password_hash(refresh_token)
-    db.commit()
+    user.hashed_refresh_token = hash_refresh_token(refresh_token)
+    user.refresh_token_family = family
+    await db.commit()
     
     return TokenResponse(
         access_token=access_token,
@@ -48,8 +64,12 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/refresh", response_model=TokenResponse)
-async def refresh(request: RefreshRequest, db: Session = Depends(get_db)):
-    """Refresh access token using refresh token."""
+async def refresh(request: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """Rotate the refresh token and issue a new access token.
+
+    Presenting an already-rotated token from the current family means the
+    token was copied; the whole family is revoked and the user must log in.
+    """
     payload = verify_refresh_token(request.refresh_token, db)
     
     if not payload:
@@ -59,19 +79,38 @@ async def refresh(request: RefreshRequest, db: Session = Depends(get_db)):
         )
     
     user_id = payload.get("sub")
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await db.scalar(
+        select(User).where(User.id == int(user_id)).with_for_update()
+    )
     
-    if not user or not user.hashed_refresh_token:
+    if (
+        not user
+        or user.status != "active"
+        or not user.refresh_token_family
+        or payload.get("fam") != user.refresh_token_family
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid refresh token",
         )
     
+    if not refresh_token_matches(request.refresh_token, user.hashed_refresh_token):
+        logger.warning(f"Refresh token reuse detected for user {user.id}; revoking family")
+        user.hashed_refresh_token = None
+        user.refresh_token_family = None
+        await db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token reuse detected",
+        )
+    
     access_token = create_access_token(data={"sub": str(user.id), "role": user.role})
-    refresh_token = create_refresh_token(data={"sub": str(user.id)})
+    refresh_token = create_refresh_token(
+        data={"sub": str(user.id), "fam": user.refresh_token_family}
+    )
     
-    user.hashed_refresh_token = get_password_hash(refresh_token)
-    db.commit()
+    user.hashed_refresh_token = hash_refresh_token(refresh_token)
+    await db.commit()
     
     return TokenResponse(
         access_token=access_token,
@@ -80,12 +119,17 @@ async def refresh(request: RefreshRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/logout")
-async def logout(db: Session = Depends(get_db), user_id: int = Depends(lambda: 1)):
+async def logout(
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
     """Logout by invalidating refresh token."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == current_user.id))
     
     if user:
         user.hashed_refresh_token = None
-        db.commit()
+        user.refresh_token_family = None
+        await db.commit()
+    invalidate_user(current_user.id)
     
     return {"message": "Logged out successfully"}
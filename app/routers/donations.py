@@ -1,54 +1,136 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from datetime import date
+import io
 
 from app.db.dependencies import get_db
-from app.core.dependencies import get_current_admin
-from app.models.user import User
+from app.core.dependencies import CurrentUser, get_current_admin
+from app.core.report_cache import DONATIONS, DONORS, report_cache
 from app.models.donor import DonorProfile
 from app.models.donation import Donation, BloodRequest
+from app.models.user import User, UserStatus
+from app.services.donation_import import import_donations
+from app.services.donation_service import donation_added
+from app.services.matching_service import COMPATIBLE_DONORS, match_query
+from app.services.report_service import (
+    AVAILABLE_DONORS,
+    TOTAL_DONATIONS,
+    adjust_counters,
+    availability_delta,
+    rollup_increment,
+)
+from app.utils.export import export_response
+from app.utils.pagination import keyset, link_next, page_of
 from app.schemas.donation import (
     DonationCreate,
+    DonationImportResult,
     DonationResponse,
     BloodRequestCreate,
+    BloodRequestMatches,
     BloodRequestResponse,
 )
+from app.schemas.pagination import CursorPage
 
 router = APIRouter()
 
+EXPORT_COLUMNS = (
+    Donation.id,
+    Donation.donor_profile_id,
+    Donation.donation_date,
+    Donation.blood_type,
+    Donation.units,
+    Donation.location,
+    Donation.created_at,
+)
+
+
+def donation_filters(
+    start_date: Optional[date], end_date: Optional[date], blood_type: Optional[str]
+) -> list:
+    """Filters shared by the donation list and export."""
+    filters = []
+    if start_date:
+        filters.append(Donation.donation_date >= start_date)
+    if end_date:
+        filters.append(Donation.donation_date <= end_date)
+    if blood_type:
+        filters.append(Donation.blood_type == blood_type)
+    return filters
+
 
-@router.get("/donations", response_model=List[DonationResponse])
+@router.get("/donations", response_model=CursorPage[DonationResponse])
 async def list_donations(
+    request: Request,
+    response: Response,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     blood_type: Optional[str] = None,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_current_admin),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    admin: CurrentUser = Depends(get_current_admin),
 ):
-    """List donations with filters."""
-    query = db.query(Donation)
+    """List donations with filters, latest donation date first, one page at a time."""
+    query = select(Donation).where(*donation_filters(start_date, end_date, blood_type))
     
-    if start_date:
-        query = query.filter(Donation.donation_date >= start_date)
-    if end_date:
-        query = query.filter(Donation.donation_date <= end_date)
-    if blood_type:
-        query = query.filter(Donation.blood_type == blood_type)
-    
-    return query.order_by(Donation.donation_date.desc()).all()
+    result = await db.scalars(keyset(query, Donation.donation_date, Donation.id, cursor, limit))
+    items, next_cursor = page_of(result.all(), limit, Donation.donation_date, Donation.id)
+    link_next(request, response, next_cursor)
+    return CursorPage(items=items, next_cursor=next_cursor)
+
+
+@router.get("/donations/export")
+async def export_donations(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    blood_type: Optional[str] = None,
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    admin: CurrentUser = Depends(get_current_admin),
+):
+    """Stream donation history as CSV or NDJSON (admin only)."""
+    query = (
+        select(*EXPORT_COLUMNS)
+        .where(*donation_filters(start_date, end_date, blood_type))
+        .order_by(Donation.id)
+    )
+    return export_response(query, [column.key for column in EXPORT_COLUMNS], fmt, "donations")
+
+
+@router.post("/donations/import", response_model=DonationImportResult)
+async def import_donation_file(
+    file: UploadFile = File(...),
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    db: AsyncSession = Depends(get_db),
+    admin: CurrentUser = Depends(get_current_admin),
+):
+    """Record donations from a CSV or NDJSON upload, e.g. after a blood drive (admin only).
+
+    Columns are those of a single donation. Valid rows are recorded and
+    invalid ones skipped; the response lists each skipped row's errors.
+    """
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        result = await import_donations(db, stream, fmt)
+    except ValueError as exc:
+        # Undecodable text or a CSV header without the required columns
+        raise HTTPException(status_code=400, detail=f"Unreadable upload: {exc}")
+    if result["imported"]:
+        await report_cache.invalidate(DONATIONS, DONORS)
+    return result
 
 
 @router.post("/donations", response_model=DonationResponse, status_code=status.HTTP_201_CREATED)
 async def create_donation(
     donation: DonationCreate,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+    admin: CurrentUser = Depends(get_current_admin),
 ):
-    """Create donation record and update donor availability."""
-    profile = db.query(DonorProfile).filter(
-        DonorProfile.id == donation.donor_profile_id
-    ).first()
+    """Create donation record and update donor availability and donation aggregates."""
+    profile = await db.scalar(
+        select(DonorProfile).where(DonorProfile.id == donation.donor_profile_id)
+    )
     
     if not profile:
         raise HTTPException(status_code=404, detail="Donor profile not found")
@@ -56,35 +138,57 @@ async def create_donation(
     db_donation = Donation(**donation.model_dump())
     db.add(db_donation)
     
+    user_status = await db.scalar(select(User.status).where(User.id == profile.user_id))
+    available_delta = 0
+    if user_status == UserStatus.ACTIVE:
+        available_delta = availability_delta(profile.availability, "recently_donated")
     profile.availability = "recently_donated"
+    for column, value in donation_added(donation.donation_date, donation.units).items():
+        setattr(profile, column, value)
     
-    db.commit()
-    db.refresh(db_donation)
+    await db.execute(adjust_counters(**{TOTAL_DONATIONS: 1, AVAILABLE_DONORS: available_delta}))
+    await db.execute(rollup_increment(
+        db.get_bind().dialect.name,
+        donation.donation_date,
+        donation.blood_type,
+        donation.location,
+        donation.units,
+    ))
+    await db.commit()
+    await report_cache.invalidate(DONATIONS, DONORS)
+    await db.refresh(db_donation)
     return db_donation
 
 
-@router.get("/requests", response_model=List[BloodRequestResponse])
+@router.get("/requests", response_model=CursorPage[BloodRequestResponse])
 async def list_requests(
+    request: Request,
+    response: Response,
     blood_type: Optional[str] = None,
     urgency: Optional[str] = None,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
 ):
-    """List blood requests with filters."""
-    query = db.query(BloodRequest)
+    """List blood requests with filters, newest first, one page at a time."""
+    query = select(BloodRequest)
     
     if blood_type:
-        query = query.filter(BloodRequest.blood_type == blood_type)
+        query = query.where(BloodRequest.blood_type == blood_type)
     if urgency:
-        query = query.filter(BloodRequest.urgency == urgency)
+        query = query.where(BloodRequest.urgency == urgency)
     
-    return query.order_by(BloodRequest.created_at.desc()).all()
+    result = await db.scalars(keyset(query, BloodRequest.created_at, BloodRequest.id, cursor, limit))
+    items, next_cursor = page_of(result.all(), limit, BloodRequest.created_at, BloodRequest.id)
+    link_next(request, response, next_cursor)
+    return CursorPage(items=items, next_cursor=next_cursor)
 
 
 @router.post("/requests", response_model=BloodRequestResponse, status_code=status.HTTP_201_CREATED)
 async def create_request(
     request: BloodRequestCreate,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+    admin: CurrentUser = Depends(get_current_admin),
 ):
     """Create blood request."""
     db_request = BloodRequest(
@@ -92,6 +196,34 @@ async def create_request(
         created_by=admin.id
     )
     db.add(db_request)
-    db.commit()
-    db.refresh(db_request)
+    await db.commit()
+    await db.refresh(db_request)
     return db_request
+
+
+@router.get("/requests/{request_id}/matches", response_model=BloodRequestMatches)
+async def match_request(
+    request_id: int,
+    municipality: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    admin: CurrentUser = Depends(get_current_admin),
+):
+    """Available donors compatible with a blood request, best first (admin only).
+
+    Exact blood type ranks first, then donors in `municipality` (the
+    hospital's, when given), then the latest donation; donors with none
+    on record come last.
+    """
+    blood_request = await db.scalar(select(BloodRequest).where(BloodRequest.id == request_id))
+    if not blood_request:
+        raise HTTPException(status_code=404, detail="Blood request not found")
+
+    recipient = blood_request.blood_type.value
+    rows = (await db.execute(match_query(recipient, municipality, limit))).mappings().all()
+    return BloodRequestMatches(
+        request_id=blood_request.id,
+        blood_type=recipient,
+        compatible_blood_types=list(COMPATIBLE_DONORS[recipient]),
+        matches=[dict(row) for row in rows],
+    )
@@ -1,17 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from typing import List
+from typing import Optional
 
 from app.db.dependencies import get_db
-from app.core.dependencies import get_current_user, get_current_admin
-from app.models.user import User, UserRole
+from app.core.dependencies import CurrentUser, get_current_user, get_current_admin
+from app.core.report_cache import DONORS, report_cache
+from app.models.user import User, UserRole, UserStatus
 from app.models.donor import DonorRegistration, DonorProfile
 from app.schemas.donor import (
     DonorRegistrationCreate,
     DonorRegistrationResponse,
     DonorRegistrationReview,
 )
+from app.schemas.pagination import CursorPage
+from app.services.donor_search import Suggestion, donor_suggest
+from app.services.report_service import (
+    AVAILABLE_DONORS,
+    TOTAL_DONORS,
+    adjust_counters,
+    availability_delta,
+)
+from app.utils.pagination import keyset, link_next, page_of
 
 router = APIRouter()
 
@@ -19,14 +30,16 @@ router = APIRouter()
 @router.post("", response_model=DonorRegistrationResponse, status_code=status.HTTP_201_CREATED)
 async def create_registration(
     registration: DonorRegistrationCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Create donor registration (public endpoint)."""
     # Check for any existing PENDING registration with the same contact number
-    existing_pending = db.query(DonorRegistration).filter(
-        DonorRegistration.contact_number == registration.contact_number,
-        DonorRegistration.status == "pending"
-    ).first()
+    existing_pending = await db.scalar(
+        select(DonorRegistration).where(
+            DonorRegistration.contact_number == registration.contact_number,
+            DonorRegistration.status == "pending"
+        )
+    )
 
     if existing_pending:
         raise HTTPException(
@@ -37,18 +50,20 @@ async def create_registration(
     try:
         db_registration = DonorRegistration(**registration.model_dump())
         db.add(db_registration)
-        db.commit()
-        db.refresh(db_registration)
+        await db.commit()
+        await db.refresh(db_registration)
         return db_registration
     except IntegrityError as e:
-        db.rollback()  # Rollback the transaction on error
+        await db.rollback()  # Rollback the transaction on error
         # Check if this is a unique constraint violation
         if 'contact_number' in str(e.orig).lower() or 'unique constraint' in str(e.orig).lower():
             # Check if there's already a pending registration (double-check)
-            existing_pending = db.query(DonorRegistration).filter(
-                DonorRegistration.contact_number == registration.contact_number,
-                DonorRegistration.status == "pending"
-            ).first()
+            existing_pending = await db.scalar(
+                select(DonorRegistration).where(
+                    DonorRegistration.contact_number == registration.contact_number,
+                    DonorRegistration.status == "pending"
+                )
+            )
             
             if existing_pending:
                 raise HTTPException(
@@ -68,35 +83,44 @@ async def create_registration(
                 detail=f"Database constraint violation: {str(e.orig)}"
             )
     except Exception as e:
-        db.rollback()  # Rollback the transaction on error
+        await db.rollback()  # Rollback the transaction on error
         # Re-raise the exception to be handled by the global exception handler
         raise e
 
 
-@router.get("", response_model=List[DonorRegistrationResponse])
+@router.get("", response_model=CursorPage[DonorRegistrationResponse])
 async def list_registrations(
+    request: Request,
+    response: Response,
     status_filter: str = None,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_current_admin),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    admin: CurrentUser = Depends(get_current_admin),
 ):
-    """List all registrations (admin only)."""
-    query = db.query(DonorRegistration)
+    """List registrations, newest first, one page at a time (admin only)."""
+    query = select(DonorRegistration)
     if status_filter:
-        query = query.filter(DonorRegistration.status == status_filter)
-    return query.order_by(DonorRegistration.created_at.desc()).all()
+        query = query.where(DonorRegistration.status == status_filter)
+    result = await db.scalars(
+        keyset(query, DonorRegistration.created_at, DonorRegistration.id, cursor, limit)
+    )
+    items, next_cursor = page_of(result.all(), limit, DonorRegistration.created_at, DonorRegistration.id)
+    link_next(request, response, next_cursor)
+    return CursorPage(items=items, next_cursor=next_cursor)
 
 
 @router.patch("/{registration_id}", response_model=DonorRegistrationResponse)
 async def review_registration(
     registration_id: int,
     review: DonorRegistrationReview,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+    admin: CurrentUser = Depends(get_current_admin),
 ):
     """Review registration (admin only)."""
-    registration = db.query(DonorRegistration).filter(
-        DonorRegistration.id == registration_id
-    ).first()
+    registration = await db.scalar(
+        select(DonorRegistration).where(DonorRegistration.id == registration_id)
+    )
     
     if not registration:
         raise HTTPException(status_code=404, detail="Registration not found")
@@ -114,7 +138,9 @@ async def review_registration(
     registration.reviewed_at = datetime.utcnow()
     
     if review.status == "approved":
-        user = db.query(User).filter(User.contact_number == registration.contact_number).first()
+        user = await db.scalar(
+            select(User).where(User.contact_number == registration.contact_number)
+        )
         if not user:
             user = User(
                 full_name=registration.full_name,
@@ -123,7 +149,7 @@ async def review_registration(
                 role=UserRole.DONOR,
             )
             db.add(user)
-            db.flush()
+            await db.flush()
         
         profile = DonorProfile(
             user_id=user.id,
@@ -134,7 +160,18 @@ async def review_registration(
             availability=registration.availability,
         )
         db.add(profile)
+        
+        if user.status == UserStatus.ACTIVE:
+            await db.execute(adjust_counters(**{
+                TOTAL_DONORS: 1,
+                AVAILABLE_DONORS: availability_delta("unavailable", registration.availability),
+            }))
     
-    db.commit()
-    db.refresh(registration)
+    await db.commit()
+    if review.status == "approved":
+        await report_cache.invalidate(DONORS)
+        donor_suggest.upsert(Suggestion(
+            profile.id, user.full_name, user.contact_number, profile.blood_type, profile.municipality
+        ))
+    await db.refresh(registration)
     return registration
@@ -1,52 +1,199 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from typing import List, Optional, Tuple
+from datetime import datetime
 
 from app.db.dependencies import get_db
-from app.core.dependencies import get_current_admin
-from app.models.user import User
+from app.core.dependencies import CurrentUser, get_current_admin, invalidate_user
+from app.core.report_cache import DONORS, report_cache
+from app.models.user import User, UserStatus
 from app.models.donor import DonorProfile
-from app.schemas.donor_profile import DonorProfileResponse, DonorAvailabilityUpdate, DonorUpdate
+from app.utils.export import export_response
+from app.utils.pagination import keyset, link_next, page_of
+from app.utils.query_plan import estimate_rows
+from app.schemas.donor_profile import (
+    DonorAvailabilityUpdate,
+    DonorProfileResponse,
+    DonorSuggestion,
+    DonorUpdate,
+)
+from app.schemas.pagination import CursorPage
+from app.services.donation_service import eligible_filters
+from app.services.donor_search import Suggestion, contact_digits, donor_suggest
+from app.services.report_service import (
+    AVAILABLE_DONORS,
+    TOTAL_DONORS,
+    adjust_counters,
+    availability_delta,
+)
 
 router = APIRouter()
 
+EXPORT_COLUMNS = (
+    DonorProfile.id,
+    DonorProfile.user_id,
+    User.full_name,
+    User.contact_number,
+    User.email,
+    DonorProfile.age,
+    DonorProfile.blood_type,
+    DonorProfile.municipality,
+    DonorProfile.availability,
+    DonorProfile.last_donation_date,
+    DonorProfile.next_eligible_date,
+    DonorProfile.donation_count,
+    DonorProfile.total_units,
+    DonorProfile.created_at,
+    DonorProfile.updated_at,
+)
 
-@router.get("", response_model=List[DonorProfileResponse])
+
+def donor_filters(
+    blood_type: Optional[str],
+    municipality: Optional[str],
+    availability: Optional[str],
+    search: Optional[str],
+    eligible: Optional[bool] = None,
+) -> list:
+    """Filters shared by the donor list and export.
+
+    Both search forms are substring matches the pg_trgm GIN indexes on
+    users serve (migration 017). Eligible donors are read off the
+    ix_donor_profiles_eligible partial index.
+    """
+    filters = eligible_filters(eligible)
+    if blood_type:
+        filters.append(DonorProfile.blood_type == blood_type)
+    if municipality:
+        filters.append(DonorProfile.municipality == municipality)
+    if availability:
+        filters.append(DonorProfile.availability == availability)
+    if search:
+        digits = contact_digits(search)
+        if digits:
+            filters.append(User.contact_number.contains(digits, autoescape=True))
+        else:
+            filters.append(User.full_name.icontains(search, autoescape=True))
+    return filters
+
+
+def relevance_order(dialect_name: str, search: str) -> tuple:
+    """ORDER BY for `order=relevance`: best match first, then newest."""
+    digits = contact_digits(search)
+    if digits:
+        rank = case(
+            (User.contact_number.startswith(f"0{digits}", autoescape=True), 0),
+            (User.contact_number.startswith(f"+63{digits}", autoescape=True), 0),
+            else_=1,
+        )
+    elif dialect_name == "postgresql":
+        rank = func.similarity(User.full_name, search).desc()
+    else:
+        # No trigram similarity: names starting with the search rank first
+        rank = case((func.lower(User.full_name).startswith(search.lower(), autoescape=True), 0), else_=1)
+    return rank, DonorProfile.created_at.desc(), DonorProfile.id.desc()
+
+
+def donor_count_query(filters: list, search: Optional[str]) -> Select:
+    query = select(func.count()).select_from(DonorProfile)
+    if search:
+        # Only the search reads users; every profile has exactly one
+        query = query.join(User, DonorProfile.user_id == User.id)
+    return query.where(*filters)
+
+
+async def donor_total(
+    db: AsyncSession,
+    mode: str,
+    blood_type: Optional[str],
+    municipality: Optional[str],
+    availability: Optional[str],
+    search: Optional[str],
+    eligible: Optional[bool] = None,
+) -> Tuple[int, str]:
+    """Number of donors the list filters match, and whether it is exact or an estimate."""
+    filters = donor_filters(blood_type, municipality, availability, search, eligible)
+    if mode == "estimate" and search:
+        # A free-text search costs as much to count as to list and rarely
+        # repeats, so a cached count seldom helps; the planner's guess is free
+        estimate = await estimate_rows(
+            db, select(DonorProfile.id).join(User, DonorProfile.user_id == User.id).where(*filters)
+        )
+        if estimate is not None:
+            return estimate, "estimate"
+    total, _ = await report_cache.lookup(
+        "donor-count",
+        {
+            "blood_type": blood_type,
+            "municipality": municipality,
+            "availability": availability,
+            "search": search,
+            # Eligibility moves with the date as well as with donor writes
+            "eligible": eligible,
+            "day": datetime.utcnow().date().isoformat() if eligible is not None else None,
+        },
+        (DONORS,),
+        lambda: db.scalar(donor_count_query(filters, search)),
+    )
+    return total, "exact"
+
+
+@router.get("", response_model=CursorPage[DonorProfileResponse])
 async def list_donors(
+    request: Request,
+    response: Response,
     blood_type: Optional[str] = None,
     municipality: Optional[str] = None,
     availability: Optional[str] = None,
     search: Optional[str] = None,
-    skip: int = Query(0, ge=0),
+    eligible: Optional[bool] = None,
+    cursor: Optional[str] = None,
     limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db),
+    total: Optional[str] = Query(None, pattern="^(exact|estimate)$"),
+    order: str = Query("newest", pattern="^(newest|relevance)$"),
+    db: AsyncSession = Depends(get_db),
 ):
-    """List donors with filters and pagination."""
-    query = db.query(
+    """List donors with filters, newest first, one page at a time.
+
+    A search matches names, or contact numbers when it is made only of
+    digits and phone punctuation. `eligible=true` keeps donors who are
+    available and past their deferral after a donation (`false`: the
+    rest). `order=relevance` ranks a search's matches by trigram
+    similarity (PostgreSQL) and returns the best `limit` as a single page.
+
+    With `total`, X-Total-Count carries the number of matching donors:
+    `exact` is a count cached until the next donor write, `estimate` uses
+    the query planner's row estimate for searches (PostgreSQL; exact
+    elsewhere). X-Total-Count-Mode says which one was served.
+    """
+    query = select(
         DonorProfile,
         User.full_name,
         User.contact_number,
         User.email
-    ).join(User, DonorProfile.user_id == User.id)
+    ).join(User, DonorProfile.user_id == User.id).where(
+        *donor_filters(blood_type, municipality, availability, search, eligible)
+    )
     
-    if blood_type:
-        query = query.filter(DonorProfile.blood_type == blood_type)
-    if municipality:
-        query = query.filter(DonorProfile.municipality == municipality)
-    if availability:
-        query = query.filter(DonorProfile.availability == availability)
-    if search:
-        query = query.filter(
-            or_(
-                User.full_name.ilike(f"%{search}%"),
-                User.contact_number.ilike(f"%{search}%")
-            )
+    if order == "relevance":
+        if not search:
+            raise HTTPException(status_code=400, detail="order=relevance requires a search")
+        ranked = query.order_by(*relevance_order(db.get_bind().dialect.name, search)).limit(limit)
+        results, next_cursor = (await db.execute(ranked)).all(), None
+    else:
+        rows = (await db.execute(keyset(query, DonorProfile.created_at, DonorProfile.id, cursor, limit))).all()
+        results, next_cursor = page_of(
+            rows, limit, DonorProfile.created_at, DonorProfile.id, entity=lambda row: row.DonorProfile
         )
+    link_next(request, response, next_cursor)
+    if total:
+        count, mode = await donor_total(db, total, blood_type, municipality, availability, search, eligible)
+        response.headers["X-Total-Count"] = str(count)
+        response.headers["X-Total-Count-Mode"] = mode
     
-    results = query.offset(skip).limit(limit).all()
-    
-    return [
+    items = [
         DonorProfileResponse(
             id=profile.id,
             user_id=profile.user_id,
@@ -57,24 +204,64 @@ async def list_donors(
             blood_type=profile.blood_type,
             municipality=profile.municipality,
             availability=profile.availability,
+            last_donation_date=profile.last_donation_date,
+            next_eligible_date=profile.next_eligible_date,
+            donation_count=profile.donation_count,
+            total_units=profile.total_units,
             created_at=profile.created_at,
             updated_at=profile.updated_at,
         )
         for profile, full_name, contact_number, email in results
     ]
+    return CursorPage(items=items, next_cursor=next_cursor)
+
+
+@router.get("/export")
+async def export_donors(
+    blood_type: Optional[str] = None,
+    municipality: Optional[str] = None,
+    availability: Optional[str] = None,
+    search: Optional[str] = None,
+    eligible: Optional[bool] = None,
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    admin: CurrentUser = Depends(get_current_admin),
+):
+    """Stream the donor directory as CSV or NDJSON (admin only)."""
+    query = (
+        select(*EXPORT_COLUMNS)
+        .join(User, DonorProfile.user_id == User.id)
+        .where(*donor_filters(blood_type, municipality, availability, search, eligible))
+        .order_by(DonorProfile.id)
+    )
+    return export_response(query, [column.key for column in EXPORT_COLUMNS], fmt, "donors")
+
+
+@router.get("/suggest", response_model=List[DonorSuggestion])
+async def suggest_donors(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    admin: CurrentUser = Depends(get_current_admin),
+):
+    """Typeahead: donors whose name words or contact number start with `q` (admin only)."""
+    suggestions = await donor_suggest.suggest(q, limit)
+    if not donor_suggest.ready:
+        raise HTTPException(status_code=503, detail="Donor suggestions are unavailable")
+    return [suggestion._asdict() for suggestion in suggestions]
 
 
 @router.get("/{donor_id}", response_model=DonorProfileResponse)
-async def get_donor(donor_id: int, db: Session = Depends(get_db)):
+async def get_donor(donor_id: int, db: AsyncSession = Depends(get_db)):
     """Get donor by ID."""
-    result = db.query(
-        DonorProfile,
-        User.full_name,
-        User.contact_number,
-        User.email
-    ).join(User, DonorProfile.user_id == User.id).filter(
-        DonorProfile.id == donor_id
-    ).first()
+    result = (await db.execute(
+        select(
+            DonorProfile,
+            User.full_name,
+            User.contact_number,
+            User.email
+        ).join(User, DonorProfile.user_id == User.id).where(
+            DonorProfile.id == donor_id
+        )
+    )).first()
     
     if not result:
         raise HTTPException(status_code=404, detail="Donor not found")
@@ -90,6 +277,10 @@ async def get_donor(donor_id: int, db: Session = Depends(get_db)):
         blood_type=profile.blood_type,
         municipality=profile.municipality,
         availability=profile.availability,
+        last_donation_date=profile.last_donation_date,
+        next_eligible_date=profile.next_eligible_date,
+        donation_count=profile.donation_count,
+        total_units=profile.total_units,
         created_at=profile.created_at,
         updated_at=profile.updated_at,
     )
@@ -99,11 +290,11 @@ async def get_donor(donor_id: int, db: Session = Depends(get_db)):
 async def update_donor(
     donor_id: int,
     update: DonorUpdate,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+    admin: CurrentUser = Depends(get_current_admin),
 ):
     """Update donor profile (admin only)."""
-    profile = db.query(DonorProfile).filter(DonorProfile.id == donor_id).first()
+    profile = await db.scalar(select(DonorProfile).where(DonorProfile.id == donor_id))
     if not profile:
         raise HTTPException(status_code=404, detail="Donor not found")
     
@@ -112,41 +303,59 @@ async def update_donor(
     if update.municipality is not None:
         profile.municipality = update.municipality
     
-    db.commit()
-    return await get_donor(donor_id, db)
+    await db.commit()
+    await report_cache.invalidate(DONORS)
+    donor = await get_donor(donor_id, db)
+    donor_suggest.upsert(Suggestion(
+        donor.id, donor.full_name, donor.contact_number, donor.blood_type, donor.municipality
+    ))
+    return donor
 
 
 @router.patch("/{donor_id}/availability", response_model=DonorProfileResponse)
 async def update_availability(
     donor_id: int,
     update: DonorAvailabilityUpdate,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+    admin: CurrentUser = Depends(get_current_admin),
 ):
     """Update donor availability (admin only)."""
-    profile = db.query(DonorProfile).filter(DonorProfile.id == donor_id).first()
+    profile = await db.scalar(select(DonorProfile).where(DonorProfile.id == donor_id))
     if not profile:
         raise HTTPException(status_code=404, detail="Donor not found")
     
+    user_status = await db.scalar(select(User.status).where(User.id == profile.user_id))
+    if user_status == UserStatus.ACTIVE:
+        delta = availability_delta(profile.availability, update.availability)
+        await db.execute(adjust_counters(**{AVAILABLE_DONORS: delta}))
     profile.availability = update.availability
-    db.commit()
+    await db.commit()
+    await report_cache.invalidate(DONORS)
     return await get_donor(donor_id, db)
 
 
 @router.delete("/{donor_id}")
 async def delete_donor(
     donor_id: int,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+    admin: CurrentUser = Depends(get_current_admin),
 ):
     """Soft delete donor (admin only)."""
-    profile = db.query(DonorProfile).filter(DonorProfile.id == donor_id).first()
+    profile = await db.scalar(select(DonorProfile).where(DonorProfile.id == donor_id))
     if not profile:
         raise HTTPException(status_code=404, detail="Donor not found")
     
-    user = db.query(User).filter(User.id == profile.user_id).first()
+    user = await db.scalar(select(User).where(User.id == profile.user_id))
+    if user and user.status == UserStatus.ACTIVE:
+        await db.execute(adjust_counters(**{
+            TOTAL_DONORS: -1,
+            AVAILABLE_DONORS: availability_delta(profile.availability, "unavailable"),
+        }))
     if user:
-        user.status = "inactive"
+        user.status = UserStatus.INACTIVE
     
-    db.commit()
+    await db.commit()
+    await report_cache.invalidate(DONORS)
+    invalidate_user(profile.user_id)
+    donor_suggest.remove(profile.id)
     return {"message": "Donor deleted successfully"}
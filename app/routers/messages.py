@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
 from app.db.dependencies import get_db
-from app.core.dependencies import get_current_user, get_current_admin
-from app.models.user import User
+from app.core.dependencies import CurrentUser, get_current_user, get_current_admin
 from app.models.donor import DonorProfile
 from app.models.message import Message
 from app.schemas.message import MessageCreate, MessageResponse
+from app.schemas.pagination import CursorPage
+from app.utils.pagination import keyset, link_next, page_of
 
 router = APIRouter()
 
@@ -15,13 +17,13 @@ router = APIRouter()
 @router.post("", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
 async def create_message(
     message: MessageCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """Create message (donor to admin)."""
-    profile = db.query(DonorProfile).filter(
-        DonorProfile.user_id == current_user.id
-    ).first()
+    profile = await db.scalar(
+        select(DonorProfile).where(DonorProfile.user_id == current_user.id)
+    )
     
     if not profile:
         raise HTTPException(
@@ -35,36 +37,43 @@ async def create_message(
         content=message.content,
     )
     db.add(db_message)
-    db.commit()
-    db.refresh(db_message)
+    await db.commit()
+    await db.refresh(db_message)
     return db_message
 
 
-@router.get("", response_model=List[MessageResponse])
+@router.get("", response_model=CursorPage[MessageResponse])
 async def list_messages(
+    request: Request,
+    response: Response,
     is_closed: bool = None,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_current_admin),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    admin: CurrentUser = Depends(get_current_admin),
 ):
-    """List all messages (admin only)."""
-    query = db.query(Message)
+    """List messages, newest first, one page at a time (admin only)."""
+    query = select(Message)
     if is_closed is not None:
-        query = query.filter(Message.is_closed == is_closed)
-    return query.order_by(Message.created_at.desc()).all()
+        query = query.where(Message.is_closed == is_closed)
+    result = await db.scalars(keyset(query, Message.created_at, Message.id, cursor, limit))
+    items, next_cursor = page_of(result.all(), limit, Message.created_at, Message.id)
+    link_next(request, response, next_cursor)
+    return CursorPage(items=items, next_cursor=next_cursor)
 
 
 @router.patch("/{message_id}/close", response_model=MessageResponse)
 async def close_message(
     message_id: int,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+    admin: CurrentUser = Depends(get_current_admin),
 ):
     """Close message (admin only)."""
-    message = db.query(Message).filter(Message.id == message_id).first()
+    message = await db.scalar(select(Message).where(Message.id == message_id))
     if not message:
         raise HTTPException(status_code=404, detail="Message not found")
     
     message.is_closed = True
-    db.commit()
-    db.refresh(message)
+    await db.commit()
+    await db.refresh(message)
     return message
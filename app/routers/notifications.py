@@ -1,98 +1,208 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import AsyncIterator, Optional
 
 from app.db.dependencies import get_db
-from app.core.dependencies import get_current_user
-from app.models.user import User
-from app.models.notification import Notification
+from app.db.session import AsyncSessionLocal
+from app.core.config import settings
+from app.core.dependencies import CurrentUser, get_current_user
+from app.core.pubsub import notification_bus
+from app.models.notification import Notification, NotificationInbox
 from app.schemas.notification import NotificationResponse
+from app.schemas.pagination import CursorPage
+from app.services.alert_service import merge_broadcasts
+from app.services.notification_service import (
+    inbox_query,
+    inbox_state_query,
+    is_unread,
+    read_all,
+    unread_count_query,
+)
+from app.utils.pagination import link_next, page_of
 
 router = APIRouter()
 
 
-@router.get("", response_model=List[NotificationResponse])
+def notification_response(
+    notification: Notification, inbox: Optional[NotificationInbox]
+) -> NotificationResponse:
+    """Response for a notification loaded with its alert, read state per the inbox watermark."""
+    alert = notification.alert
+    return NotificationResponse(
+        id=notification.id,
+        user_id=notification.user_id,
+        title=notification.title if notification.title is not None else alert.title,
+        message=notification.message if notification.message is not None else alert.message,
+        notification_type=notification.notification_type,
+        is_read=not is_unread(notification, inbox),
+        alert_id=notification.alert_id,
+        created_at=notification.created_at,
+    )
+
+
+@router.get("", response_model=CursorPage[NotificationResponse])
 async def list_notifications(
+    request: Request,
+    response: Response,
     notification_type: Optional[str] = None,
     is_read: Optional[bool] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    """List user notifications."""
-    query = db.query(Notification).filter(Notification.user_id == current_user.id)
-    
-    if notification_type:
-        query = query.filter(Notification.notification_type == notification_type)
-    if is_read is not None:
-        query = query.filter(Notification.is_read == is_read)
-    
-    return query.order_by(Notification.created_at.desc()).all()
+    """List user notifications, newest first, one page at a time."""
+    if not cursor:
+        # Merged on the first page only, so pages already handed out do not shift
+        await merge_broadcasts(db, current_user.id)
+    inbox = await db.scalar(inbox_state_query(current_user.id))
+    last_read_at = inbox.last_read_at if inbox else None
+    result = await db.scalars(
+        inbox_query(current_user.id, notification_type, is_read, cursor, limit, last_read_at)
+    )
+    items, next_cursor = page_of(result.all(), limit, Notification.created_at, Notification.id)
+    link_next(request, response, next_cursor)
+    return CursorPage(items=[notification_response(item, inbox) for item in items], next_cursor=next_cursor)
 
 
 @router.get("/unread-count")
 async def get_unread_count(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    """Get unread notification count."""
-    count = db.query(func.count(Notification.id)).filter(
-        Notification.user_id == current_user.id,
-        Notification.is_read == False
-    ).scalar()
+    """Get unread notification count, as maintained on the user's inbox row."""
+    await merge_broadcasts(db, current_user.id)
+    count = await db.scalar(unread_count_query(current_user.id))
     return {"unread_count": count}
 
 
+async def event_stream(user_id: int) -> AsyncIterator[str]:
+    """SSE frames for one client, starting with the current unread count."""
+    hub = notification_bus.hub
+    # Subscribed before counting, so nothing published after the count is missed
+    subscription = hub.subscribe(user_id)
+    try:
+        async with AsyncSessionLocal() as db:
+            await merge_broadcasts(db, user_id)
+            unread = await db.scalar(unread_count_query(user_id))
+        yield sse_event("unread_count", {"unread_count": unread})
+        while True:
+            try:
+                event, data = await asyncio.wait_for(
+                    subscription.queue.get(), timeout=settings.notification_stream_ping_seconds
+                )
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if subscription.overflowed:
+                subscription.overflowed = False
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                yield sse_event("resync", {})
+                continue
+            yield sse_event(event, data)
+    finally:
+        hub.unsubscribe(subscription)
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.get("/stream")
+async def stream_notifications(
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """Server-Sent Events: new notifications and unread-count changes."""
+    # The request's session lives as long as the stream; hand its connection back
+    await db.close()
+    await notification_bus.start()
+    return StreamingResponse(
+        event_stream(current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def publish_unread_count(db: AsyncSession, user_id: int) -> None:
+    """Tell the user's open streams (other devices too) their new unread count."""
+    unread = await db.scalar(unread_count_query(user_id))
+    await notification_bus.apublish("unread_count", [user_id], {"unread_count": unread})
+
+
 @router.patch("/{notification_id}/read", response_model=NotificationResponse)
 async def mark_as_read(
     notification_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """Mark notification as read."""
-    notification = db.query(Notification).filter(
-        Notification.id == notification_id,
-        Notification.user_id == current_user.id
-    ).first()
-    
+    inbox = await db.scalar(inbox_state_query(current_user.id, for_update=True))
+    notification = await db.scalar(
+        select(Notification)
+        .options(joinedload(Notification.alert))
+        .where(
+            Notification.id == notification_id,
+            Notification.user_id == current_user.id
+        )
+    )
+
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
-    
+
+    was_unread = is_unread(notification, inbox)
     notification.is_read = True
-    db.commit()
-    db.refresh(notification)
-    return notification
+    if was_unread and inbox is not None:
+        inbox.unread_count = max(inbox.unread_count - 1, 0)
+    response = notification_response(notification, inbox)
+    await db.commit()
+    if was_unread:
+        await publish_unread_count(db, current_user.id)
+    return response
 
 
 @router.patch("/read-all")
 async def mark_all_as_read(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    """Mark all notifications as read."""
-    db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.is_read == False
-    ).update({"is_read": True})
-    db.commit()
+    """Mark all notifications as read by moving the user's read watermark."""
+    await db.execute(read_all(db.get_bind().dialect.name, current_user.id))
+    await db.commit()
+    await notification_bus.apublish("unread_count", [current_user.id], {"unread_count": 0})
     return {"message": "All notifications marked as read"}
 
 
 @router.delete("/{notification_id}")
 async def delete_notification(
     notification_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """Delete notification."""
-    notification = db.query(Notification).filter(
-        Notification.id == notification_id,
-        Notification.user_id == current_user.id
-    ).first()
-    
+    inbox = await db.scalar(inbox_state_query(current_user.id, for_update=True))
+    notification = await db.scalar(
+        select(Notification).where(
+            Notification.id == notification_id,
+            Notification.user_id == current_user.id
+        )
+    )
+
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
-    
-    db.delete(notification)
-    db.commit()
+
+    was_unread = is_unread(notification, inbox)
+    if was_unread and inbox is not None:
+        inbox.unread_count = max(inbox.unread_count - 1, 0)
+    await db.delete(notification)
+    await db.commit()
+    if was_unread:
+        await publish_unread_count(db, current_user.id)
     return {"message": "Notification deleted"}
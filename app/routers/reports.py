@@ -1,53 +1,54 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import date
 
 from app.db.dependencies import get_db
-from app.core.dependencies import get_current_admin
-from app.models.user import User
+from app.core.dependencies import CurrentUser, get_current_admin
+from app.core.report_cache import DONATIONS, DONORS, report_cache
 from app.models.donor import DonorProfile
-from app.models.donation import Donation
+from app.services.report_service import monthly_totals, read_counters
 
 router = APIRouter()
 
 
 @router.get("/summary")
 async def get_summary(
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+    admin: CurrentUser = Depends(get_current_admin),
 ):
     """Get summary statistics."""
-    total_donors = db.query(func.count(DonorProfile.id)).scalar()
-    available_donors = db.query(func.count(DonorProfile.id)).filter(
-        DonorProfile.availability == "available"
-    ).scalar()
-    total_donations = db.query(func.count(Donation.id)).scalar()
-    
-    return {
-        "total_donors": total_donors,
-        "available_donors": available_donors,
-        "total_donations": total_donations,
-    }
+    return await read_counters(db)
 
 
 @router.get("/blood-type-distribution")
 async def get_blood_type_distribution(
+    response: Response,
     municipality: Optional[str] = None,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+    admin: CurrentUser = Depends(get_current_admin),
 ):
     """Get blood type distribution."""
-    query = db.query(
+    return await report_cache.fetch(
+        response,
+        "blood-type-distribution",
+        {"municipality": municipality},
+        (DONORS,),
+        lambda: blood_type_distribution(db, municipality),
+    )
+
+
+async def blood_type_distribution(db: AsyncSession, municipality: Optional[str]):
+    query = select(
         DonorProfile.blood_type,
         func.count(DonorProfile.id).label("count")
     )
     
     if municipality:
-        query = query.filter(DonorProfile.municipality == municipality)
+        query = query.where(DonorProfile.municipality == municipality)
     
-    results = query.group_by(DonorProfile.blood_type).all()
+    results = (await db.execute(query.group_by(DonorProfile.blood_type))).all()
     
     return {
         "distribution": [
@@ -59,55 +60,103 @@ async def get_blood_type_distribution(
 
 @router.get("/monthly-donations")
 async def get_monthly_donations(
+    response: Response,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+    admin: CurrentUser = Depends(get_current_admin),
 ):
     """Get monthly donation statistics."""
-    query = db.query(
-        extract("year", Donation.donation_date).label("year"),
-        extract("month", Donation.donation_date).label("month"),
-        func.count(Donation.id).label("count"),
-        func.sum(Donation.units).label("total_units")
+    return await report_cache.fetch(
+        response,
+        "monthly-donations",
+        {"start_date": start_date, "end_date": end_date},
+        (DONATIONS,),
+        lambda: monthly_donations(db, start_date, end_date),
     )
+
+
+@router.get("/monthly-donations/by-blood-type")
+async def get_monthly_donations_by_blood_type(
+    response: Response,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
+    admin: CurrentUser = Depends(get_current_admin),
+):
+    """Get monthly donation statistics per blood type."""
+    return await report_cache.fetch(
+        response,
+        "monthly-donations/by-blood-type",
+        {"start_date": start_date, "end_date": end_date},
+        (DONATIONS,),
+        lambda: monthly_donations(db, start_date, end_date, "blood_type"),
+    )
+
+
+@router.get("/monthly-donations/by-location")
+async def get_monthly_donations_by_location(
+    response: Response,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
+    admin: CurrentUser = Depends(get_current_admin),
+):
+    """Get monthly donation statistics per location."""
+    return await report_cache.fetch(
+        response,
+        "monthly-donations/by-location",
+        {"start_date": start_date, "end_date": end_date},
+        (DONATIONS,),
+        lambda: monthly_donations(db, start_date, end_date, "location"),
+    )
+
+
+async def monthly_donations(
+    db: AsyncSession,
+    start_date: Optional[date],
+    end_date: Optional[date],
+    dimension: Optional[str] = None,
+):
+    results = await monthly_totals(db, start_date, end_date, dimension)
     
-    if start_date:
-        query = query.filter(Donation.donation_date >= start_date)
-    if end_date:
-        query = query.filter(Donation.donation_date <= end_date)
-    
-    results = query.group_by("year", "month").order_by("year", "month").all()
-    
-    return {
-        "monthly_data": [
-            {
-                "year": int(year),
-                "month": int(month),
-                "donation_count": count,
-                "total_units": total_units or 0
-            }
-            for year, month, count, total_units in results
-        ]
-    }
+    monthly_data = []
+    for month, key, count, total_units in results:
+        row = {"year": month.year, "month": month.month}
+        if dimension:
+            row[dimension] = key
+        row.update(donation_count=count, total_units=total_units)
+        monthly_data.append(row)
+    return {"monthly_data": monthly_data}
 
 
 @router.get("/availability-trend")
 async def get_availability_trend(
+    response: Response,
     municipality: Optional[str] = None,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+    admin: CurrentUser = Depends(get_current_admin),
 ):
     """Get donor availability trend."""
-    query = db.query(
+    return await report_cache.fetch(
+        response,
+        "availability-trend",
+        {"municipality": municipality},
+        (DONORS,),
+        lambda: availability_trend(db, municipality),
+    )
+
+
+async def availability_trend(db: AsyncSession, municipality: Optional[str]):
+    query = select(
         DonorProfile.availability,
         func.count(DonorProfile.id).label("count")
     )
     
     if municipality:
-        query = query.filter(DonorProfile.municipality == municipality)
+        query = query.where(DonorProfile.municipality == municipality)
     
-    results = query.group_by(DonorProfile.availability).all()
+    results = (await db.execute(query.group_by(DonorProfile.availability))).all()
     
     return {
         "availability": [
@@ -1,67 +1,100 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.dependencies import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import CurrentUser, get_current_user, invalidate_user
+from app.core.report_cache import DONORS, report_cache
+from app.models.donor import DonorProfile
 from app.models.user import User
 from app.schemas.user import UserResponse, UserUpdate, PreferenceUpdate
+from app.services.donor_search import Suggestion, donor_suggest
 
 router = APIRouter()
 
 
+async def load_user(db: AsyncSession, current_user: CurrentUser) -> User:
+    """Load the full User row behind the cached CurrentUser."""
+    user = await db.scalar(select(User).where(User.id == current_user.id))
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return user
+
+
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_profile(current_user: User = Depends(get_current_user)):
+async def get_current_user_profile(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
     """Get current user profile."""
-    return current_user
+    return await load_user(db, current_user)
 
 
 @router.put("/me", response_model=UserResponse)
 async def update_current_user_profile(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Update current user profile."""
+    user = await load_user(db, current_user)
     if user_update.full_name is not None:
-        current_user.full_name = user_update.full_name
+        user.full_name = user_update.full_name
     
     if user_update.contact_number is not None:
-        existing = db.query(User).filter(
-            User.contact_number == user_update.contact_number,
-            User.id != current_user.id
-        ).first()
+        existing = await db.scalar(
+            select(User).where(
+                User.contact_number == user_update.contact_number,
+                User.id != current_user.id
+            )
+        )
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Contact number already in use"
             )
-        current_user.contact_number = user_update.contact_number
+        user.contact_number = user_update.contact_number
     
     if user_update.email is not None:
-        existing = db.query(User).filter(
-            User.email == user_update.email,
-            User.id != current_user.id
-        ).first()
+        existing = await db.scalar(
+            select(User).where(
+                User.email == user_update.email,
+                User.id != current_user.id
+            )
+        )
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already in use"
             )
-        current_user.email = user_update.email
+        user.email = user_update.email
     
-    db.commit()
-    db.refresh(current_user)
-    return current_user
+    await db.commit()
+    if user_update.full_name is not None or user_update.contact_number is not None:
+        # Donor search matches names and numbers; cached totals may change
+        await report_cache.invalidate(DONORS)
+        profile = (await db.execute(
+            select(DonorProfile.id, DonorProfile.blood_type, DonorProfile.municipality)
+            .where(DonorProfile.user_id == user.id)
+        )).first()
+        if profile:
+            donor_suggest.upsert(Suggestion(
+                profile.id, user.full_name, user.contact_number, profile.blood_type, profile.municipality
+            ))
+    await db.refresh(user)
+    invalidate_user(user.id)
+    return user
 
 
 @router.put("/me/preferences", response_model=UserResponse)
 async def update_user_preferences(
     preferences: PreferenceUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Update user theme preferences."""
-    current_user.theme_preference = preferences.theme_preference
-    db.commit()
-    db.refresh(current_user)
-    return current_user
+    user = await load_user(db, current_user)
+    user.theme_preference = preferences.theme_preference
+    await db.commit()
+    await db.refresh(user)
+    return user
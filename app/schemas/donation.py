@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
 from datetime import date, datetime
 
 
@@ -7,9 +7,17 @@ class DonationCreate(BaseModel):
     donor_profile_id: int
     donation_date: date
     blood_type: str
-    units: int = 1
+    units: int = Field(1, ge=1)
     location: str
 
+    @field_validator("blood_type")
+    @classmethod
+    def validate_blood_type(cls, v: str) -> str:
+        valid = ["A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-"]
+        if v not in valid:
+            raise ValueError(f"Blood type must be one of {valid}")
+        return v
+
 
 class DonationResponse(BaseModel):
     id: int
@@ -24,6 +32,17 @@ class DonationResponse(BaseModel):
         from_attributes = True
 
 
+class DonationImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class DonationImportResult(BaseModel):
+    imported: int
+    rejected: int
+    errors: List[DonationImportError]
+
+
 class BloodRequestCreate(BaseModel):
     patient_name: str
     blood_type: str
@@ -46,3 +65,22 @@ class BloodRequestResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class DonorMatch(BaseModel):
+    id: int
+    user_id: int
+    full_name: str
+    contact_number: str
+    blood_type: str
+    municipality: str
+    last_donation_date: Optional[date] = None
+    exact_match: bool
+    local: bool
+
+
+class BloodRequestMatches(BaseModel):
+    request_id: int
+    blood_type: str
+    compatible_blood_types: List[str]
+    matches: List[DonorMatch]
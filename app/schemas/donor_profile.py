@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
 
 
 class DonorProfileResponse(BaseModel):
@@ -13,6 +13,10 @@ class DonorProfileResponse(BaseModel):
     blood_type: str
     municipality: str
     availability: str
+    last_donation_date: Optional[date] = None
+    next_eligible_date: Optional[date] = None
+    donation_count: int = 0
+    total_units: int = 0
     created_at: datetime
     updated_at: Optional[datetime]
 
@@ -27,3 +31,11 @@ class DonorAvailabilityUpdate(BaseModel):
 class DonorUpdate(BaseModel):
     age: Optional[int] = None
     municipality: Optional[str] = None
+
+
+class DonorSuggestion(BaseModel):
+    id: int
+    full_name: str
+    contact_number: str
+    blood_type: str
+    municipality: str
@@ -1,14 +1,76 @@
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import List, Optional, Dict, Any
 from datetime import datetime
 
+from app.models.donor import AvailabilityStatus, BloodType
+
+
+class AudienceFields(BaseModel):
+    """Donor attributes an audience selects on; each takes a value or a list of alternatives."""
+
+    blood_type: Optional[List[str]] = Field(None, min_length=1)
+    municipality: Optional[List[str]] = Field(None, min_length=1)
+    availability: Optional[List[str]] = Field(None, min_length=1)
+
+    model_config = {"extra": "forbid"}
+
+    @field_validator("blood_type", "municipality", "availability", mode="before")
+    @classmethod
+    def one_or_many(cls, v: Any) -> Any:
+        return [v] if isinstance(v, str) else v
+
+    @field_validator("blood_type")
+    @classmethod
+    def validate_blood_types(cls, v: Optional[List[str]]) -> Optional[List[str]]:
+        valid = [blood_type.value for blood_type in BloodType]
+        if v is not None and any(item not in valid for item in v):
+            raise ValueError(f"Blood type must be one of {valid}")
+        return v
+
+    @field_validator("availability")
+    @classmethod
+    def validate_availability(cls, v: Optional[List[str]]) -> Optional[List[str]]:
+        valid = [status.value for status in AvailabilityStatus]
+        if v is not None and any(item not in valid for item in v):
+            raise ValueError(f"Availability must be one of {valid}")
+        return v
+
+
+class AgeRange(BaseModel):
+    min: Optional[int] = Field(None, ge=1, le=120)
+    max: Optional[int] = Field(None, ge=1, le=120)
+
+    model_config = {"extra": "forbid"}
+
+    @model_validator(mode="after")
+    def validate_bounds(self) -> "AgeRange":
+        if self.min is None and self.max is None:
+            raise ValueError("Age range needs min or max")
+        if self.min is not None and self.max is not None and self.min > self.max:
+            raise ValueError("Age range min must not exceed max")
+        return self
+
+
+class TargetAudience(AudienceFields):
+    """Donors matching every given field, none of `exclude`, and the age, eligibility and donation conditions.
+
+    {"blood_type": ["O-", "O+"], "municipality": [...], "age": {"min": 18, "max": 45},
+    "not_donated_within_days": 90}
+    """
+
+    age: Optional[AgeRange] = None
+    eligible: Optional[bool] = None
+    exclude: Optional[AudienceFields] = None
+    donated_within_days: Optional[int] = Field(None, ge=1)
+    not_donated_within_days: Optional[int] = Field(None, ge=1)
+
 
 class AlertCreate(BaseModel):
     title: str
     message: str
     alert_type: str
     priority: str = "medium"
-    target_audience: Optional[Dict[str, Any]] = None
+    target_audience: Optional[TargetAudience] = None
     send_now: bool = True
     schedule_at: Optional[datetime] = None
 
@@ -23,6 +85,10 @@ class AlertResponse(BaseModel):
     send_now: bool
     schedule_at: Optional[datetime]
     sent_at: Optional[datetime]
+    recipient_count: int = 0
+    recipient_total: Optional[int] = None
+    fanout_status: str = "pending"
+    delivery_mode: str = "push"
     created_by: int
     created_at: datetime
 
@@ -30,6 +96,25 @@ class AlertResponse(BaseModel):
         from_attributes = True
 
 
+class AlertPreview(BaseModel):
+    target_audience: Optional[TargetAudience] = None
+    sample_size: int = Field(10, ge=0, le=50)
+
+
+class AudienceMember(BaseModel):
+    id: int
+    user_id: int
+    full_name: str
+    blood_type: str
+    municipality: str
+    availability: str
+
+
+class AudiencePreview(BaseModel):
+    recipient_count: int
+    sample: List[AudienceMember]
+
+
 class NotificationResponse(BaseModel):
     id: int
     user_id: int
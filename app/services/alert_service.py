@@ -1 +1,340 @@
-# Placeholder for alert_service
+"""
+Alert delivery.
+
+Notifications are written by Celery workers in keyset-ordered chunks of
+DonorProfile ids. Each chunk is inserted and the alert's resume cursor
+advanced in the same transaction, so a killed worker that is redelivered
+the task continues after the last committed chunk without duplicates.
+
+Recipient rows do not copy the alert's title and message; readers join
+the alert for them. After each chunk commits, its recipients' streams get a
+`notification` event and their new `unread_count`, read for the whole
+chunk in one statement and published once per distinct count.
+
+General announcements whose audience reaches `alert_pull_threshold` donors
+are not fanned out. They are stored once in pull mode, numbered by
+pull_seq in commit order, and `merge_broadcasts` copies the ones a donor
+matches into that donor's inbox the next time they read it, so donors who
+never open the app cost nothing.
+
+Audiences (sizes and the ids of each chunk) come from the bitmap index in
+audience_service when a snapshot is available.
+
+A delivery whose task was never queued (broker down) or was lost stays
+queued or running with fanout_updated_at not moving; `process_scheduled_alerts`
+queues it again after ALERT_FANOUT_STALL_SECONDS, and the cursor makes the
+redelivery resume rather than repeat.
+"""
+import logging
+from datetime import datetime, time, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, insert, literal, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.bitmap_index import positions
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.pubsub import notification_bus
+from app.db.session import SessionLocal
+from app.models.donor import DonorProfile
+from app.models.notification import (
+    Alert,
+    AlertType,
+    DeliveryMode,
+    FanoutStatus,
+    Notification,
+    NotificationInbox,
+    NotificationType,
+)
+from app.services.audience_service import audience_filters, indexed_audience, parse_audience
+from app.services.notification_service import (
+    add_unread,
+    ensure_inbox,
+    inbox_state_query,
+    retention_start,
+    unread_counts_query,
+    wall_clock,
+)
+
+logger = logging.getLogger(__name__)
+
+# pg_advisory_xact_lock key serialising pull_seq allocation
+PULL_SEQ_LOCK = 7_300_114
+
+
+def count_recipients(db: Session, alert: Alert) -> int:
+    """Count donors matched by the alert's audience."""
+    audience = parse_audience(alert.target_audience)
+    if audience is None:
+        return 0
+    bits = indexed_audience(db, audience)
+    if bits is not None:
+        return bits.bit_count()
+    return db.scalar(select(func.count(DonorProfile.id)).where(*audience_filters(audience)))
+
+
+def write_chunk(db: Session, alert: Alert, chunk_size: int) -> Optional[List[int]]:
+    """Insert notifications for the next chunk of recipients after the cursor.
+
+    Advances alert.fanout_cursor and alert.recipient_count; the caller commits.
+    Returns the recipients' user ids, or None when no recipients remain.
+    """
+    audience = parse_audience(alert.target_audience)
+    if audience is None:
+        return None
+    filters = audience_filters(audience)
+    bits = indexed_audience(db, audience)
+    if bits is not None:
+        ids = positions(bits, after=alert.fanout_cursor, limit=chunk_size)
+        if not ids:
+            return None
+        upper = ids[-1]
+        # Filters re-checked by primary key against changes since the ids were read
+        in_chunk = (*filters, DonorProfile.id.in_(ids))
+    else:
+        chunk = (
+            select(DonorProfile.id)
+            .where(*filters, DonorProfile.id > alert.fanout_cursor)
+            .order_by(DonorProfile.id)
+            .limit(chunk_size)
+            .subquery()
+        )
+        upper = db.scalar(select(func.max(chunk.c.id)))
+        if upper is None:
+            return None
+        in_chunk = (*filters, DonorProfile.id > alert.fanout_cursor, DonorProfile.id <= upper)
+
+    dialect_name = db.get_bind().dialect.name
+    # Counters first: this locks the recipients' inbox rows (in user_id order,
+    # so concurrent fan-outs cannot deadlock) before their notifications exist
+    db.execute(add_unread(
+        dialect_name,
+        select(DonorProfile.user_id, literal(1)).where(*in_chunk).order_by(DonorProfile.user_id),
+    ))
+    recipients = select(
+        DonorProfile.user_id,
+        literal(NotificationType.ALERT.value, Notification.notification_type.type),
+        literal(False, Notification.is_read.type),
+        literal(alert.id, Notification.alert_id.type),
+        wall_clock(dialect_name),
+    ).where(*in_chunk)
+
+    user_ids = db.scalars(
+        insert(Notification).from_select(
+            ["user_id", "notification_type", "is_read", "alert_id", "created_at"],
+            recipients,
+        ).returning(Notification.user_id)
+    ).all()
+    alert.fanout_cursor = upper
+    alert.recipient_count += len(user_ids)
+    return user_ids
+
+
+def should_pull(alert: Alert) -> bool:
+    threshold = settings.alert_pull_threshold
+    return (
+        alert.alert_type == AlertType.GENERAL_ANNOUNCEMENT
+        and threshold > 0
+        and alert.recipient_total >= threshold
+    )
+
+
+def next_pull_seq(db: Session) -> int:
+    """Allocate the next pull_seq; the caller commits.
+
+    On PostgreSQL the lock is held until commit, so sequence numbers become
+    visible in order and an inbox that merged up to n never misses n - 1.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PULL_SEQ_LOCK})
+    return (db.scalar(select(func.max(Alert.pull_seq))) or 0) + 1
+
+
+def deliver_alert(db: Session, alert_id: int, chunk_size: Optional[int] = None) -> Optional[Alert]:
+    """Fan out an alert from its saved cursor until every recipient is written."""
+    chunk_size = chunk_size or settings.alert_fanout_chunk_size
+    while True:
+        # Row lock serialises workers that were handed the same alert twice
+        alert = db.scalar(select(Alert).where(Alert.id == alert_id).with_for_update())
+        if alert is None or alert.fanout_status == FanoutStatus.COMPLETED:
+            db.commit()
+            return alert
+
+        if alert.recipient_total is None:
+            alert.recipient_total = count_recipients(db, alert)
+            if should_pull(alert):
+                alert.delivery_mode = DeliveryMode.PULL
+                alert.pull_seq = next_pull_seq(db)
+                alert.recipient_count = alert.recipient_total
+                alert.fanout_status = FanoutStatus.COMPLETED
+                db.commit()
+                logger.info(f"Alert {alert_id} published for {alert.recipient_total} recipients to pull")
+                return alert
+        alert.fanout_status = FanoutStatus.RUNNING
+        alert.fanout_updated_at = datetime.utcnow()
+
+        user_ids = write_chunk(db, alert, chunk_size)
+        if user_ids is None:
+            alert.fanout_status = FanoutStatus.COMPLETED
+            db.commit()
+            logger.info(f"Alert {alert_id} delivered to {alert.recipient_count} recipients")
+            return alert
+        db.commit()
+        # Only after commit: a stream client may fetch the inbox as soon as it hears
+        notification_bus.publish(
+            "notification",
+            user_ids,
+            {"alert_id": alert.id, "title": alert.title, "notification_type": NotificationType.ALERT.value},
+        )
+        publish_unread_counts(db, user_ids)
+
+
+def publish_unread_counts(db: Session, user_ids: List[int]) -> None:
+    """Publish the users' current unread counts, one event per distinct count."""
+    by_count: Dict[int, List[int]] = {}
+    for user_id, unread in db.execute(unread_counts_query(user_ids)):
+        by_count.setdefault(unread, []).append(user_id)
+    for unread, recipients in by_count.items():
+        notification_bus.publish("unread_count", recipients, {"unread_count": unread})
+
+
+async def merge_broadcasts(db: AsyncSession, user_id: int) -> int:
+    """Copy pull alerts published since the user's last read into their inbox.
+
+    Commits when anything changed; returns the notifications added. With
+    nothing new it is a single query.
+    """
+    latest, merged = (await db.execute(select(
+        select(func.max(Alert.pull_seq)).scalar_subquery(),
+        select(NotificationInbox.pulled_seq).where(NotificationInbox.user_id == user_id).scalar_subquery(),
+    ))).one()
+    if latest is None or (merged or 0) >= latest:
+        return 0
+
+    dialect_name = db.get_bind().dialect.name
+    await db.execute(ensure_inbox(dialect_name, user_id))
+    # Locked like any other inbox write; a concurrent merge waits, then sees the new pulled_seq
+    inbox = await db.scalar(
+        inbox_state_query(user_id, for_update=True).execution_options(populate_existing=True)
+    )
+    profile = await db.scalar(select(DonorProfile).where(DonorProfile.user_id == user_id))
+    matched = []
+    if profile is not None:
+        # Only what push would have reached: alerts sent while this donor existed
+        pending = await db.scalars(
+            select(Alert)
+            .where(
+                Alert.pull_seq > inbox.pulled_seq,
+                Alert.pull_seq <= latest,
+                Alert.sent_at >= profile.created_at,
+                # Older months' partitions are gone
+                Alert.sent_at >= datetime.combine(retention_start(datetime.utcnow().date()), time()),
+            )
+            .order_by(Alert.pull_seq)
+        )
+        # An invalid stored audience matches no one
+        pending = [
+            (alert, audience)
+            for alert in pending.all()
+            if (audience := parse_audience(alert.target_audience)) is not None
+        ]
+        if pending:
+            # Every pending audience tested against this donor in one statement
+            checks = await db.execute(select(*(
+                select(DonorProfile.id)
+                .where(DonorProfile.id == profile.id, *audience_filters(audience))
+                .exists()
+                for _, audience in pending
+            )))
+            matched = [alert for (alert, _), hit in zip(pending, checks.one()) if hit]
+
+    if matched:
+        created = await db.scalars(insert(Notification).returning(Notification.created_at), [
+            {
+                "user_id": user_id,
+                "notification_type": NotificationType.ALERT.value,
+                "is_read": False,
+                "alert_id": alert.id,
+                "created_at": alert.sent_at,
+            }
+            for alert in matched
+        ])
+        # Stamped with the send time, so a read-all since then already covers them
+        unread = sum(
+            1 for created_at in created if inbox.last_read_at is None or created_at > inbox.last_read_at
+        )
+        if unread:
+            await db.execute(add_unread(dialect_name, select(literal(user_id), literal(unread))))
+    inbox.pulled_seq = latest
+    await db.commit()
+    return len(matched)
+
+
+@celery_app.task(acks_late=True, reject_on_worker_lost=True)
+def send_alert_notifications(alert_id: int):
+    """Deliver notifications for a sent alert."""
+    db = SessionLocal()
+    try:
+        alert = deliver_alert(db, alert_id)
+        if alert is None:
+            logger.warning(f"Alert {alert_id} not found for delivery")
+            return 0
+        return alert.recipient_count
+    finally:
+        db.close()
+
+
+def mark_queued(alert: Alert) -> None:
+    """Mark the alert sent and its delivery queued; the caller commits, then calls `enqueue_delivery`."""
+    now = datetime.utcnow()
+    alert.sent_at = alert.sent_at or now
+    alert.fanout_status = FanoutStatus.QUEUED
+    alert.fanout_updated_at = now
+
+
+def enqueue_delivery(alert_id: int) -> bool:
+    """Queue the delivery task. A broker failure is logged; the stalled delivery is queued again later."""
+    try:
+        send_alert_notifications.delay(alert_id)
+        return True
+    except Exception as exc:
+        logger.warning(f"Queueing delivery of alert {alert_id} failed, it will be retried: {exc}")
+        return False
+
+
+@celery_app.task
+def process_scheduled_alerts():
+    """Mark due scheduled alerts as sent and queue their delivery, and queue stalled deliveries again."""
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        stalled_since = now - timedelta(seconds=settings.alert_fanout_stall_seconds)
+        due = db.scalars(
+            select(Alert)
+            .where(
+                Alert.sent_at.is_(None),
+                Alert.schedule_at.isnot(None),
+                Alert.schedule_at <= now,
+            )
+            .with_for_update(skip_locked=True)
+        ).all()
+        stalled = db.scalars(
+            select(Alert)
+            .where(
+                Alert.fanout_status.in_([FanoutStatus.QUEUED, FanoutStatus.RUNNING]),
+                func.coalesce(Alert.fanout_updated_at, Alert.sent_at) < stalled_since,
+            )
+            .with_for_update(skip_locked=True)
+        ).all()
+        for alert in due + stalled:
+            mark_queued(alert)
+        db.commit()
+        if stalled:
+            logger.warning(f"Alert deliveries stalled, queued again: {[alert.id for alert in stalled]}")
+        for alert in due + stalled:
+            enqueue_delivery(alert.id)
+        return len(due)
+    finally:
+        db.close()
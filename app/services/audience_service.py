@@ -0,0 +1,276 @@
+"""
+Alert audiences.
+
+An alert's target_audience is a TargetAudience: any of several blood
+types, municipalities and availability states, values to exclude, an age
+range, eligibility (donation_service) and donation recency. `audience_filters` compiles it into the
+filters of one statement over donor_profiles, with recency as an
+(anti-)EXISTS probe of ix_donations_donor_date. `unindexed_tables` asks
+the database's planner whether anything but donor_profiles itself would
+be read in full; alerts are refused at creation if so.
+
+Previews and fan-out read audiences that only select on blood_type,
+municipality and availability from a bitmap index instead of
+scanning donor_profiles: one bitset of profile ids per value of each
+field, written by Celery beat every AUDIENCE_INDEX_REFRESH_SECONDS to a
+file that every API and Celery worker maps (app.core.bitmap_index). An
+audience is the AND across fields of the OR of each field's bitsets,
+less the excluded values' bitsets, made exact at query time:
+profiles created or updated since the snapshot was read (less a minute,
+for transactions still open then) are fetched through their timestamp
+indexes and their bits replaced. Without a snapshot younger than
+AUDIENCE_INDEX_MAX_AGE_SECONDS the SQL filters are used.
+"""
+import json
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.core.bitmap_index import (
+    BitmapSnapshot,
+    BitsetBuilder,
+    SnapshotFile,
+    bits_from_ids,
+    highest_positions,
+    write_snapshot,
+)
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.donation import Donation
+from app.models.donor import DonorProfile
+from app.schemas.notification import TargetAudience
+from app.services.donation_service import eligible_filters
+from app.utils.query_plan import explain
+
+logger = logging.getLogger(__name__)
+
+AUDIENCE_FIELDS = ("blood_type", "municipality", "availability")
+ALL_DONORS = "*"
+# Changes this close to the snapshot's read are re-fetched
+SNAPSHOT_OVERLAP = timedelta(minutes=1)
+# The audience statement's driving table; every other table must be reached by index
+DRIVING_TABLE = DonorProfile.__tablename__
+
+audience_index = SnapshotFile(settings.audience_index_path)
+
+
+def parse_audience(target_audience: Optional[Dict[str, Any]]) -> Optional[TargetAudience]:
+    """A stored target_audience; keys the language does not know are ignored, as they always were.
+
+    None for an audience the language rejects (stored before it existed):
+    it matches no one, rather than the everyone that dropping its bad
+    values would leave.
+    """
+    known = {key: value for key, value in (target_audience or {}).items() if key in TargetAudience.model_fields}
+    try:
+        return TargetAudience.model_validate(known)
+    except ValidationError as exc:
+        logger.warning(f"Stored target audience {target_audience!r} is invalid, it matches no donors: {exc}")
+        return None
+
+
+def donated_since(since: date):
+    """EXISTS a donation by the profile after `since` (an ix_donations_donor_date probe)."""
+    return (
+        select(Donation.id)
+        .where(Donation.donor_profile_id == DonorProfile.id, Donation.donation_date > since)
+        .exists()
+    )
+
+
+def audience_filters(audience: TargetAudience, today: Optional[date] = None) -> list:
+    """Compile an audience into DonorProfile filters."""
+    filters = []
+    for field in AUDIENCE_FIELDS:
+        values = getattr(audience, field)
+        if values:
+            filters.append(getattr(DonorProfile, field).in_(values))
+        excluded = getattr(audience.exclude, field) if audience.exclude else None
+        if excluded:
+            filters.append(getattr(DonorProfile, field).not_in(excluded))
+    if audience.age:
+        if audience.age.min is not None:
+            filters.append(DonorProfile.age >= audience.age.min)
+        if audience.age.max is not None:
+            filters.append(DonorProfile.age <= audience.age.max)
+    today = today or datetime.utcnow().date()
+    filters.extend(eligible_filters(audience.eligible, today))
+    if audience.donated_within_days:
+        filters.append(donated_since(today - timedelta(days=audience.donated_within_days)))
+    if audience.not_donated_within_days:
+        filters.append(~donated_since(today - timedelta(days=audience.not_donated_within_days)))
+    return filters
+
+
+def audience_query(audience: TargetAudience) -> Select:
+    """The one statement selecting an audience's profile ids."""
+    return select(DonorProfile.id).where(*audience_filters(audience))
+
+
+def bitmap_servable(audience: TargetAudience) -> bool:
+    """Whether the bitmap index holds everything the audience selects on."""
+    return (
+        audience.age is None
+        and audience.eligible is None
+        and not audience.donated_within_days
+        and not audience.not_donated_within_days
+    )
+
+
+def audience_matches(audience: TargetAudience, profile) -> bool:
+    """The field and exclude conditions evaluated against one loaded profile (or row)."""
+    for field in AUDIENCE_FIELDS:
+        values = getattr(audience, field)
+        excluded = getattr(audience.exclude, field) if audience.exclude else None
+        if values and getattr(profile, field) not in values:
+            return False
+        if excluded and getattr(profile, field) in excluded:
+            return False
+    return True
+
+
+def scanned_tables(dialect_name: str, plan: Any) -> List[str]:
+    """Tables other than the driving one that `plan` reads in full."""
+    if dialect_name == "postgresql":
+        scanned, nodes = [], [plan[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            if node["Node Type"] == "Seq Scan" and node["Relation Name"] != DRIVING_TABLE:
+                scanned.append(node["Relation Name"])
+            nodes.extend(node.get("Plans", ()))
+        return sorted(set(scanned))
+    # SQLite's EXPLAIN QUERY PLAN details: "SCAN t" reads t in full, "SEARCH t USING ..." probes it
+    scanned = {
+        detail.split()[1]
+        for detail in plan
+        if detail.startswith("SCAN ") and detail.split()[1] not in (DRIVING_TABLE, "CONSTANT")
+    }
+    return sorted(scanned)
+
+
+async def unindexed_tables(db: AsyncSession, audience: TargetAudience) -> List[str]:
+    """Tables the audience statement could only read in full, checked against the live schema.
+
+    PostgreSQL is asked with sequential scans disabled, so a scan left in
+    the plan means no index can serve that table, whatever its size.
+    """
+    query = select(func.count()).select_from(audience_query(audience).subquery())
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name != "postgresql":
+        rows = (await db.execute(explain(query))).all()
+        return scanned_tables(dialect_name, [row[-1] for row in rows])
+    await db.execute(text("SET LOCAL enable_seqscan = off"))
+    try:
+        plan = await db.scalar(explain(query))
+    finally:
+        await db.execute(text("SET LOCAL enable_seqscan = on"))
+    return scanned_tables(dialect_name, json.loads(plan) if isinstance(plan, (str, bytes)) else plan)
+
+
+def bitset_name(field: str, value: Any) -> str:
+    return f"{field}={value}"
+
+
+def build_audience_index(db: Session, path: str) -> Tuple[int, int]:
+    """Write a snapshot of every profile's audience fields; returns (donors, bytes)."""
+    read_at = datetime.utcnow()
+    builder = BitsetBuilder()
+    donors = 0
+    rows = db.execute(
+        select(DonorProfile.id, *(getattr(DonorProfile, field) for field in AUDIENCE_FIELDS))
+        .execution_options(yield_per=10000)
+    )
+    for id_, *values in rows:
+        builder.add(ALL_DONORS, id_)
+        for field, value in zip(AUDIENCE_FIELDS, values):
+            builder.add(bitset_name(field, value), id_)
+        donors += 1
+    size = write_snapshot(path, builder.bitsets, {"read_at": read_at.isoformat(), "donors": donors})
+    return donors, size
+
+
+def usable_snapshot() -> Optional[BitmapSnapshot]:
+    snapshot = audience_index.current()
+    if snapshot is None:
+        return None
+    age = datetime.utcnow() - datetime.fromisoformat(snapshot.meta["read_at"])
+    return snapshot if age.total_seconds() <= settings.audience_index_max_age_seconds else None
+
+
+def changes_query(snapshot: BitmapSnapshot) -> Select:
+    """Profiles that may differ from the snapshot."""
+    since = datetime.fromisoformat(snapshot.meta["read_at"]) - SNAPSHOT_OVERLAP
+    return select(DonorProfile.id, *(getattr(DonorProfile, field) for field in AUDIENCE_FIELDS)).where(
+        or_(DonorProfile.created_at >= since, DonorProfile.updated_at >= since)
+    )
+
+
+def field_bits(snapshot: BitmapSnapshot, field: str, values: List[str]) -> int:
+    bits = 0
+    for value in values:
+        bits |= snapshot.get(bitset_name(field, value))
+    return bits
+
+
+def resolve(snapshot: BitmapSnapshot, audience: TargetAudience, changes: Iterable) -> int:
+    """Bitset of the profile ids in the audience now."""
+    bits = None
+    for field in AUDIENCE_FIELDS:
+        values = getattr(audience, field)
+        if values:
+            selected = field_bits(snapshot, field, values)
+            bits = selected if bits is None else bits & selected
+    if bits is None:
+        bits = snapshot.get(ALL_DONORS)
+    for field in AUDIENCE_FIELDS:
+        excluded = getattr(audience.exclude, field) if audience.exclude else None
+        if excluded:
+            bits &= ~field_bits(snapshot, field, excluded)
+    changes = list(changes)
+    if changes:
+        changed = bits_from_ids(row.id for row in changes)
+        matched = bits_from_ids(row.id for row in changes if audience_matches(audience, row))
+        bits = (bits & ~changed) | matched
+    return bits
+
+
+def indexed_audience(db: Session, audience: TargetAudience) -> Optional[int]:
+    """The audience's profile ids as a bitset, or None when the snapshot cannot serve it."""
+    snapshot = usable_snapshot()
+    if snapshot is None or not bitmap_servable(audience):
+        return None
+    return resolve(snapshot, audience, db.execute(changes_query(snapshot)))
+
+
+async def preview_audience(db: AsyncSession, audience: TargetAudience, sample_size: int) -> Tuple[int, List[int]]:
+    """Exact audience size and the ids of its `sample_size` newest donors."""
+    snapshot = usable_snapshot()
+    if snapshot is not None and bitmap_servable(audience):
+        bits = resolve(snapshot, audience, (await db.execute(changes_query(snapshot))).all())
+        return bits.bit_count(), highest_positions(bits, sample_size)
+
+    filters = audience_filters(audience)
+    count = await db.scalar(select(func.count(DonorProfile.id)).where(*filters))
+    sample = await db.scalars(
+        select(DonorProfile.id).where(*filters).order_by(DonorProfile.id.desc()).limit(sample_size)
+    )
+    return count, sample.all()
+
+
+@celery_app.task
+def rebuild_audience_index():
+    """Periodic rewrite of the alert audience snapshot."""
+    db = SessionLocal()
+    try:
+        donors, size = build_audience_index(db, settings.audience_index_path)
+        logger.info(f"Audience index written: {donors} donors, {size} bytes")
+        return donors
+    finally:
+        db.close()
@@ -0,0 +1,183 @@
+"""
+Bulk donation import.
+
+An upload (CSV with a header row, or NDJSON) is read and validated
+DONATION_IMPORT_CHUNK_SIZE rows at a time in a worker thread: each chunk
+is validated against DonationCreate in one call and its donor profile ids
+are checked in one query. Valid rows are written with COPY on PostgreSQL
+and an executemany INSERT elsewhere. Then, per chunk, one UPDATE
+recomputes the touched profiles' donation aggregates and one marks those
+still inside their deferral recently_donated (donors whose imported
+donations are all old enough stay as they are). Counters and the monthly
+rollup move in the same transaction, which commits once at the end.
+
+Rows that fail are skipped and reported by row number: the data row for
+CSV (1 is the row after the header), the line for NDJSON.
+"""
+import asyncio
+import csv
+import json
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.donation import Donation
+from app.models.donor import DonorProfile
+from app.models.user import User, UserStatus
+from app.schemas.donation import DonationCreate
+from app.services.donation_service import AVAILABLE, RECENTLY_DONATED, refresh_donation_stats
+from app.services.report_service import AVAILABLE_DONORS, TOTAL_DONATIONS, adjust_counters, rollup_add
+
+COLUMNS = ("donor_profile_id", "donation_date", "blood_type", "units", "location")
+REQUIRED_COLUMNS = [name for name, field in DonationCreate.model_fields.items() if field.is_required()]
+# Rollup rows per upsert statement, well under SQLite's bound parameter limit
+ROLLUP_BATCH = 1000
+
+donation_list = TypeAdapter(List[DonationCreate])
+
+Row = Tuple[int, Any]
+
+
+def read_rows(stream: TextIO, fmt: str) -> Iterator[Row]:
+    """(row number, decoded row) pairs; a line that is not JSON decodes to None."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        missing = [name for name in REQUIRED_COLUMNS if name not in (reader.fieldnames or ())]
+        if missing:
+            raise ValueError(f"CSV header is missing {', '.join(missing)}")
+        for number, row in enumerate(reader, start=1):
+            # Empty cells are missing values, so defaults apply; surplus cells are ignored
+            yield number, {name: value for name, value in row.items() if name is not None and value != ""}
+        return
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, None
+
+
+def validate_chunk(rows: List[Row]) -> Tuple[List[Tuple[int, DonationCreate]], Dict[int, List[str]]]:
+    """Valid rows as (row number, DonationCreate) and error messages by row number."""
+    errors: Dict[int, List[str]] = {}
+    candidates = []
+    for number, row in rows:
+        if isinstance(row, dict):
+            candidates.append((number, row))
+        else:
+            errors[number] = ["Row is not a JSON object"]
+    try:
+        donations = donation_list.validate_python([row for _, row in candidates])
+    except ValidationError as exc:
+        for error in exc.errors():
+            index, *field = error["loc"]
+            message = f"{'.'.join(map(str, field))}: {error['msg']}" if field else error["msg"]
+            errors.setdefault(candidates[index][0], []).append(message)
+        # What is left validates; one more call turns it into models
+        candidates = [(number, row) for number, row in candidates if number not in errors]
+        donations = donation_list.validate_python([row for _, row in candidates])
+    return [(number, donation) for (number, _), donation in zip(candidates, donations)], errors
+
+
+def next_chunk(rows: Iterator[Row], size: int) -> Tuple[int, List[Tuple[int, DonationCreate]], Dict[int, List[str]]]:
+    """Read and validate up to `size` rows; returns (rows read, valid rows, errors)."""
+    chunk = list(islice(rows, size))
+    return (len(chunk), *validate_chunk(chunk))
+
+
+async def insert_donations(db: AsyncSession, donations: List[DonationCreate]) -> None:
+    records = [tuple(getattr(donation, column) for column in COLUMNS) for donation in donations]
+    if db.get_bind().dialect.name == "postgresql":
+        # COPY on the session's own connection, inside its transaction
+        connection = await (await db.connection()).get_raw_connection()
+        await connection.driver_connection.copy_records_to_table(
+            Donation.__tablename__, records=records, columns=COLUMNS
+        )
+    else:
+        await db.execute(insert(Donation), [dict(zip(COLUMNS, record)) for record in records])
+
+
+async def start_deferrals(db: AsyncSession, profile_ids: List[int], today: date) -> int:
+    """Mark profiles still inside their deferral recently_donated; returns the available_donors delta."""
+    deferred = (
+        DonorProfile.id.in_(profile_ids),
+        DonorProfile.next_eligible_date > today,
+        DonorProfile.availability != RECENTLY_DONATED,
+    )
+    leaving = await db.scalar(
+        select(func.count(DonorProfile.id))
+        .join(User, User.id == DonorProfile.user_id)
+        .where(*deferred, DonorProfile.availability == AVAILABLE, User.status == UserStatus.ACTIVE)
+    )
+    await db.execute(
+        update(DonorProfile)
+        .where(*deferred)
+        .values(availability="recently_donated", updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    return -leaving
+
+
+async def import_donations(
+    db: AsyncSession, stream: TextIO, fmt: str, chunk_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """Record the valid donations in `stream` and commit; returns counts and per-row errors.
+
+    Raises ValueError if the upload cannot be read at all.
+    """
+    chunk_size = chunk_size or settings.donation_import_chunk_size
+    dialect_name = db.get_bind().dialect.name
+    today = datetime.utcnow().date()
+    rows = read_rows(stream, fmt)
+    imported, available_delta = 0, 0
+    errors: Dict[int, List[str]] = {}
+    rollup: Dict[Tuple[date, str, str], List[int]] = {}
+
+    while True:
+        read, valid, chunk_errors = await asyncio.to_thread(next_chunk, rows, chunk_size)
+        if not read:
+            break
+        errors.update(chunk_errors)
+        profile_ids = list({donation.donor_profile_id for _, donation in valid})
+        known = set(await db.scalars(select(DonorProfile.id).where(DonorProfile.id.in_(profile_ids))))
+        donations = []
+        for number, donation in valid:
+            if donation.donor_profile_id in known:
+                donations.append(donation)
+            else:
+                errors[number] = ["donor_profile_id: Donor profile not found"]
+        if not donations:
+            continue
+
+        await insert_donations(db, donations)
+        touched = list({donation.donor_profile_id for donation in donations})
+        await db.execute(refresh_donation_stats(dialect_name, touched))
+        available_delta += await start_deferrals(db, touched, today)
+        for donation in donations:
+            totals = rollup.setdefault(
+                (donation.donation_date.replace(day=1), donation.blood_type, donation.location), [0, 0]
+            )
+            totals[0] += 1
+            totals[1] += donation.units
+        imported += len(donations)
+
+    if imported:
+        await db.execute(adjust_counters(**{TOTAL_DONATIONS: imported, AVAILABLE_DONORS: available_delta}))
+        totals = [
+            {"month": month, "blood_type": blood_type, "location": location, "count": count, "units": units}
+            for (month, blood_type, location), (count, units) in rollup.items()
+        ]
+        for start in range(0, len(totals), ROLLUP_BATCH):
+            await db.execute(rollup_add(dialect_name, totals[start:start + ROLLUP_BATCH]))
+    await db.commit()
+    return {
+        "imported": imported,
+        "rejected": len(errors),
+        "errors": [{"row": number, "errors": messages} for number, messages in sorted(errors.items())],
+    }
@@ -1 +1,175 @@
-# Placeholder for donation_service
+"""
+Donor eligibility.
+
+Each DonorProfile carries its donation aggregates (last_donation_date,
+next_eligible_date, donation_count, total_units) so eligibility questions
+read the profile alone instead of the donor's donations. create_donation
+adds to them in its own UPDATE; `refresh_donation_stats` recomputes them
+from donations for a set of profiles.
+
+A donor is eligible when available and at or past next_eligible_date,
+which is the last donation date plus DONATION_DEFERRAL_DAYS.
+
+A donation marks the donor recently_donated. `update_donor_availability`
+(Celery beat) makes them available again once next_eligible_date has
+passed, DONOR_RECOVERY_BATCH_SIZE profiles per UPDATE, found through the
+ix_donor_profiles_recovery partial index. Each batch moves the
+available_donors counter in its own transaction and, once committed,
+publishes an `availability` event for the changed donors' user ids on the
+notification bus: their open streams hear it, and API workers with a
+memory report cache invalidate their donor entries (`watch_availability_changes`).
+The task also invalidates the report cache it can reach itself. The audience
+snapshot catches up through updated_at. Profiles marked recently_donated
+with no donation on record are left to admins.
+"""
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional, Sequence, Union
+
+from sqlalchemy import and_, case, func, literal, not_, or_, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select, Update
+
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.pubsub import notification_bus
+from app.core.report_cache import DONORS, MemoryBackend, report_cache
+from app.db.session import SessionLocal
+from app.models.donation import Donation
+from app.models.donor import DonorProfile
+from app.models.user import User, UserStatus
+from app.services.report_service import AVAILABLE_DONORS, adjust_counters
+
+logger = logging.getLogger(__name__)
+
+# Inlined, not bound: the planner must see them to use the partial indexes
+AVAILABLE = literal("available", literal_execute=True)
+RECENTLY_DONATED = literal("recently_donated", literal_execute=True)
+AVAILABILITY_EVENT = "availability"
+
+
+def next_eligible(donation_date: date) -> date:
+    return donation_date + timedelta(days=settings.donation_deferral_days)
+
+
+def eligibility_filter(today: Optional[date] = None):
+    today = today or datetime.utcnow().date()
+    return and_(
+        DonorProfile.availability == AVAILABLE,
+        or_(DonorProfile.next_eligible_date.is_(None), DonorProfile.next_eligible_date <= today),
+    )
+
+
+def eligible_filters(eligible: Optional[bool], today: Optional[date] = None) -> list:
+    """DonorProfile filters for an `eligible` true/false/unset query parameter."""
+    if eligible is None:
+        return []
+    condition = eligibility_filter(today)
+    return [condition if eligible else not_(condition)]
+
+
+def donation_added(donation_date: date, units: int) -> Dict[str, Any]:
+    """DonorProfile values counting one more donation.
+
+    SQL expressions over the row's current values, so concurrent donations
+    by one donor both count, and a late-recorded older donation leaves the
+    last donation date alone.
+    """
+    later = or_(DonorProfile.last_donation_date.is_(None), DonorProfile.last_donation_date < donation_date)
+    return {
+        "last_donation_date": case((later, donation_date), else_=DonorProfile.last_donation_date),
+        "next_eligible_date": case((later, next_eligible(donation_date)), else_=DonorProfile.next_eligible_date),
+        "donation_count": DonorProfile.donation_count + 1,
+        "total_units": DonorProfile.total_units + units,
+    }
+
+
+def add_days(dialect_name: str, day, days: int):
+    """SQL date arithmetic: `day` plus `days`."""
+    if dialect_name == "postgresql":
+        return day + days
+    return func.date(day, f"+{days} days")
+
+
+def refresh_donation_stats(dialect_name: str, profile_ids: Optional[Union[Select, Sequence[int]]] = None) -> Update:
+    """UPDATE recomputing the aggregates from donations, for `profile_ids` (a list or a select) or every profile."""
+    def of_donor(column):
+        return select(column).where(Donation.donor_profile_id == DonorProfile.id).scalar_subquery()
+
+    last = of_donor(func.max(Donation.donation_date))
+    statement = update(DonorProfile).values(
+        last_donation_date=last,
+        next_eligible_date=add_days(dialect_name, last, settings.donation_deferral_days),
+        donation_count=of_donor(func.count(Donation.id)),
+        total_units=func.coalesce(of_donor(func.sum(Donation.units)), 0),
+    )
+    if profile_ids is not None:
+        statement = statement.where(DonorProfile.id.in_(profile_ids))
+    return statement
+
+
+def recovery_batch(today: date, batch_size: int) -> Update:
+    """UPDATE making up to `batch_size` donors past their deferral available; returns (id, user_id)."""
+    due = (DonorProfile.availability == RECENTLY_DONATED, DonorProfile.next_eligible_date <= today)
+    batch = select(DonorProfile.id).where(*due).order_by(DonorProfile.next_eligible_date).limit(batch_size)
+    return (
+        update(DonorProfile)
+        # Repeated outside the subquery so a row changed meanwhile is skipped
+        .where(DonorProfile.id.in_(batch), *due)
+        # updated_at comes from its onupdate default; the audience snapshot catches up on it
+        .values(availability="available")
+        .returning(DonorProfile.id, DonorProfile.user_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def recover_available_donors(db: Session, today: Optional[date] = None, batch_size: Optional[int] = None) -> int:
+    """Return donors past their deferral to available, batch by batch; returns how many."""
+    today = today or datetime.utcnow().date()
+    batch_size = batch_size or settings.donor_recovery_batch_size
+    recovered = 0
+    while True:
+        rows = db.execute(recovery_batch(today, batch_size)).all()
+        if not rows:
+            break
+        # Only donors whose user is active are counted as available
+        active = db.scalar(
+            select(func.count(User.id)).where(
+                User.id.in_([row.user_id for row in rows]), User.status == UserStatus.ACTIVE
+            )
+        )
+        if active:
+            db.execute(adjust_counters(**{AVAILABLE_DONORS: active}))
+        db.commit()
+        notification_bus.publish(
+            AVAILABILITY_EVENT, [row.user_id for row in rows], {"availability": "available"}
+        )
+        recovered += len(rows)
+        if len(rows) < batch_size:
+            break
+    if recovered:
+        report_cache.invalidate_sync(DONORS)
+    return recovered
+
+
+def invalidate_donor_reports(message: Dict[str, Any]) -> None:
+    report_cache.invalidate_sync(DONORS)
+
+
+def watch_availability_changes() -> None:
+    """Have this worker's memory report cache follow availability events from other processes."""
+    if isinstance(report_cache.backend, MemoryBackend):
+        notification_bus.hub.on(AVAILABILITY_EVENT, invalidate_donor_reports)
+
+
+@celery_app.task
+def update_donor_availability():
+    """Make donors available again once their donation deferral is over."""
+    db = SessionLocal()
+    try:
+        recovered = recover_available_donors(db)
+        if recovered:
+            logger.info(f"{recovered} donors available again after their deferral")
+        return recovered
+    finally:
+        db.close()
@@ -0,0 +1,188 @@
+"""
+Donor search helpers and the in-memory typeahead index.
+
+GET /donors/suggest is answered from memory: each API worker holds a
+PrefixIndex over donor names (every word start, so "dela c" finds "Juan
+Dela Cruz") and one over national contact numbers, plus a short label per
+donor to return. The index loads in the background at startup (or on
+first use), applies this worker's approvals, profile edits and deletions
+as they commit, and is rebuilt from the database every
+DONOR_SUGGEST_REFRESH_SECONDS, which bounds how long edits made on other
+workers take to show up.
+"""
+import asyncio
+import logging
+import re
+import time
+import unicodedata
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.prefix_index import PackedStrings, PrefixIndex
+from app.db.session import SessionLocal
+from app.models.donor import DonorProfile
+from app.models.user import User, UserStatus
+
+logger = logging.getLogger(__name__)
+
+# A search made only of phone-number characters looks up contact numbers
+PHONE_SEARCH = re.compile(r"^[\d\s()+-]+$")
+LABEL_SEPARATOR = "\x1f"
+SUGGESTION_COLUMNS = (
+    DonorProfile.id,
+    User.full_name,
+    User.contact_number,
+    DonorProfile.blood_type,
+    DonorProfile.municipality,
+)
+
+
+def contact_digits(search: str) -> Optional[str]:
+    """Digits to look for when `search` is a (partial) phone number, else None.
+
+    Numbers are stored as 09XXXXXXXXX or +639XXXXXXXXX, so the trunk
+    prefix is dropped and either form matches.
+    """
+    if not PHONE_SEARCH.match(search):
+        return None
+    digits = re.sub(r"\D", "", search)
+    if search.lstrip().startswith("+63"):
+        digits = digits[2:]
+    elif digits.startswith("0"):
+        digits = digits[1:]
+    return digits or None
+
+
+def normalize_name(text: str) -> str:
+    """Casefolded words without accents or punctuation: "José  Dela-Cruz" -> "jose dela cruz"."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(re.findall(r"\w+", stripped))
+
+
+def name_keys(full_name: str) -> List[bytes]:
+    """The normalized name from each word on, so any word start matches."""
+    words = normalize_name(full_name).split()
+    return [" ".join(words[start:]).encode() for start in range(len(words))]
+
+
+def number_keys(contact_number: str) -> List[bytes]:
+    digits = contact_digits(contact_number)
+    return [digits.encode()] if digits else []
+
+
+class Suggestion(NamedTuple):
+    id: int
+    full_name: str
+    contact_number: str
+    blood_type: str
+    municipality: str
+
+
+def load_indexes() -> Tuple[PrefixIndex, PrefixIndex, PackedStrings]:
+    """Build the name and number indexes and the labels from the database (active donors only)."""
+    name_entries, number_entries, labels = [], [], []
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(*SUGGESTION_COLUMNS)
+            .join(User, DonorProfile.user_id == User.id)
+            .where(User.status == UserStatus.ACTIVE)
+            .execution_options(yield_per=10000)
+        )
+        for row in rows:
+            suggestion = Suggestion(*row)
+            name_entries.extend((key, suggestion.id) for key in name_keys(suggestion.full_name))
+            number_entries.extend((key, suggestion.id) for key in number_keys(suggestion.contact_number))
+            labels.append((suggestion.id, LABEL_SEPARATOR.join(suggestion[1:])))
+    finally:
+        db.close()
+    return PrefixIndex.build(name_entries), PrefixIndex.build(number_entries), PackedStrings.build(labels)
+
+
+class DonorSuggest:
+    """This worker's typeahead index; all methods run on the event loop."""
+
+    def __init__(self, refresh_seconds: int):
+        self.refresh_seconds = refresh_seconds
+        self.clear()
+
+    def clear(self) -> None:
+        self.names = PrefixIndex()
+        self.numbers = PrefixIndex()
+        self.labels = PackedStrings()
+        self.loaded_at: Optional[float] = None
+        self._loading: Optional[asyncio.Task] = None
+        # Changes committed while a load runs, replayed onto its result; an id is a removal
+        self._journal: Optional[List[Union[Suggestion, int]]] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded_at is not None
+
+    def start(self) -> asyncio.Task:
+        """Load (or rebuild) the index in the background; idempotent while one runs."""
+        if self._loading is None or self._loading.done():
+            self._loading = asyncio.create_task(self._load())
+        return self._loading
+
+    async def _load(self) -> None:
+        self._journal = []
+        started = time.perf_counter()
+        try:
+            names, numbers, labels = await asyncio.to_thread(load_indexes)
+        except Exception as exc:
+            logger.warning(f"Loading the donor suggest index failed: {exc}")
+            return
+        finally:
+            journal, self._journal = self._journal, None
+        self.names, self.numbers, self.labels = names, numbers, labels
+        self.loaded_at = time.monotonic()
+        for change in journal:
+            self._apply(change)
+        logger.info(
+            f"Donor suggest index loaded: {len(labels)} donors in {time.perf_counter() - started:.1f}s"
+        )
+
+    def _apply(self, change: Union[Suggestion, int]) -> None:
+        if isinstance(change, int):
+            self.names.remove(change)
+            self.numbers.remove(change)
+            return
+        suggestion = change
+        self.names.upsert(suggestion.id, name_keys(suggestion.full_name))
+        self.numbers.upsert(suggestion.id, number_keys(suggestion.contact_number))
+        self.labels.set(suggestion.id, LABEL_SEPARATOR.join(suggestion[1:]))
+
+    def upsert(self, suggestion: Suggestion) -> None:
+        """Apply a committed approval or profile edit."""
+        if self._journal is not None:
+            self._journal.append(suggestion)
+        if self.ready:
+            self._apply(suggestion)
+
+    def remove(self, donor_id: int) -> None:
+        """Apply a committed deletion: the donor stops matching searches."""
+        if self._journal is not None:
+            self._journal.append(donor_id)
+        if self.ready:
+            self._apply(donor_id)
+
+    async def suggest(self, query: str, limit: int) -> List[Suggestion]:
+        """Up to `limit` donors whose name words or contact number start with `query`."""
+        if not self.ready:
+            await asyncio.shield(self.start())
+        elif time.monotonic() - self.loaded_at > self.refresh_seconds:
+            self.start()
+        digits = contact_digits(query)
+        if digits:
+            ids = self.numbers.search(digits.encode(), limit)
+        else:
+            prefix = normalize_name(query)
+            ids = self.names.search(prefix.encode(), limit) if prefix else []
+        return [Suggestion(id_, *self.labels.get(id_).split(LABEL_SEPARATOR)) for id_ in ids]
+
+
+donor_suggest = DonorSuggest(refresh_seconds=settings.donor_suggest_refresh_seconds)
@@ -0,0 +1,99 @@
+"""
+Donor matching for blood requests.
+
+COMPATIBLE_DONORS maps each recipient blood type to the donor types whose
+red cells it can receive (ABO, then Rh: Rh- recipients only take Rh-),
+with the recipient's own type first. It is computed once at import.
+
+Matches are ranked exact type first, then donors in the request's
+municipality, then by donation recency: the latest last_donation_date
+first (a donor who gave recently is an active one), and donors with no
+donation on record last, newest profile first. `match_query` is one UNION
+ALL with a branch per (donor type, local or elsewhere, donated or not).
+Each branch is an ordered range scan of a partial index on available
+donors that stops after `limit` rows, so the outer sort sees at most
+32 * limit rows whatever the number of donors. Never-donated donors get
+their own branches because PostgreSQL sorts NULLs first in a DESC index.
+Donors are eligible ones (donation_service): available and past their
+deferral after a donation.
+"""
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.sql import Select
+
+from app.models.donor import BloodType, DonorProfile
+from app.models.user import User, UserStatus
+from app.services.donation_service import eligibility_filter
+
+# Recipient ABO group -> donor ABO groups, own group first
+ABO_DONORS = {"O": ("O",), "A": ("A", "O"), "B": ("B", "O"), "AB": ("AB", "A", "B", "O")}
+
+
+def _compatible_donors(recipient: str) -> Tuple[str, ...]:
+    abo, rh = recipient[:-1], recipient[-1]
+    rh_donors = ("+", "-") if rh == "+" else ("-",)
+    return tuple(f"{group}{sign}" for group in ABO_DONORS[abo] for sign in rh_donors)
+
+
+COMPATIBLE_DONORS: Dict[str, Tuple[str, ...]] = {
+    blood_type.value: _compatible_donors(blood_type.value) for blood_type in BloodType
+}
+
+MATCH_COLUMNS = (
+    DonorProfile.id,
+    DonorProfile.user_id,
+    User.full_name,
+    User.contact_number,
+    DonorProfile.blood_type,
+    DonorProfile.municipality,
+    DonorProfile.last_donation_date,
+)
+
+
+def match_query(recipient: str, municipality: Optional[str], limit: int, today: Optional[date] = None) -> Select:
+    """Top `limit` eligible, active donors who can give to `recipient`, best first."""
+    branches = []
+    for donor_type in COMPATIBLE_DONORS[recipient]:
+        exact = donor_type == recipient
+        localities = [True, False] if municipality else [None]
+        for local in localities:
+            for donated in (True, False):
+                branch = (
+                    select(
+                        *MATCH_COLUMNS,
+                        literal(exact).label("exact_match"),
+                        literal(bool(local)).label("local"),
+                    )
+                    .join(User, DonorProfile.user_id == User.id)
+                    .where(
+                        eligibility_filter(today),
+                        DonorProfile.blood_type == donor_type,
+                        User.status == UserStatus.ACTIVE,
+                        DonorProfile.last_donation_date.isnot(None)
+                        if donated
+                        else DonorProfile.last_donation_date.is_(None),
+                    )
+                )
+                if local is True:
+                    branch = branch.where(DonorProfile.municipality == municipality)
+                elif local is False:
+                    branch = branch.where(DonorProfile.municipality != municipality)
+                branches.append(
+                    branch.order_by(DonorProfile.last_donation_date.desc(), DonorProfile.id.desc())
+                    .limit(limit)
+                    .subquery()
+                )
+    ranked = union_all(*(select(branch) for branch in branches)).subquery()
+    return (
+        select(ranked)
+        .order_by(
+            ranked.c.exact_match.desc(),
+            ranked.c.local.desc(),
+            ranked.c.last_donation_date.is_(None),
+            ranked.c.last_donation_date.desc(),
+            ranked.c.id.desc(),
+        )
+        .limit(limit)
+    )
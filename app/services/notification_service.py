@@ -1 +1,259 @@
-# Placeholder for notification_service
+"""
+Notification inbox queries.
+
+Inbox pages are served by the (user_id, is_read, created_at DESC, id DESC)
+and (user_id, created_at DESC, id DESC) indexes: a page is a range scan
+that stops after `limit + 1` rows (read pages after a read-all take one
+such range per branch of their OR). Alert notifications store no text of
+their own; pages join each row to its alert by primary key.
+
+Read state is split between the notification row and notification_inbox.
+Read-all only moves the user's `last_read_at` watermark; a notification is
+read when its own is_read is set (marked individually) or it was created at
+or before the watermark. notification_inbox.unread_count is kept in step by
+every write that changes what is unread, in the same transaction, so the
+unread count is a primary-key lookup.
+
+Writers lock the inbox row before touching the user's notifications.
+Fan-out stamps new rows with the wall clock after taking that lock, so a
+read-all either commits first and the new rows land after its watermark,
+or waits and its watermark covers them.
+
+On PostgreSQL notifications is range-partitioned by month on created_at
+(migration 015). `maintain_partitions` runs daily from Celery beat: it
+creates the coming months' partitions and detaches (and by default drops)
+months past the retention, instead of DELETEing old rows.
+"""
+import logging
+import re
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select, text, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, aliased, joinedload
+from sqlalchemy.sql import Insert, Select
+
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.notification import Notification, NotificationInbox
+from app.utils.pagination import after_cursor
+
+logger = logging.getLogger(__name__)
+
+PARTITION_NAME = re.compile(r"^notifications_y(\d{4})m(\d{2})$")
+
+
+def wall_clock(dialect_name: str):
+    """Current time at execution; PostgreSQL's now() is frozen at transaction start."""
+    if dialect_name == "postgresql":
+        return func.clock_timestamp()
+    return func.current_timestamp()
+
+
+def unread_filters(last_read_at: Optional[datetime]) -> list:
+    filters = [Notification.is_read == False]
+    if last_read_at is not None:
+        filters.append(Notification.created_at > last_read_at)
+    return filters
+
+
+def is_unread(notification: Notification, inbox: Optional[NotificationInbox]) -> bool:
+    if notification.is_read:
+        return False
+    return inbox is None or inbox.last_read_at is None or notification.created_at > inbox.last_read_at
+
+
+def inbox_query(
+    user_id: int,
+    notification_type: Optional[str] = None,
+    is_read: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    last_read_at: Optional[datetime] = None,
+) -> Select:
+    """One page of a user's notifications, newest first, plus one row to detect more."""
+    filters = [Notification.user_id == user_id]
+    if notification_type:
+        filters.append(Notification.notification_type == notification_type)
+    if cursor:
+        filters.append(after_cursor(Notification.created_at, Notification.id, cursor))
+    if is_read and last_read_at is not None:
+        # Read is "flagged read OR under the watermark": no index serves the OR,
+        # but each disjoint branch is a range on ix_notifications_user_read_created
+        branches = [
+            select(Notification)
+            .where(*filters, *branch)
+            .order_by(Notification.created_at.desc(), Notification.id.desc())
+            .limit(limit + 1)
+            .subquery()
+            for branch in (
+                (Notification.is_read == True,),
+                (Notification.is_read == False, Notification.created_at <= last_read_at),
+            )
+        ]
+        page = aliased(Notification, union_all(*(select(branch) for branch in branches)).subquery())
+        return (
+            select(page)
+            .options(joinedload(page.alert))
+            .order_by(page.created_at.desc(), page.id.desc())
+            .limit(limit + 1)
+        )
+    if is_read is False:
+        filters += unread_filters(last_read_at)
+    elif is_read:
+        filters.append(Notification.is_read == True)
+    return (
+        select(Notification)
+        .options(joinedload(Notification.alert))
+        .where(*filters)
+        .order_by(Notification.created_at.desc(), Notification.id.desc())
+        .limit(limit + 1)
+    )
+
+
+def inbox_state_query(user_id: int, for_update: bool = False) -> Select:
+    query = select(NotificationInbox).where(NotificationInbox.user_id == user_id)
+    return query.with_for_update() if for_update else query
+
+
+def ensure_inbox(dialect_name: str, user_id: int) -> Insert:
+    insert_ = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    return insert_(NotificationInbox).values(user_id=user_id).on_conflict_do_nothing(index_elements=["user_id"])
+
+
+def unread_count_query(user_id: int) -> Select:
+    counter = select(NotificationInbox.unread_count).where(NotificationInbox.user_id == user_id)
+    return select(func.coalesce(counter.scalar_subquery(), 0))
+
+
+def unread_counts_query(user_ids: Iterable[int]) -> Select:
+    """(user_id, unread_count) for the users that have an inbox row."""
+    return select(NotificationInbox.user_id, NotificationInbox.unread_count).where(
+        NotificationInbox.user_id.in_(list(user_ids))
+    )
+
+
+def add_unread(dialect_name: str, counts: Select) -> Insert:
+    """Upsert adding `counts` (user_id, n) rows to the users' unread counters."""
+    insert_ = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    stmt = insert_(NotificationInbox).from_select(["user_id", "unread_count"], counts)
+    return stmt.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={"unread_count": NotificationInbox.unread_count + stmt.excluded.unread_count},
+    )
+
+
+def read_all(dialect_name: str, user_id: int) -> Insert:
+    """Upsert moving the user's watermark to now and zeroing their unread counter."""
+    insert_ = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    stmt = insert_(NotificationInbox).values(
+        user_id=user_id, last_read_at=wall_clock(dialect_name), unread_count=0
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={"last_read_at": stmt.excluded.last_read_at, "unread_count": 0},
+    )
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month `months` after `month`'s."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def retention_start(today: date) -> date:
+    """Oldest month still kept; partitions ending on or before it are expired."""
+    return add_months(today, -settings.notification_retention_months)
+
+
+def partition_name(month: date) -> str:
+    return f"notifications_y{month.year:04d}m{month.month:02d}"
+
+
+def create_partition_ddl(month: date) -> str:
+    # Bounds in UTC, whatever the session's TimeZone
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF notifications "
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+        f"TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+    )
+
+
+def expire_partition_ddl(name: str, action: str) -> List[str]:
+    """Statements retiring one partition, run in a single transaction.
+
+    The partition is locked against writes first so the unread rows it
+    takes away from each inbox counter cannot change under the count.
+    """
+    statements = [
+        "SET LOCAL lock_timeout = '5s'",
+        f"LOCK TABLE {name} IN SHARE MODE",
+        f"""UPDATE notification_inbox AS inbox
+            SET unread_count = greatest(inbox.unread_count - expired.unread, 0)
+            FROM (
+                SELECT p.user_id, count(*) AS unread
+                FROM {name} AS p
+                LEFT JOIN notification_inbox AS i ON i.user_id = p.user_id
+                WHERE NOT p.is_read AND (i.last_read_at IS NULL OR p.created_at > i.last_read_at)
+                GROUP BY p.user_id
+            ) AS expired
+            WHERE inbox.user_id = expired.user_id""",
+        f"ALTER TABLE notifications DETACH PARTITION {name}",
+    ]
+    if action == "drop":
+        statements.append(f"DROP TABLE {name}")
+    return statements
+
+
+def partition_plan(existing: Iterable[str], today: date) -> Tuple[List[date], List[str]]:
+    """Months to create (this one and the next few) and partitions past retention."""
+    existing = set(existing)
+    current = today.replace(day=1)
+    to_create = [
+        month
+        for month in (add_months(current, n) for n in range(settings.notification_partitions_ahead + 1))
+        if partition_name(month) not in existing
+    ]
+    cutoff = retention_start(today)
+    expired = []
+    for name in sorted(existing):
+        match = PARTITION_NAME.match(name)
+        if match and add_months(date(int(match[1]), int(match[2]), 1), 1) <= cutoff:
+            expired.append(name)
+    return to_create, expired
+
+
+def maintain_partitions(db: Session, today: Optional[date] = None) -> Dict[str, List[str]]:
+    """Create upcoming partitions and retire expired ones; returns what changed."""
+    if db.get_bind().dialect.name != "postgresql":
+        # Unpartitioned outside PostgreSQL (development and tests)
+        return {"created": [], "expired": []}
+    today = today or datetime.utcnow().date()
+    existing = db.scalars(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = 'notifications'::regclass"
+    )).all()
+    to_create, expired = partition_plan(existing, today)
+    for month in to_create:
+        db.execute(text(create_partition_ddl(month)))
+        db.commit()
+    for name in expired:
+        for statement in expire_partition_ddl(name, settings.notification_retention_action):
+            db.execute(text(statement))
+        db.commit()
+    return {"created": [partition_name(month) for month in to_create], "expired": expired}
+
+
+@celery_app.task
+def cleanup_old_notifications():
+    """Daily partition maintenance for notifications."""
+    db = SessionLocal()
+    try:
+        changed = maintain_partitions(db)
+        logger.info(f"Notification partitions created {changed['created']}, expired {changed['expired']}")
+        return changed
+    finally:
+        db.close()
@@ -0,0 +1,263 @@
+"""
+Report counters and rollups.
+
+The dashboard summary is read from one row per counter in report_counters.
+Routers that change what the summary counts add their delta with
+`adjust_counters` before committing, so counters move in the same
+transaction as the data. `reconcile_counters` recounts from the source
+tables and fixes any drift; it runs from Celery beat.
+
+Monthly donation reports read donation_monthly_rollup, one row per
+(month, blood_type, location). create_donation upserts its row in the same
+transaction and `rebuild_monthly_rollup` regenerates the table from
+donations. Date filters that cut through a month are answered from the
+donations table for that month only.
+"""
+import logging
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Date, case, cast, delete, func, insert, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Insert, Select, Update
+
+from app.core.celery_app import celery_app
+from app.db.session import SessionLocal
+from app.models.donation import Donation
+from app.models.donor import AvailabilityStatus, DonorProfile
+from app.models.report import DonationMonthlyRollup, ReportCounter
+from app.models.user import User, UserStatus
+
+logger = logging.getLogger(__name__)
+
+TOTAL_DONORS = "total_donors"
+AVAILABLE_DONORS = "available_donors"
+TOTAL_DONATIONS = "total_donations"
+COUNTERS = (TOTAL_DONORS, AVAILABLE_DONORS, TOTAL_DONATIONS)
+
+
+def counter_queries() -> Dict[str, Select]:
+    """Full COUNT(*) queries each counter is maintained against.
+
+    Donors count while their user is active; delete_donor deactivates the user.
+    """
+    active_donors = (
+        select(func.count(DonorProfile.id))
+        .join(User, User.id == DonorProfile.user_id)
+        .where(User.status == UserStatus.ACTIVE)
+    )
+    return {
+        TOTAL_DONORS: active_donors,
+        AVAILABLE_DONORS: active_donors.where(
+            DonorProfile.availability == AvailabilityStatus.AVAILABLE.value
+        ),
+        TOTAL_DONATIONS: select(func.count(Donation.id)),
+    }
+
+
+def availability_delta(old: str, new: str) -> int:
+    """Change in available_donors when a counted donor's availability moves."""
+    available = AvailabilityStatus.AVAILABLE.value
+    return int(new == available) - int(old == available)
+
+
+def adjust_counters(**deltas: int) -> Update:
+    """Single UPDATE adding each delta to its counter; the caller executes and commits."""
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    return (
+        update(ReportCounter)
+        .where(ReportCounter.name.in_(list(deltas)))
+        .values(value=ReportCounter.value + case(deltas, value=ReportCounter.name, else_=0))
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def read_counters(db: AsyncSession) -> Dict[str, int]:
+    """Current counter values; counters without a row yet are counted live."""
+    rows = await db.execute(select(ReportCounter.name, ReportCounter.value))
+    values = {name: value for name, value in rows}
+    for name, query in counter_queries().items():
+        if name not in values:
+            values[name] = await db.scalar(query)
+    return {name: values[name] for name in COUNTERS}
+
+
+def reconcile_counters(db: Session) -> Dict[str, int]:
+    """Recount every counter and store the result; returns the drift that was fixed."""
+    # Locking the rows first makes concurrent adjust_counters wait, so their
+    # deltas land on top of the recount instead of being overwritten by it
+    stored = {
+        counter.name: counter
+        for counter in db.scalars(select(ReportCounter).with_for_update())
+    }
+    drift = {}
+    for name, query in counter_queries().items():
+        actual = db.scalar(query)
+        counter = stored.get(name)
+        if counter is None:
+            db.add(ReportCounter(name=name, value=actual))
+        elif counter.value != actual:
+            drift[name] = actual - counter.value
+            counter.value = actual
+    db.commit()
+    return drift
+
+
+def month_start(column, dialect_name: str):
+    """SQL expression for the first day of `column`'s month."""
+    if dialect_name == "sqlite":
+        return func.date(column, "start of month")
+    return cast(func.date_trunc("month", column), Date)
+
+
+def next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def rollup_increment(dialect_name: str, donation_date: date, blood_type: str, location: str, units: int) -> Insert:
+    """Upsert adding one donation to its rollup row; the caller executes and commits."""
+    return rollup_add(dialect_name, [{
+        "month": donation_date.replace(day=1),
+        "blood_type": blood_type,
+        "location": location,
+        "count": 1,
+        "units": units,
+    }])
+
+
+def rollup_add(dialect_name: str, totals: List[Dict]) -> Insert:
+    """Upsert adding (month, blood_type, location, count, units) totals to their rollup rows."""
+    insert_ = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    stmt = insert_(DonationMonthlyRollup).values(totals)
+    return stmt.on_conflict_do_update(
+        index_elements=["month", "blood_type", "location"],
+        set_={
+            "count": DonationMonthlyRollup.count + stmt.excluded.count,
+            "units": DonationMonthlyRollup.units + stmt.excluded.units,
+        },
+    )
+
+
+def rebuild_monthly_rollup(db: Session) -> int:
+    """Regenerate donation_monthly_rollup from donations; returns rows written."""
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        # Upserts from create_donation wait for the rebuild instead of landing
+        # on rows it is about to delete
+        db.execute(text("LOCK TABLE donation_monthly_rollup IN EXCLUSIVE MODE"))
+    db.execute(delete(DonationMonthlyRollup))
+    month = month_start(Donation.donation_date, dialect_name).label("month")
+    written = db.execute(
+        insert(DonationMonthlyRollup).from_select(
+            ["month", "blood_type", "location", "count", "units"],
+            select(
+                month,
+                Donation.blood_type,
+                Donation.location,
+                func.count(Donation.id),
+                func.sum(Donation.units),
+            ).group_by(month, Donation.blood_type, Donation.location),
+        )
+    ).rowcount
+    db.commit()
+    return written
+
+
+ROLLUP_DIMENSIONS = {
+    "blood_type": (DonationMonthlyRollup.blood_type, Donation.blood_type),
+    "location": (DonationMonthlyRollup.location, Donation.location),
+}
+
+
+async def monthly_totals(
+    db: AsyncSession,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    dimension: Optional[str] = None,
+) -> List[Tuple[date, Optional[str], int, int]]:
+    """(month, dimension value, donation count, units) rows in month order.
+
+    Whole months come from the rollup; a partial first or last month is
+    counted from donations over just the requested days.
+    """
+    rollup_key, donation_key = ROLLUP_DIMENSIONS.get(dimension, (None, None))
+    raw_ranges = []
+    first_month, end_month = start_date, None  # rollup months in [first_month, end_month)
+
+    if start_date and start_date.day != 1:
+        month_end = next_month(start_date) - timedelta(days=1)
+        raw_ranges.append((start_date, min(month_end, end_date) if end_date else month_end))
+        first_month = next_month(start_date)
+    if end_date:
+        end_month = end_date.replace(day=1)
+        if next_month(end_date) - timedelta(days=1) == end_date:
+            end_month = next_month(end_date)
+        elif first_month is None or end_month >= first_month:
+            raw_ranges.append((end_month, end_date))
+
+    totals: Dict[Tuple[date, Optional[str]], List[int]] = {}
+
+    def add(month, key, count, units):
+        entry = totals.setdefault((month, key), [0, 0])
+        entry[0] += count
+        entry[1] += units or 0
+
+    if end_month is None or first_month is None or first_month < end_month:
+        columns = [DonationMonthlyRollup.month] + ([rollup_key] if rollup_key is not None else [])
+        query = select(
+            *columns,
+            func.sum(DonationMonthlyRollup.count),
+            func.sum(DonationMonthlyRollup.units),
+        ).group_by(*columns)
+        if first_month:
+            query = query.where(DonationMonthlyRollup.month >= first_month)
+        if end_month:
+            query = query.where(DonationMonthlyRollup.month < end_month)
+        for row in await db.execute(query):
+            if rollup_key is not None:
+                add(row[0], row[1], row[2], row[3])
+            else:
+                add(row[0], None, row[1], row[2])
+
+    for range_start, range_end in raw_ranges:
+        columns = [donation_key] if donation_key is not None else []
+        query = select(*columns, func.count(Donation.id), func.sum(Donation.units)).where(
+            Donation.donation_date >= range_start, Donation.donation_date <= range_end
+        )
+        if columns:
+            query = query.group_by(*columns)
+        for row in await db.execute(query):
+            if donation_key is not None:
+                add(range_start.replace(day=1), row[0], row[1], row[2])
+            elif row[0]:
+                add(range_start.replace(day=1), None, row[0], row[1])
+
+    return [
+        (month, key, count, units)
+        for (month, key), (count, units) in sorted(totals.items(), key=lambda item: (item[0][0], str(item[0][1])))
+    ]
+
+
+@celery_app.task
+def reconcile_report_counters():
+    """Fix report counter drift."""
+    db = SessionLocal()
+    try:
+        drift = reconcile_counters(db)
+        if drift:
+            logger.warning(f"Report counters drifted: {drift}")
+        return drift
+    finally:
+        db.close()
+
+
+@celery_app.task
+def rebuild_donation_rollup():
+    """Regenerate the monthly donation rollup from donations."""
+    db = SessionLocal()
+    try:
+        return rebuild_monthly_rollup(db)
+    finally:
+        db.close()
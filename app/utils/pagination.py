@@ -0,0 +1,139 @@
+"""
+Keyset (cursor) pagination.
+
+A page is ordered by (sort column, id) and the cursor carries the last
+row's values, so the next page is a range scan that starts right after it
+instead of an OFFSET that re-reads every earlier row. Cursors are opaque
+to clients: base64url-encoded JSON plus an HMAC over it and the sort
+column, so a client can neither forge a position nor replay one list's
+cursor on another.
+
+A list endpoint applies `keyset` to its query, executes it, splits the
+rows with `page_of` and returns a CursorPage; `link_next` adds the
+matching `Link: <...>; rel="next"` header. Lists that report a total
+count it separately (see app.utils.query_plan for planner estimates).
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import and_, literal, tuple_
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _signature(payload: str, scope: str) -> str:
+    digest = hmac.new(
+        settings.cursor_signing_key.encode(), f"{scope}\0{payload}".encode(), hashlib.sha256
+    ).digest()
+    return _b64encode(digest[:16])
+
+
+def cursor_scope(sort_column) -> str:
+    """Name a cursor is signed for, e.g. "notifications.created_at"."""
+    return f"{sort_column.class_.__tablename__}.{sort_column.key}"
+
+
+def encode_cursor(sort_value: Any, row_id: int, scope: str = "") -> str:
+    if isinstance(sort_value, datetime):
+        sort_value = {"dt": sort_value.isoformat()}
+    elif isinstance(sort_value, date):
+        sort_value = {"d": sort_value.isoformat()}
+    payload = _b64encode(json.dumps([sort_value, row_id], separators=(",", ":")).encode())
+    return f"{payload}.{_signature(payload, scope)}"
+
+
+def decode_cursor(cursor: str, scope: str = "") -> Tuple[Any, int]:
+    """Inverse of encode_cursor; a malformed, tampered or foreign cursor is a 400."""
+    try:
+        payload, signature = cursor.split(".")
+        if not hmac.compare_digest(signature, _signature(payload, scope)):
+            raise ValueError("bad signature")
+        sort_value, row_id = json.loads(_b64decode(payload))
+        if isinstance(sort_value, dict):
+            if "dt" in sort_value:
+                sort_value = datetime.fromisoformat(sort_value["dt"])
+            else:
+                sort_value = date.fromisoformat(sort_value["d"])
+        return sort_value, int(row_id)
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def after_cursor(sort_column, id_column, cursor: str, descending: bool = True):
+    """Filter selecting rows that come after `cursor` in (sort_column, id_column) order."""
+    sort_value, row_id = decode_cursor(cursor, cursor_scope(sort_column))
+    # A row-value comparison is a single index range condition on (sort, id);
+    # tuple elements aren't coerced, so bind with the columns' types explicitly
+    keys = tuple_(sort_column, id_column)
+    sort_bound = literal(sort_value, sort_column.type)
+    bound = tuple_(sort_bound, literal(row_id, id_column.type))
+    # The plain comparison is implied by the row comparison, but only it lets
+    # PostgreSQL prune partitions of a table partitioned on sort_column
+    if descending:
+        return and_(sort_column <= sort_bound, keys < bound)
+    return and_(sort_column >= sort_bound, keys > bound)
+
+
+def keyset(
+    query: Select,
+    sort_column,
+    id_column,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True,
+) -> Select:
+    """`query` restricted to the page after `cursor`, plus one row to detect more."""
+    if cursor:
+        query = query.where(after_cursor(sort_column, id_column, cursor, descending))
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column, id_column)
+    return query.limit(limit + 1)
+
+
+def page_of(
+    rows: Sequence[Any],
+    limit: int,
+    sort_column,
+    id_column,
+    entity: Optional[Callable[[Any], Any]] = None,
+) -> Tuple[List[Any], Optional[str]]:
+    """Split `limit + 1` fetched rows into the page and the cursor for the next one.
+
+    `entity` picks the mapped object out of a row when the query selects
+    more than one thing.
+    """
+    items = list(rows[:limit])
+    if len(rows) <= limit:
+        return items, None
+    last = entity(items[-1]) if entity else items[-1]
+    cursor = encode_cursor(
+        getattr(last, sort_column.key), getattr(last, id_column.key), cursor_scope(sort_column)
+    )
+    return items, cursor
+
+
+def link_next(request: Request, response: Response, next_cursor: Optional[str]) -> None:
+    """RFC 8288 Link header pointing at the next page, when there is one."""
+    if next_cursor:
+        url = request.url.include_query_params(cursor=next_cursor)
+        response.headers["Link"] = f'<{url}>; rel="next"'
@@ -0,0 +1,48 @@
+"""
+Query plans and planner row estimates.
+
+`explain` wraps a statement in the dialect's EXPLAIN: JSON output on
+PostgreSQL, EXPLAIN QUERY PLAN on SQLite. `estimate_rows` reads the
+planner's row estimate for a query instead of running it, for totals that
+need not be exact.
+"""
+import json
+from typing import Any, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+class explain(Executable, ClauseElement):
+    """`EXPLAIN (FORMAT JSON)` of a statement on PostgreSQL, `EXPLAIN QUERY PLAN` on SQLite."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}"
+
+
+@compiles(explain, "sqlite")
+def _compile_explain_sqlite(element, compiler, **kw):
+    return f"EXPLAIN QUERY PLAN {compiler.process(element.statement, **kw)}"
+
+
+def plan_rows(plan_output: Any) -> int:
+    """Top node's row estimate from EXPLAIN (FORMAT JSON) output."""
+    if isinstance(plan_output, (str, bytes)):
+        plan_output = json.loads(plan_output)
+    return int(plan_output[0]["Plan"]["Plan Rows"])
+
+
+async def estimate_rows(db: AsyncSession, query: Select) -> Optional[int]:
+    """Planner's estimate of the rows `query` returns; None where there is no planner estimate."""
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    return plan_rows(await db.scalar(explain(query)))
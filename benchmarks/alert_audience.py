@@ -0,0 +1,90 @@
+"""
+Richer alert audiences at 1M donors: "O- or O+ in five municipalities,
+ages 18-45, not donated in 90 days" as the one compiled statement, against
+what the old exact-match audiences needed (one alert per blood type and
+municipality pair, ten statements, with no way to express the age range
+or recency, so they reach more donors). Also times the creation-time
+index check.
+
+    python -m benchmarks.alert_audience --donors 1000000 --donations 500000 --repeat 10
+"""
+import argparse
+import asyncio
+import itertools
+import time
+
+from sqlalchemy import func, select
+
+from app.db.session import AsyncSessionLocal, SessionLocal
+from app.models.donation import Donation
+from app.models.donor import DonorProfile
+from app.schemas.notification import TargetAudience
+from app.services.audience_service import audience_filters, audience_query, unindexed_tables
+from benchmarks.common import MUNICIPALITIES, ensure_schema, percentile, seed_donations, seed_donors
+
+AUDIENCE = TargetAudience(
+    blood_type=["O-", "O+"],
+    municipality=MUNICIPALITIES[:5],
+    age={"min": 18, "max": 45},
+    not_donated_within_days=90,
+)
+
+
+def compiled(db) -> int:
+    return db.scalar(select(func.count()).select_from(audience_query(AUDIENCE).subquery()))
+
+
+def exact_match_alerts(db) -> int:
+    reached = 0
+    for blood_type, municipality in itertools.product(AUDIENCE.blood_type, AUDIENCE.municipality):
+        exact = TargetAudience(blood_type=[blood_type], municipality=[municipality])
+        reached += db.scalar(select(func.count(DonorProfile.id)).where(*audience_filters(exact)))
+    return reached
+
+
+async def index_check(repeat: int) -> list:
+    timings = []
+    async with AsyncSessionLocal() as db:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            assert await unindexed_tables(db, AUDIENCE) == []
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--donors", type=int, default=1_000_000)
+    parser.add_argument("--donations", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    ensure_schema()
+
+    db = SessionLocal()
+    try:
+        donors = db.scalar(select(func.count(DonorProfile.id)))
+        if donors < args.donors:
+            seed_donors(args.donors - donors)
+        donations = db.scalar(select(func.count(Donation.id)))
+        if donations < args.donations:
+            seed_donations(args.donations - donations)
+
+        for label, run in (("10 exact-match alerts", exact_match_alerts), ("one compiled audience", compiled)):
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                reached = run(db)
+                timings.append((time.perf_counter() - start) * 1000)
+            print(
+                f"{label:<22} reach {reached:>7}  p50 {percentile(timings, 50):8.1f} ms"
+                f"  p99 {percentile(timings, 99):8.1f} ms"
+            )
+    finally:
+        db.close()
+
+    timings = asyncio.run(index_check(args.repeat))
+    print(f"index check            p50 {percentile(timings, 50):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Push versus pull delivery of a broadcast to every donor: send latency
+(deliver_alert from queued to completed) and inbox read latency, the first
+read after the send (where pull merges the alert in) and a repeat read.
+
+    python -m benchmarks.alert_delivery_modes --donors 100000 --readers 200
+"""
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime
+
+import httpx
+from sqlalchemy import delete, func, select
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.session import SessionLocal, async_engine
+from app.main import app
+from app.models.donor import DonorProfile
+from app.models.notification import Alert, Notification, NotificationInbox
+from app.models.user import User
+from app.services.alert_service import deliver_alert
+from benchmarks.common import ensure_schema, percentile, seed_donors
+
+
+async def read_inboxes(tokens):
+    """Per-reader latency of GET /notifications, first read then repeat read."""
+    transport = httpx.ASGITransport(app=app)
+    timings = {"first read": [], "repeat read": []}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label in timings:
+            for token in tokens:
+                start = time.perf_counter()
+                response = await client.get("/api/v1/notifications", headers={"Authorization": f"Bearer {token}"})
+                response.raise_for_status()
+                timings[label].append((time.perf_counter() - start) * 1000)
+    await async_engine.dispose()
+    return timings
+
+
+def reset(db):
+    db.execute(delete(Notification))
+    db.execute(delete(NotificationInbox))
+    db.execute(delete(Alert))
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--donors", type=int, default=100_000)
+    parser.add_argument("--readers", type=int, default=200)
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    ensure_schema()
+    db = SessionLocal()
+    threshold = settings.alert_pull_threshold
+    try:
+        donors = db.scalar(select(func.count(DonorProfile.id)))
+        if donors < args.donors:
+            seed_donors(args.donors - donors)
+        admin_id = db.scalar(select(func.min(User.id)))
+        readers = db.scalars(select(DonorProfile.user_id).order_by(func.random()).limit(args.readers)).all()
+        tokens = [create_access_token(data={"sub": str(uid), "role": "donor"}) for uid in readers]
+
+        for mode, mode_threshold in (("push", 0), ("pull", 1)):
+            reset(db)
+            settings.alert_pull_threshold = mode_threshold
+            alert = Alert(
+                title="Blood drive this Saturday",
+                message="All donors are welcome at the city hall blood drive.",
+                alert_type="general_announcement",
+                priority="medium",
+                created_by=admin_id,
+                sent_at=datetime.utcnow(),
+            )
+            db.add(alert)
+            db.commit()
+
+            start = time.perf_counter()
+            deliver_alert(db, alert.id)
+            send_ms = (time.perf_counter() - start) * 1000
+            rows = db.scalar(select(func.count(Notification.id)))
+            print(f"{mode}: send {send_ms:10.1f} ms, {rows} notification rows written")
+
+            for label, timings in asyncio.run(read_inboxes(tokens)).items():
+                print(
+                    f"{mode}: {label:<12} p50 {percentile(timings, 50):7.2f} ms  "
+                    f"p95 {percentile(timings, 95):7.2f} ms"
+                )
+        reset(db)
+    finally:
+        settings.alert_pull_threshold = threshold
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
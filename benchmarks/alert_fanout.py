@@ -0,0 +1,95 @@
+"""
+Alert fan-out time and peak Python memory at 1k, 10k and 100k donors.
+
+Compares the original per-recipient ORM fan-out (`query.all()` + one
+`db.add(Notification(...))` per donor) with the chunked INSERT ... SELECT
+run by the alert_service worker.
+
+    python -m benchmarks.alert_fanout --sizes 1000 10000 100000
+"""
+import argparse
+import time
+import tracemalloc
+
+from sqlalchemy import delete, func, select
+
+from app.db.session import SessionLocal
+from app.models.donor import DonorProfile
+from app.models.notification import Alert, Notification
+from app.models.user import User, UserRole
+from app.services.alert_service import deliver_alert
+from app.services.audience_service import audience_filters
+from benchmarks.common import ensure_schema, seed_donors
+
+
+def legacy_fan_out(db, alert):
+    profiles = db.scalars(select(DonorProfile).where(*audience_filters(alert.target_audience))).all()
+    for profile in profiles:
+        db.add(Notification(
+            user_id=profile.user_id,
+            title=alert.title,
+            message=alert.message,
+            notification_type="alert",
+            alert_id=alert.id,
+        ))
+    db.commit()
+    return len(profiles)
+
+
+def chunked_fan_out(db, alert):
+    return deliver_alert(db, alert.id).recipient_count
+
+
+def measure(db, strategy, admin_id: int):
+    alert = Alert(
+        title="Urgent: all blood types needed",
+        message="x" * 512,
+        alert_type="urgent_request",
+        priority="critical",
+        target_audience=None,
+        created_by=admin_id,
+    )
+    db.add(alert)
+    db.commit()
+    tracemalloc.start()
+    start = time.perf_counter()
+    written = strategy(db, alert)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.execute(delete(Notification).where(Notification.alert_id == alert.id))
+    db.execute(delete(Alert).where(Alert.id == alert.id))
+    db.commit()
+    return written, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+    ensure_schema()
+
+    db = SessionLocal()
+    admin = User(full_name="Bench Admin", contact_number="09000000000", role=UserRole.ADMIN)
+    db.add(admin)
+    db.commit()
+    admin_id = admin.id
+    try:
+        for size in sorted(args.sizes):
+            current = db.scalar(select(func.count(DonorProfile.id)))
+            if current < size:
+                seed_donors(size - current)
+            for label, strategy in (("per-row ORM", legacy_fan_out), ("chunked INSERT ... SELECT", chunked_fan_out)):
+                written, elapsed, peak = measure(db, strategy, admin_id)
+                print(
+                    f"{size:>7} donors  {label:<26} {written:>7} rows  "
+                    f"{elapsed * 1000:9.1f} ms  peak {peak / 1024 / 1024:8.2f} MiB"
+                )
+    finally:
+        db.execute(delete(User).where(User.id == admin_id))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Requests per second on a fast endpoint while slow queries run in parallel.
+
+Compares the old pattern (synchronous Session inside `async def`, which blocks
+the event loop for the whole query) with the AsyncSession request path.
+
+    python -m benchmarks.async_db_concurrency --duration 5 --slow 4
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+from fastapi import Depends
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import SessionLocal, async_engine, engine, get_db
+from app.main import app
+from benchmarks.common import ensure_schema
+
+
+def slow_query_sql(seconds: float) -> str:
+    if engine.dialect.name == "postgresql":
+        return f"SELECT pg_sleep({seconds})"
+    # SQLite has no sleep(); burn CPU inside the engine instead
+    rows = int(seconds * 10_000_000)
+    return (
+        "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c "
+        f"WHERE x < {rows}) SELECT count(*) FROM c"
+    )
+
+
+def install_bench_routes(seconds: float):
+    sql = text(slow_query_sql(seconds))
+
+    @app.get("/bench/slow-sync")
+    async def slow_sync():
+        db = SessionLocal()
+        try:
+            db.execute(sql)
+        finally:
+            db.close()
+        return {"ok": True}
+
+    @app.get("/bench/slow-async")
+    async def slow_async(db: AsyncSession = Depends(get_db)):
+        await db.execute(sql)
+        return {"ok": True}
+
+
+async def run(mode: str, duration: float, slow_workers: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.perf_counter() + duration
+        completed = 0
+
+        async def slow_loop():
+            while time.perf_counter() < deadline:
+                await client.get(f"/bench/slow-{mode}")
+
+        async def fast_loop():
+            nonlocal completed
+            while time.perf_counter() < deadline:
+                response = await client.get("/api/v1/alerts")
+                response.raise_for_status()
+                completed += 1
+
+        await asyncio.gather(
+            *(slow_loop() for _ in range(slow_workers)),
+            *(fast_loop() for _ in range(8)),
+        )
+    # Pooled connections are bound to this event loop
+    await async_engine.dispose()
+    return completed / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--slow", type=int, default=4, help="concurrent slow requests")
+    parser.add_argument("--slow-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    ensure_schema()
+    install_bench_routes(args.slow_seconds)
+    for mode, label in (("sync", "before (sync Session)"), ("async", "after (AsyncSession)")):
+        rps = asyncio.run(run(mode, args.duration, args.slow))
+        print(f"{label}: {rps:.1f} req/s on /api/v1/alerts with {args.slow} slow queries in flight")
+
+
+if __name__ == "__main__":
+    main()
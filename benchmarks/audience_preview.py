@@ -0,0 +1,77 @@
+"""
+Alert audience preview at scale: writing the bitmap snapshot (time and
+file size), then the exact count plus a 10-donor sample for random
+audiences from the mapped snapshot against COUNT(*) and ORDER BY id DESC
+LIMIT 10 in SQL.
+
+    python -m benchmarks.audience_preview --donors 1000000 --queries 200
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import func, select
+
+from app.core.bitmap_index import SnapshotFile
+from app.db.session import AsyncSessionLocal, SessionLocal
+from app.models.donor import DonorProfile
+from app.services import audience_service
+from benchmarks.common import BLOOD_TYPES, MUNICIPALITIES, ensure_schema, percentile, seed_donors
+
+
+def audiences(count: int, seed: int = 5) -> list:
+    rng = random.Random(seed)
+    targets = []
+    for _ in range(count):
+        target = {}
+        if rng.random() < 0.8:
+            target["blood_type"] = rng.choice(BLOOD_TYPES)
+        if rng.random() < 0.6:
+            target["municipality"] = rng.choice(MUNICIPALITIES)
+        if rng.random() < 0.7:
+            target["availability"] = "available"
+        targets.append(target)
+    return targets
+
+
+async def previews(targets: list) -> list:
+    timings = []
+    async with AsyncSessionLocal() as db:
+        for target in targets:
+            start = time.perf_counter()
+            await audience_service.preview_audience(db, target, 10)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--donors", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    ensure_schema()
+
+    db = SessionLocal()
+    try:
+        donors = db.scalar(select(func.count(DonorProfile.id)))
+        if donors < args.donors:
+            seed_donors(args.donors - donors)
+        path = os.path.join(tempfile.mkdtemp(prefix="audience_index_"), "audience_index.bin")
+        start = time.perf_counter()
+        indexed, size = audience_service.build_audience_index(db, path)
+        print(f"snapshot: {indexed} donors in {time.perf_counter() - start:.1f} s, {size / 2**20:.1f} MiB")
+    finally:
+        db.close()
+
+    targets = audiences(args.queries)
+    for label, index in (("SQL count + sample", SnapshotFile(path + ".none")), ("bitmap snapshot", SnapshotFile(path))):
+        audience_service.audience_index = index
+        timings = asyncio.run(previews(targets))
+        print(f"{label:<20} p50 {percentile(timings, 50):9.3f} ms  p99 {percentile(timings, 99):9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Throughput of /auth/login and /auth/refresh, plus the per-call cost of the
+old bcrypt refresh-token hash versus the HMAC-SHA256 digest now stored.
+
+    python -m benchmarks.auth_throughput --requests 500 --concurrency 16
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import bcrypt
+import httpx
+from sqlalchemy import select
+
+from app.core.security import create_refresh_token, hash_refresh_token
+from app.db.session import SessionLocal, async_engine
+from app.main import app
+from app.models.user import User
+from app.routers.auth import limiter
+from benchmarks.common import ensure_schema, seed_donors
+
+
+def bcrypt_hash(token: str) -> bytes:
+    # What get_password_hash did (passlib default: 12 rounds); bcrypt reads 72 bytes
+    return bcrypt.hashpw(token.encode()[:72], bcrypt.gensalt(rounds=12))
+
+
+def hash_cost(fn, token: str, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(token)
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+async def run(contact_numbers, total: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        refresh_tokens = {}
+        queue = list(range(total))
+
+        async def login_worker():
+            while queue:
+                i = queue.pop()
+                number = contact_numbers[i % len(contact_numbers)]
+                response = await client.post("/api/v1/auth/login", json={"contact_number": number})
+                response.raise_for_status()
+                refresh_tokens[number] = response.json()["refresh_token"]
+
+        start = time.perf_counter()
+        await asyncio.gather(*(login_worker() for _ in range(concurrency)))
+        login_rps = total / (time.perf_counter() - start)
+
+        # One refresh chain per user: rotating the same token concurrently is reuse
+        numbers = list(refresh_tokens)
+        rounds = max(1, total // len(numbers))
+
+        async def refresh_worker(number):
+            token = refresh_tokens[number]
+            for _ in range(rounds):
+                response = await client.post("/api/v1/auth/refresh", json={"refresh_token": token})
+                response.raise_for_status()
+                token = response.json()["refresh_token"]
+
+        start = time.perf_counter()
+        for offset in range(0, len(numbers), concurrency):
+            await asyncio.gather(*(refresh_worker(n) for n in numbers[offset:offset + concurrency]))
+        refresh_rps = rounds * len(numbers) / (time.perf_counter() - start)
+    await async_engine.dispose()
+    return login_rps, refresh_rps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=100)
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    ensure_schema()
+    db = SessionLocal()
+    numbers = db.scalars(select(User.contact_number).limit(args.users)).all()
+    if len(numbers) < args.users:
+        seed_donors(args.users - len(numbers))
+        numbers = db.scalars(select(User.contact_number).limit(args.users)).all()
+    db.close()
+
+    token = create_refresh_token(data={"sub": "1", "fam": "bench"})
+    print(f"bcrypt hash per refresh token:      {hash_cost(bcrypt_hash, token, 5):8.3f} ms")
+    print(f"HMAC-SHA256 digest per refresh token: {hash_cost(hash_refresh_token, token, 10000):8.3f} ms")
+
+    limiter.enabled = False
+    login_rps, refresh_rps = asyncio.run(run(numbers, args.requests, args.concurrency))
+    print(f"/auth/login:   {login_rps:8.1f} req/s")
+    print(f"/auth/refresh: {refresh_rps:8.1f} req/s")
+
+
+if __name__ == "__main__":
+    main()
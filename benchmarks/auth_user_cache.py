@@ -0,0 +1,76 @@
+"""
+Authenticated requests per second with the get_current_user cache on and off.
+
+Polls GET /api/v1/notifications/unread-count as a set of donors would.
+
+    python -m benchmarks.auth_user_cache --duration 5 --users 50
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+from sqlalchemy import select
+
+from app.core.dependencies import user_cache
+from app.core.security import create_access_token
+from app.db.session import SessionLocal, async_engine
+from app.main import app
+from app.models.donor import DonorProfile
+from benchmarks.common import ensure_schema, seed_donors
+
+
+async def run(tokens, duration: float, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.perf_counter() + duration
+        completed = 0
+
+        async def worker(offset: int):
+            nonlocal completed
+            i = offset
+            while time.perf_counter() < deadline:
+                token = tokens[i % len(tokens)]
+                response = await client.get(
+                    "/api/v1/notifications/unread-count",
+                    headers={"Authorization": f"Bearer {token}"},
+                )
+                response.raise_for_status()
+                completed += 1
+                i += concurrency
+
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    await async_engine.dispose()
+    return completed / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    ensure_schema()
+    db = SessionLocal()
+    user_ids = db.scalars(select(DonorProfile.user_id).limit(args.users)).all()
+    if len(user_ids) < args.users:
+        seed_donors(args.users - len(user_ids))
+        user_ids = db.scalars(select(DonorProfile.user_id).limit(args.users)).all()
+    db.close()
+    tokens = [create_access_token(data={"sub": str(uid), "role": "donor"}) for uid in user_ids]
+
+    ttl = user_cache.ttl
+    for label, cache_ttl in (("cache off", 0), ("cache on", ttl or 60)):
+        user_cache.clear()
+        user_cache.ttl = cache_ttl
+        user_cache.hits = user_cache.misses = 0
+        rps = asyncio.run(run(tokens, args.duration, args.concurrency))
+        print(f"{label}: {rps:.1f} authenticated req/s  {user_cache.stats()}")
+    user_cache.ttl = ttl
+
+
+if __name__ == "__main__":
+    main()
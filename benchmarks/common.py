@@ -0,0 +1,116 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks run against DATABASE_URL (use a disposable PostgreSQL database;
+SQLite works for smoke runs) and create the schema if it is missing.
+"""
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from sqlalchemy import func, insert, select
+
+from app.db.session import Base, SessionLocal, engine
+from app.models import donation, donor, message, notification, report, user  # noqa: F401
+from app.models.donation import Donation
+from app.models.donor import DonorProfile, DonorRegistration
+from app.models.user import ThemePreference, User, UserRole, UserStatus
+
+BLOOD_TYPES = ["O+", "A+", "B+", "AB+", "O-", "A-", "B-", "AB-"]
+BLOOD_TYPE_WEIGHTS = [35, 28, 20, 8, 4, 3, 1.5, 0.5]
+MUNICIPALITIES = [
+    "Quezon City", "Manila", "Cebu City", "Davao City", "Caloocan",
+    "Makati", "Pasig", "Taguig", "Iloilo City", "Bacolod",
+]
+FIRST_NAMES = ["Juan", "Maria", "Jose", "Ana", "Mark", "Joy", "Paul", "Grace", "Miguel", "Kristine"]
+LAST_NAMES = ["Dela Cruz", "Santos", "Reyes", "Garcia", "Bautista", "Mendoza", "Villanueva", "Torres"]
+
+
+def ensure_schema():
+    """Create any missing tables, and indexes added to existing ones since."""
+    Base.metadata.create_all(engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+
+@contextmanager
+def timed(label: str):
+    """Print wall time of the enclosed block."""
+    start = time.perf_counter()
+    yield
+    print(f"{label}: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def seed_donors(count: int, batch_size: int = 10000, seed: int = 42) -> int:
+    """Insert `count` synthetic users/registrations/profiles; returns rows added."""
+    rng = random.Random(seed)
+    db = SessionLocal()
+    try:
+        admin_id = db.scalar(select(func.min(User.id)))
+        base = (db.scalar(select(func.max(User.id))) or 0) + 1
+        for start in range(0, count, batch_size):
+            ids = range(base + start, base + min(start + batch_size, count))
+            users, registrations, profiles = [], [], []
+            for i in ids:
+                blood_type = rng.choices(BLOOD_TYPES, weights=BLOOD_TYPE_WEIGHTS)[0]
+                municipality = rng.choice(MUNICIPALITIES)
+                availability = rng.choices(
+                    ["available", "unavailable", "recently_donated"], weights=[70, 10, 20]
+                )[0]
+                full_name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}"
+                contact_number = f"09{i:09d}"
+                age = rng.randint(18, 65)
+                users.append({
+                    "id": i, "full_name": full_name, "contact_number": contact_number,
+                    "role": UserRole.DONOR, "status": UserStatus.ACTIVE,
+                    "theme_preference": ThemePreference.SYSTEM,
+                })
+                registrations.append({
+                    "id": i, "full_name": full_name, "contact_number": contact_number,
+                    "age": age, "blood_type": blood_type, "municipality": municipality,
+                    "availability": availability, "status": "approved", "reviewed_by": admin_id,
+                })
+                profiles.append({
+                    "id": i, "user_id": i, "registration_id": i, "age": age,
+                    "blood_type": blood_type, "municipality": municipality,
+                    "availability": availability,
+                })
+            db.execute(insert(User), users)
+            db.execute(insert(DonorRegistration), registrations)
+            db.execute(insert(DonorProfile), profiles)
+            db.commit()
+        return count
+    finally:
+        db.close()
+
+
+def seed_donations(count: int, batch_size: int = 50000, seed: int = 42) -> int:
+    """Insert `count` synthetic donations spread over existing donor profiles."""
+    rng = random.Random(seed)
+    db = SessionLocal()
+    try:
+        profiles = db.execute(select(DonorProfile.id, DonorProfile.blood_type)).all()
+        today = date.today()
+        for start in range(0, count, batch_size):
+            rows = []
+            for _ in range(min(batch_size, count - start)):
+                profile_id, blood_type = rng.choice(profiles)
+                rows.append({
+                    "donor_profile_id": profile_id,
+                    "donation_date": today - timedelta(days=rng.randint(0, 5 * 365)),
+                    "blood_type": blood_type, "units": 1,
+                    "location": rng.choice(MUNICIPALITIES),
+                })
+            db.execute(insert(Donation), rows)
+            db.commit()
+        return count
+    finally:
+        db.close()
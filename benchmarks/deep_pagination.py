@@ -0,0 +1,74 @@
+"""
+Page latency by depth for the donations list: OFFSET/LIMIT (the old
+skip/limit lists) against the keyset cursor the list endpoints now use.
+Each depth is reached by walking cursors from the first page, then the
+page at that depth is timed both ways.
+
+    python -m benchmarks.deep_pagination --donations 500000 --limit 50
+"""
+import argparse
+import time
+
+from sqlalchemy import func, select
+
+from app.db.session import SessionLocal
+from app.models.donation import Donation
+from app.models.donor import DonorProfile
+from app.utils.pagination import keyset, page_of
+from benchmarks.common import ensure_schema, percentile, seed_donations, seed_donors
+
+DEPTHS = (1, 10, 100, 1000, 5000)
+
+
+def sample(db, statement, repeat: int) -> float:
+    """p50 ms of `repeat` executions of `statement`."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        db.scalars(statement).all()
+        timings.append((time.perf_counter() - start) * 1000)
+    return percentile(timings, 50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--donors", type=int, default=10_000)
+    parser.add_argument("--donations", type=int, default=500_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    ensure_schema()
+
+    db = SessionLocal()
+    try:
+        donors = db.scalar(select(func.count(DonorProfile.id)))
+        if donors < args.donors:
+            seed_donors(args.donors - donors)
+        donations = db.scalar(select(func.count(Donation.id)))
+        if donations < args.donations:
+            seed_donations(args.donations - donations)
+
+        query = select(Donation)
+        order = (Donation.donation_date.desc(), Donation.id.desc())
+        depths = [depth for depth in DEPTHS if depth * args.limit <= args.donations]
+        cursor, page = None, 1
+        for depth in depths:
+            while page < depth:
+                rows = db.scalars(keyset(query, Donation.donation_date, Donation.id, cursor, args.limit)).all()
+                _, cursor = page_of(rows, args.limit, Donation.donation_date, Donation.id)
+                page += 1
+            db.expunge_all()
+
+            offset_ms = sample(
+                db, query.order_by(*order).offset((depth - 1) * args.limit).limit(args.limit), args.repeat
+            )
+            keyset_ms = sample(
+                db, keyset(query, Donation.donation_date, Donation.id, cursor, args.limit), args.repeat
+            )
+            print(f"page {depth:>5}: offset p50 {offset_ms:8.2f} ms   keyset p50 {keyset_ms:8.2f} ms")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
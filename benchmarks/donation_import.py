@@ -0,0 +1,107 @@
+"""
+Wall time of importing --rows donations from one CSV upload (with --invalid
+of them bad) through import_donations, against recording donations one at
+a time the way POST /donations/donations does (timed on --single-sample
+rows and scaled up).
+
+    python -m benchmarks.donation_import --donors 1000000 --rows 100000
+"""
+import argparse
+import asyncio
+import csv
+import io
+import random
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import func, select
+
+from app.db.session import AsyncSessionLocal, SessionLocal, async_engine
+from app.models.donation import Donation
+from app.models.donor import DonorProfile
+from app.models.user import User
+from app.services.donation_import import import_donations
+from app.services.donation_service import donation_added
+from app.services.report_service import TOTAL_DONATIONS, adjust_counters, reconcile_counters, rollup_increment
+from benchmarks.common import MUNICIPALITIES, ensure_schema, seed_donors
+
+
+def make_upload(profiles, rows: int, invalid: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    today = date.today()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["donor_profile_id", "donation_date", "blood_type", "units", "location"])
+    bad = set(rng.sample(range(rows), invalid))
+    for i in range(rows):
+        profile_id, blood_type = rng.choice(profiles)
+        units = 0 if i in bad else 1
+        day = today - timedelta(days=rng.randint(0, 2 * 365))
+        writer.writerow([profile_id, day.isoformat(), blood_type, units, rng.choice(MUNICIPALITIES)])
+    return buffer.getvalue()
+
+
+async def record_singly(db, text: str) -> int:
+    dialect_name = db.get_bind().dialect.name
+    recorded = 0
+    for row in csv.DictReader(io.StringIO(text)):
+        profile = await db.scalar(select(DonorProfile).where(DonorProfile.id == int(row["donor_profile_id"])))
+        await db.scalar(select(User.status).where(User.id == profile.user_id))
+        donation_date, units = date.fromisoformat(row["donation_date"]), int(row["units"]) or 1
+        db.add(Donation(
+            donor_profile_id=profile.id, donation_date=donation_date, blood_type=row["blood_type"],
+            units=units, location=row["location"],
+        ))
+        profile.availability = "recently_donated"
+        for column, value in donation_added(donation_date, units).items():
+            setattr(profile, column, value)
+        await db.execute(adjust_counters(**{TOTAL_DONATIONS: 1}))
+        await db.execute(rollup_increment(dialect_name, donation_date, row["blood_type"], row["location"], units))
+        await db.commit()
+        recorded += 1
+    return recorded
+
+
+async def run(profiles, args):
+    sample = make_upload(profiles, args.single_sample, 0, seed=8)
+    async with AsyncSessionLocal() as db:
+        start = time.perf_counter()
+        recorded = await record_singly(db, sample)
+        elapsed = time.perf_counter() - start
+    print(f"one donation at a time  {recorded} rows: {elapsed * 1000:9.1f} ms "
+          f"(~{elapsed / recorded * args.rows:.1f} s for {args.rows})")
+
+    upload = make_upload(profiles, args.rows, args.invalid)
+    async with AsyncSessionLocal() as db:
+        start = time.perf_counter()
+        result = await import_donations(db, io.StringIO(upload), "csv")
+        elapsed = time.perf_counter() - start
+    print(f"bulk import             {result['imported']} rows, {result['rejected']} rejected: "
+          f"{elapsed * 1000:9.1f} ms")
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--donors", type=int, default=1_000_000)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--invalid", type=int, default=100)
+    parser.add_argument("--single-sample", type=int, default=1_000)
+    args = parser.parse_args()
+    ensure_schema()
+
+    db = SessionLocal()
+    try:
+        donors = db.scalar(select(func.count(DonorProfile.id)))
+        if donors < args.donors:
+            seed_donors(args.donors - donors)
+        reconcile_counters(db)
+        profiles = db.execute(select(DonorProfile.id, DonorProfile.blood_type)).all()
+    finally:
+        db.close()
+
+    asyncio.run(run(profiles, args))
+
+
+if __name__ == "__main__":
+    main()
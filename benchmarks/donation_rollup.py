@@ -0,0 +1,89 @@
+"""
+Monthly donation report at 5M donations: the extract(year/month) GROUP BY
+over donations versus reading donation_monthly_rollup.
+
+    python -m benchmarks.donation_rollup --donations 5000000 --donors 100000
+"""
+import argparse
+import asyncio
+import time
+from datetime import date
+
+from sqlalchemy import extract, func, select
+
+from app.db.session import AsyncSessionLocal, SessionLocal, async_engine
+from app.models.donation import Donation
+from app.models.donor import DonorProfile
+from app.services.report_service import monthly_totals, rebuild_monthly_rollup
+from benchmarks.common import ensure_schema, percentile, seed_donations, seed_donors
+
+
+async def raw_scan(db, start_date, end_date, dimension):
+    columns = [
+        extract("year", Donation.donation_date).label("year"),
+        extract("month", Donation.donation_date).label("month"),
+    ]
+    if dimension:
+        columns.append(getattr(Donation, dimension))
+    query = select(*columns, func.count(Donation.id), func.sum(Donation.units))
+    if start_date:
+        query = query.where(Donation.donation_date >= start_date)
+    if end_date:
+        query = query.where(Donation.donation_date <= end_date)
+    return (await db.execute(query.group_by(*columns))).all()
+
+
+async def rollup(db, start_date, end_date, dimension):
+    return await monthly_totals(db, start_date, end_date, dimension)
+
+
+async def run(rounds: int):
+    today = date.today()
+    cases = [
+        ("all months", None, None, None),
+        ("partial year", date(today.year - 1, 2, 14), date(today.year - 1, 11, 20), None),
+        ("by blood type", None, None, "blood_type"),
+        ("by location", None, None, "location"),
+    ]
+    async with AsyncSessionLocal() as db:
+        for label, start_date, end_date, dimension in cases:
+            for strategy in (raw_scan, rollup):
+                timings = []
+                for _ in range(rounds):
+                    start = time.perf_counter()
+                    await strategy(db, start_date, end_date, dimension)
+                    timings.append((time.perf_counter() - start) * 1000)
+                print(
+                    f"{label:<14} {strategy.__name__:<9} p50 {percentile(timings, 50):9.2f} ms  "
+                    f"p95 {percentile(timings, 95):9.2f} ms"
+                )
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--donations", type=int, default=5_000_000)
+    parser.add_argument("--donors", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+    ensure_schema()
+
+    db = SessionLocal()
+    try:
+        donors = db.scalar(select(func.count(DonorProfile.id)))
+        if donors < args.donors:
+            seed_donors(args.donors - donors)
+        donations = db.scalar(select(func.count(Donation.id)))
+        if donations < args.donations:
+            seed_donations(args.donations - donations)
+        start = time.perf_counter()
+        rows = rebuild_monthly_rollup(db)
+        print(f"rebuild: {rows} rollup rows in {(time.perf_counter() - start) * 1000:.1f} ms")
+    finally:
+        db.close()
+
+    asyncio.run(run(args.rounds))
+
+
+if __name__ == "__main__":
+    main()
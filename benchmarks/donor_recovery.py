@@ -0,0 +1,80 @@
+"""
+Wall time of update_donor_availability making --due recently donated
+donors available again: batched set-based UPDATEs through
+ix_donor_profiles_recovery against loading and saving each profile
+through the ORM (timed on --orm-sample donors and scaled up).
+
+    python -m benchmarks.donor_recovery --donors 1000000 --due 500000
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import func, select, update
+
+from app.db.session import SessionLocal
+from app.models.donor import DonorProfile
+from app.services.donation_service import recover_available_donors
+from app.services.report_service import reconcile_counters
+from benchmarks.common import ensure_schema, seed_donors
+
+
+def mark_due(db, count: int, today: date):
+    """Make the first `count` profiles recently donated with their deferral over, the rest not due."""
+    db.execute(update(DonorProfile).values(availability="available", next_eligible_date=None))
+    db.execute(
+        update(DonorProfile)
+        .where(DonorProfile.id.in_(select(DonorProfile.id).order_by(DonorProfile.id).limit(count)))
+        .values(availability="recently_donated", next_eligible_date=today - timedelta(days=1))
+    )
+    db.commit()
+
+
+def orm_recovery(db, today: date, limit: int) -> int:
+    profiles = db.scalars(
+        select(DonorProfile)
+        .where(DonorProfile.availability == "recently_donated", DonorProfile.next_eligible_date <= today)
+        .limit(limit)
+    ).all()
+    for profile in profiles:
+        profile.availability = "available"
+        db.commit()
+    return len(profiles)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--donors", type=int, default=1_000_000)
+    parser.add_argument("--due", type=int, default=500_000)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--orm-sample", type=int, default=1_000)
+    args = parser.parse_args()
+    ensure_schema()
+
+    db = SessionLocal()
+    try:
+        donors = db.scalar(select(func.count(DonorProfile.id)))
+        if donors < args.donors:
+            seed_donors(args.donors - donors)
+        today = date.today()
+
+        mark_due(db, args.orm_sample, today)
+        start = time.perf_counter()
+        done = orm_recovery(db, today, args.orm_sample)
+        elapsed = time.perf_counter() - start
+        print(f"per-row ORM updates     {done} donors: {elapsed * 1000:9.1f} ms "
+              f"(~{elapsed / done * args.due:.1f} s for {args.due})")
+
+        mark_due(db, args.due, today)
+        reconcile_counters(db)
+        start = time.perf_counter()
+        done = recover_available_donors(db, today, args.batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"batched set-based UPDATE {done} donors: {elapsed * 1000:9.1f} ms")
+        assert reconcile_counters(db) == {}
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
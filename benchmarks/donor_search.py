@@ -0,0 +1,99 @@
+"""
+Donor search latency, p50/p99 over a mix of name and phone-number
+searches (first page, newest first): the old ILIKE on name OR number
+against the current filters. On PostgreSQL the "before" run also drops the
+pg_trgm indexes; on other databases only the query forms differ.
+
+    python -m benchmarks.donor_search --donors 1000000 --searches 200
+"""
+import argparse
+import random
+import time
+
+from sqlalchemy import func, or_, select, text
+
+from app.db.session import SessionLocal
+from app.models.donor import DonorProfile
+from app.models.user import User
+from app.routers.donors import donor_filters
+from benchmarks.common import FIRST_NAMES, LAST_NAMES, ensure_schema, percentile, seed_donors
+
+TRGM_INDEXES = {
+    "ix_users_full_name_trgm": "full_name",
+    "ix_users_contact_number_trgm": "contact_number",
+}
+
+
+def legacy_filters(search: str) -> list:
+    return [or_(User.full_name.ilike(f"%{search}%"), User.contact_number.ilike(f"%{search}%"))]
+
+
+def set_trgm_indexes(db, present: bool) -> None:
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for name, column in TRGM_INDEXES.items():
+        if present:
+            db.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON users USING gin ({column} gin_trgm_ops)"))
+        else:
+            db.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    db.commit()
+    db.execute(text("ANALYZE users"))
+
+
+def searches(count: int, donors: int, seed: int = 7) -> list:
+    """Half name fragments ("Ana Santos 12345"), half number fragments."""
+    rng = random.Random(seed)
+    terms = []
+    for n in range(count):
+        i = rng.randint(1, donors)
+        if n % 2:
+            terms.append(f"{i:09d}"[-7:])
+        else:
+            terms.append(f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}")
+    return terms
+
+
+def run(db, terms, filters_for, limit: int):
+    timings = []
+    for term in terms:
+        query = (
+            select(DonorProfile.id, User.full_name)
+            .join(User, DonorProfile.user_id == User.id)
+            .where(*filters_for(term))
+            .order_by(DonorProfile.created_at.desc(), DonorProfile.id.desc())
+            .limit(limit + 1)
+        )
+        start = time.perf_counter()
+        db.execute(query).all()
+        timings.append((time.perf_counter() - start) * 1000)
+    return percentile(timings, 50), percentile(timings, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--donors", type=int, default=1_000_000)
+    parser.add_argument("--searches", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+    ensure_schema()
+
+    db = SessionLocal()
+    try:
+        donors = db.scalar(select(func.count(DonorProfile.id)))
+        if donors < args.donors:
+            seed_donors(args.donors - donors)
+        terms = searches(args.searches, args.donors)
+
+        set_trgm_indexes(db, present=False)
+        p50, p99 = run(db, terms, legacy_filters, args.limit)
+        print(f"before (name OR number ILIKE, no trigram index): p50 {p50:9.2f} ms  p99 {p99:9.2f} ms")
+
+        set_trgm_indexes(db, present=True)
+        p50, p99 = run(db, terms, lambda term: donor_filters(None, None, None, term), args.limit)
+        print(f"after  (name or digits path, trigram indexes):   p50 {p50:9.2f} ms  p99 {p99:9.2f} ms")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Donor typeahead index: memory per donor once loaded, load time, and
+suggest latency (p50/p99) for name and contact-number prefixes of the
+lengths admins type, measured in-process against the loaded index.
+
+    python -m benchmarks.donor_suggest --donors 1000000 --lookups 5000
+"""
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+
+from sqlalchemy import func, select
+
+from app.db.session import SessionLocal
+from app.models.donor import DonorProfile
+from app.models.user import User
+from app.services.donor_search import DonorSuggest, load_indexes
+from benchmarks.common import ensure_schema, percentile, seed_donors
+
+
+def prefixes(db, count: int, seed: int = 11) -> list:
+    """Prefixes of real names ("Mar", "Maria Sa", ...) and numbers ("0900", ...)."""
+    rng = random.Random(seed)
+    rows = db.execute(select(User.full_name, User.contact_number).order_by(func.random()).limit(count)).all()
+    terms = []
+    for full_name, contact_number in rows:
+        if rng.random() < 0.5:
+            terms.append(full_name[:rng.randint(2, len(full_name))])
+        else:
+            terms.append(contact_number[:rng.randint(4, len(contact_number))])
+    return terms
+
+
+async def lookups(index: DonorSuggest, terms: list, limit: int) -> list:
+    timings = []
+    for term in terms:
+        start = time.perf_counter()
+        await index.suggest(term, limit)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--donors", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+    ensure_schema()
+
+    db = SessionLocal()
+    try:
+        donors = db.scalar(select(func.count(DonorProfile.id)))
+        if donors < args.donors:
+            seed_donors(args.donors - donors)
+            donors = args.donors
+        terms = prefixes(db, args.lookups)
+    finally:
+        db.close()
+
+    start = time.perf_counter()
+    load_indexes()
+    load_s = time.perf_counter() - start
+    # Again under tracemalloc, which slows it down, for the memory figures
+    tracemalloc.start()
+    names, numbers, labels = load_indexes()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"load: {donors} donors in {load_s:.1f} s, peak {peak / 2**20:.0f} MiB while building")
+    print(
+        f"memory: {held / donors:.0f} bytes/donor ({held / 2**20:.0f} MiB): "
+        f"name run {names.nbytes / donors:.0f}, number run {numbers.nbytes / donors:.0f}, "
+        f"labels {labels.nbytes / donors:.0f}"
+    )
+
+    index = DonorSuggest(refresh_seconds=10**9)
+    index.names, index.numbers, index.labels = names, numbers, labels
+    index.loaded_at = time.monotonic()
+    timings = asyncio.run(lookups(index, terms, args.limit))
+    print(
+        f"suggest (top {args.limit}, {len(terms)} prefixes): "
+        f"p50 {percentile(timings, 50) * 1000:.0f} us  p99 {percentile(timings, 99) * 1000:.0f} us"
+    )
+
+
+if __name__ == "__main__":
+    main()
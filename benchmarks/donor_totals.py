@@ -0,0 +1,77 @@
+"""
+GET /api/v1/donors latency with and without X-Total-Count: the page alone,
+the page plus an uncached COUNT (what a separate count request costs),
+exact mode served from the cache, and estimate mode (PostgreSQL; other
+databases fall back to exact). Run for a filter-only list and a search.
+
+    python -m benchmarks.donor_totals --donors 1000000 --repeat 20
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+from sqlalchemy import func, select
+
+from app.core.report_cache import DONORS, report_cache
+from app.db.session import SessionLocal, async_engine
+from app.main import app
+from app.models.donor import DonorProfile
+from benchmarks.common import ensure_schema, percentile, seed_donors
+
+QUERIES = {
+    "filters": {"blood_type": "O+", "municipality": "Cebu City"},
+    "search": {"search": "Santos"},
+}
+
+
+async def measure(params, total, repeat, invalidate):
+    """p50/p95 ms and the last X-Total-Count for `repeat` list requests."""
+    transport = httpx.ASGITransport(app=app)
+    timings, count = [], None
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(repeat):
+            if invalidate:
+                await report_cache.invalidate(DONORS)
+            start = time.perf_counter()
+            response = await client.get(
+                "/api/v1/donors", params={**params, **({"total": total} if total else {})}
+            )
+            response.raise_for_status()
+            timings.append((time.perf_counter() - start) * 1000)
+            count = response.headers.get("X-Total-Count"), response.headers.get("X-Total-Count-Mode")
+    await async_engine.dispose()
+    return percentile(timings, 50), percentile(timings, 95), count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--donors", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    ensure_schema()
+    db = SessionLocal()
+    try:
+        donors = db.scalar(select(func.count(DonorProfile.id)))
+        if donors < args.donors:
+            seed_donors(args.donors - donors)
+    finally:
+        db.close()
+
+    for name, params in QUERIES.items():
+        for label, total, invalidate in (
+            ("page only", None, False),
+            ("exact, uncached", "exact", True),
+            ("exact, cached", "exact", False),
+            ("estimate", "estimate", False),
+        ):
+            p50, p95, (count, mode) = asyncio.run(measure(params, total, args.repeat, invalidate))
+            shown = f"{count} ({mode})" if count else "-"
+            print(f"{name:<8} {label:<16} p50 {p50:8.2f} ms  p95 {p95:8.2f} ms  total {shown}")
+
+
+if __name__ == "__main__":
+    main()
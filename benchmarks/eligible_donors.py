@@ -0,0 +1,86 @@
+"""
+Latency of listing and counting eligible donors at scale: the stored
+next_eligible_date read off ix_donor_profiles_eligible against deriving
+eligibility from donations (available AND NOT EXISTS a donation within
+the deferral) for every candidate profile.
+
+    python -m benchmarks.eligible_donors --donors 1000000 --donations 500000
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.donation import Donation
+from app.models.donor import DonorProfile
+from app.services.donation_service import AVAILABLE, eligibility_filter, refresh_donation_stats
+from benchmarks.common import ensure_schema, percentile, seed_donations, seed_donors, timed
+
+
+def derived_filter(today: date):
+    recent = (
+        select(Donation.id)
+        .where(
+            Donation.donor_profile_id == DonorProfile.id,
+            Donation.donation_date > today - timedelta(days=settings.donation_deferral_days),
+        )
+        .exists()
+    )
+    return DonorProfile.availability == AVAILABLE, ~recent
+
+
+def stored_filter(today: date):
+    return (eligibility_filter(today),)
+
+
+def run(db, filters, rounds: int, limit: int):
+    page, count = [], []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        db.execute(
+            select(DonorProfile.id)
+            .where(*filters)
+            .order_by(DonorProfile.created_at.desc(), DonorProfile.id.desc())
+            .limit(limit + 1)
+        ).all()
+        page.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        total = db.scalar(select(func.count(DonorProfile.id)).where(*filters))
+        count.append((time.perf_counter() - start) * 1000)
+    return percentile(page, 50), percentile(count, 50), total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--donors", type=int, default=1_000_000)
+    parser.add_argument("--donations", type=int, default=500_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+    ensure_schema()
+
+    db = SessionLocal()
+    try:
+        donors = db.scalar(select(func.count(DonorProfile.id)))
+        if donors < args.donors:
+            seed_donors(args.donors - donors)
+        donations = db.scalar(select(func.count(Donation.id)))
+        if donations < args.donations:
+            seed_donations(args.donations - donations)
+        with timed("refresh_donation_stats (all profiles)"):
+            db.execute(refresh_donation_stats(db.get_bind().dialect.name))
+            db.commit()
+
+        today = date.today()
+        for label, filters in (("derived from donations", derived_filter), ("stored next_eligible", stored_filter)):
+            page, count, total = run(db, filters(today), args.rounds, args.limit)
+            print(f"{label:<24} page p50 {page:8.2f} ms  count p50 {count:8.2f} ms  ({total} eligible)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
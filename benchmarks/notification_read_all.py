@@ -0,0 +1,104 @@
+"""
+Read-all and unread-count at 10k unread notifications per user: the UPDATE
+over every unread row and the COUNT(*) they used to run, versus moving the
+notification_inbox watermark and reading its counter.
+
+    python -m benchmarks.notification_read_all --users 20 --per-user 10000
+"""
+import argparse
+import time
+
+from sqlalchemy import func, insert, literal, select, update
+
+from app.db.session import SessionLocal
+from app.models.donor import DonorProfile
+from app.models.notification import Notification, NotificationInbox
+from app.services.notification_service import add_unread, read_all, unread_count_query
+from benchmarks.common import ensure_schema, percentile, seed_donors
+
+
+def seed_inboxes(db, user_ids, per_user: int, batch_size: int = 10000):
+    dialect_name = db.get_bind().dialect.name
+    for user_id in user_ids:
+        for offset in range(0, per_user, batch_size):
+            db.execute(insert(Notification), [
+                {"user_id": user_id, "title": f"Alert {n}", "message": "Blood needed",
+                 "notification_type": "alert", "is_read": False}
+                for n in range(offset, min(offset + batch_size, per_user))
+            ])
+        db.execute(add_unread(dialect_name, select(literal(user_id), literal(per_user))))
+        db.commit()
+
+
+def legacy_read_all(db, user_id):
+    db.execute(
+        update(Notification)
+        .where(Notification.user_id == user_id, Notification.is_read == False)
+        .values(is_read=True)
+    )
+
+
+def watermark_read_all(db, user_id):
+    db.execute(read_all(db.get_bind().dialect.name, user_id))
+
+
+def legacy_unread_count(db, user_id):
+    return db.scalar(
+        select(func.count()).select_from(Notification)
+        .where(Notification.user_id == user_id, Notification.is_read == False)
+    )
+
+
+def counter_unread_count(db, user_id):
+    return db.scalar(unread_count_query(user_id))
+
+
+def sample(db, fn, user_ids):
+    # Rolled back after each call so every user starts from 10k unread
+    timings = []
+    for user_id in user_ids:
+        start = time.perf_counter()
+        fn(db, user_id)
+        db.flush()
+        timings.append((time.perf_counter() - start) * 1000)
+        db.rollback()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--per-user", type=int, default=10_000)
+    args = parser.parse_args()
+    ensure_schema()
+
+    db = SessionLocal()
+    try:
+        user_ids = db.scalars(select(DonorProfile.user_id).order_by(DonorProfile.user_id).limit(args.users)).all()
+        if len(user_ids) < args.users:
+            seed_donors(args.users - len(user_ids))
+            user_ids = db.scalars(
+                select(DonorProfile.user_id).order_by(DonorProfile.user_id).limit(args.users)
+            ).all()
+        seeded = dict(db.execute(select(NotificationInbox.user_id, NotificationInbox.unread_count)).all())
+        missing = [user_id for user_id in user_ids if seeded.get(user_id, 0) < args.per_user]
+        if missing:
+            seed_inboxes(db, missing, args.per_user)
+
+        for label, fn in (
+            ("read-all: UPDATE unread rows", legacy_read_all),
+            ("read-all: move watermark", watermark_read_all),
+            ("unread-count: COUNT(*)", legacy_unread_count),
+            ("unread-count: inbox counter", counter_unread_count),
+        ):
+            timings = sample(db, fn, user_ids)
+            print(
+                f"{label:<30} p50 {percentile(timings, 50):9.2f} ms  "
+                f"p95 {percentile(timings, 95):9.2f} ms"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
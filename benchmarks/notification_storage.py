@@ -0,0 +1,105 @@
+"""
+notifications table size for one 2 KB alert fanned out to every donor:
+recipient rows carrying copies of the alert text, then the same rows after
+the migration-013 backfill drops the copies in favour of the alert_id join.
+
+    python -m benchmarks.notification_storage --donors 100000
+"""
+import argparse
+from datetime import datetime
+
+from sqlalchemy import delete, func, insert, literal, select, text, update
+
+from app.db.session import SessionLocal, engine
+from app.models.donor import DonorProfile
+from app.models.notification import Alert, Notification, NotificationType
+from app.models.user import User
+from benchmarks.common import ensure_schema, seed_donors, timed
+
+
+def table_size(db) -> int:
+    """Bytes used by notifications, its indexes and (PostgreSQL) TOAST."""
+    if db.get_bind().dialect.name == "postgresql":
+        return db.scalar(text("SELECT pg_total_relation_size('notifications')"))
+    return db.scalar(text(
+        "SELECT sum(pgsize) FROM dbstat WHERE name IN "
+        "(SELECT name FROM sqlite_master WHERE tbl_name = 'notifications')"
+    ))
+
+
+def compact():
+    """Return freed pages so the size reflects live rows only."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("VACUUM FULL notifications"))
+        else:
+            conn.execute(text("VACUUM"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--donors", type=int, default=100_000)
+    parser.add_argument("--message-bytes", type=int, default=2048)
+    args = parser.parse_args()
+    ensure_schema()
+
+    db = SessionLocal()
+    try:
+        donors = db.scalar(select(func.count(DonorProfile.id)))
+        if donors < args.donors:
+            seed_donors(args.donors - donors)
+        alert = Alert(
+            title="Urgent: O+ blood needed",
+            message=("Please visit the nearest blood center. " * 64)[:args.message_bytes],
+            alert_type="urgent_request",
+            priority="high",
+            created_by=db.scalar(select(func.min(User.id))),
+            sent_at=datetime.utcnow(),
+        )
+        db.add(alert)
+        db.execute(delete(Notification))
+        db.commit()
+        compact()
+
+        with timed(f"write {args.donors} recipient rows with copied text"):
+            db.execute(insert(Notification).from_select(
+                ["user_id", "title", "message", "notification_type", "is_read", "alert_id"],
+                select(
+                    DonorProfile.user_id,
+                    literal(alert.title, Notification.title.type),
+                    literal(alert.message, Notification.message.type),
+                    literal(NotificationType.ALERT.value, Notification.notification_type.type),
+                    literal(False, Notification.is_read.type),
+                    literal(alert.id, Notification.alert_id.type),
+                ).limit(args.donors),
+            ))
+            db.commit()
+        compact()
+        before = table_size(db)
+
+        with timed("backfill: drop copies matching the alert"):
+            db.execute(
+                update(Notification)
+                .where(
+                    Notification.alert_id == Alert.id,
+                    Notification.title == Alert.title,
+                    Notification.message == Alert.message,
+                )
+                .values(title=None, message=None)
+            )
+            db.commit()
+        compact()
+        after = table_size(db)
+
+        print(f"copied text:   {before / 2**20:9.1f} MiB")
+        print(f"alert_id only: {after / 2**20:9.1f} MiB  ({after / before:.0%})")
+
+        db.execute(delete(Notification))
+        db.execute(delete(Alert).where(Alert.id == alert.id))
+        db.commit()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+/reports/summary cost at 1M donations: the three COUNT(*) scans it used to
+run versus the single read of report_counters.
+
+    python -m benchmarks.report_summary --donations 1000000 --donors 100000
+"""
+import argparse
+import time
+
+from sqlalchemy import func, select
+
+from app.db.session import SessionLocal
+from app.models.donation import Donation
+from app.models.donor import DonorProfile
+from app.models.report import ReportCounter
+from app.services.report_service import reconcile_counters
+from benchmarks.common import ensure_schema, percentile, seed_donations, seed_donors
+
+
+def legacy_summary(db):
+    return {
+        "total_donors": db.scalar(select(func.count(DonorProfile.id))),
+        "available_donors": db.scalar(
+            select(func.count(DonorProfile.id)).where(DonorProfile.availability == "available")
+        ),
+        "total_donations": db.scalar(select(func.count(Donation.id))),
+    }
+
+
+def counter_summary(db):
+    return dict(db.execute(select(ReportCounter.name, ReportCounter.value)).all())
+
+
+def sample(db, fn, rounds: int):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn(db)
+        timings.append((time.perf_counter() - start) * 1000)
+        db.rollback()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--donations", type=int, default=1_000_000)
+    parser.add_argument("--donors", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    ensure_schema()
+
+    db = SessionLocal()
+    try:
+        donors = db.scalar(select(func.count(DonorProfile.id)))
+        if donors < args.donors:
+            seed_donors(args.donors - donors)
+        donations = db.scalar(select(func.count(Donation.id)))
+        if donations < args.donations:
+            seed_donations(args.donations - donations)
+        reconcile_counters(db)
+
+        for label, fn in (("3x COUNT(*)", legacy_summary), ("report_counters", counter_summary)):
+            timings = sample(db, fn, args.rounds)
+            print(
+                f"{label:<16} p50 {percentile(timings, 50):9.2f} ms  "
+                f"p95 {percentile(timings, 95):9.2f} ms"
+            )
+
+        start = time.perf_counter()
+        reconcile_counters(db)
+        print(f"reconcile job: {(time.perf_counter() - start) * 1000:.1f} ms")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Latency of GET /donations/requests/{id}/matches's query at scale: the
+per-branch UNION ALL over the partial indexes against one ranked query
+over every compatible donor (blood_type IN (...) ORDER BY rank LIMIT n),
+for random recipient types and municipalities.
+
+    python -m benchmarks.request_matching --donors 1000000 --queries 200
+"""
+import argparse
+import random
+import time
+
+from sqlalchemy import case, func, select
+
+from app.db.session import SessionLocal
+from app.models.donor import BloodType, DonorProfile
+from app.models.user import User, UserStatus
+from app.services.matching_service import COMPATIBLE_DONORS, MATCH_COLUMNS, match_query
+from benchmarks.common import MUNICIPALITIES, ensure_schema, percentile, seed_donors
+
+
+def ranked_query(recipient: str, municipality: str, limit: int):
+    return (
+        select(*MATCH_COLUMNS)
+        .join(User, DonorProfile.user_id == User.id)
+        .where(
+            DonorProfile.availability == "available",
+            DonorProfile.blood_type.in_(COMPATIBLE_DONORS[recipient]),
+            User.status == UserStatus.ACTIVE,
+        )
+        .order_by(
+            case((DonorProfile.blood_type == recipient, 0), else_=1),
+            case((DonorProfile.municipality == municipality, 0), else_=1),
+            DonorProfile.last_donation_date.is_(None),
+            DonorProfile.last_donation_date.desc(),
+            DonorProfile.id.desc(),
+        )
+        .limit(limit)
+    )
+
+
+def run(db, cases, build, limit: int):
+    timings = []
+    for recipient, municipality in cases:
+        start = time.perf_counter()
+        db.execute(build(recipient, municipality, limit)).all()
+        timings.append((time.perf_counter() - start) * 1000)
+    return percentile(timings, 50), percentile(timings, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--donors", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    ensure_schema()
+
+    db = SessionLocal()
+    try:
+        donors = db.scalar(select(func.count(DonorProfile.id)))
+        if donors < args.donors:
+            seed_donors(args.donors - donors)
+        rng = random.Random(3)
+        cases = [
+            (rng.choice(list(BloodType)).value, rng.choice(MUNICIPALITIES)) for _ in range(args.queries)
+        ]
+        for label, build in (("ranked IN query", ranked_query), ("per-branch UNION ALL", match_query)):
+            p50, p99 = run(db, cases, build, args.limit)
+            print(f"{label:<22} top {args.limit}: p50 {p50:8.2f} ms  p99 {p99:8.2f} ms")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Memory per idle GET /notifications/stream connection, and the time to push
+one event to all of them, with N subscribers on a single worker.
+
+Connections are driven straight through the ASGI app, so the numbers cover
+the endpoint, its generator and hub subscription but not the server's
+socket and HTTP parser buffers (a few KiB more per connection in uvicorn).
+Run with PUBSUB_BACKEND=memory, or redis to include the Redis round trip.
+
+    python -m benchmarks.sse_idle_subscribers --subscribers 10000
+"""
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+
+from sqlalchemy import select
+
+from app.core.pubsub import notification_bus
+from app.core.security import create_access_token
+from app.db.session import SessionLocal, async_engine
+from app.main import app
+from app.models.donor import DonorProfile
+from benchmarks.common import ensure_schema, seed_donors
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * 4096
+
+
+async def run(user_ids, connect_concurrency: int):
+    disconnect = asyncio.Event()
+    delivered = asyncio.Event()
+    received = {"events": 0}
+    expected = len(user_ids)
+
+    async def subscriber(user_id: int, token: str):
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if requested:
+                await disconnect.wait()
+                return {"type": "http.disconnect"}
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.body" and b"event: notification" in message.get("body", b""):
+                received["events"] += 1
+                if received["events"] == expected:
+                    delivered.set()
+
+        path = "/api/v1/notifications/stream"
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+            "root_path": "", "client": ("127.0.0.1", 1), "server": ("bench", 80),
+            "headers": [(b"host", b"bench"), (b"authorization", f"Bearer {token}".encode())],
+        }
+        await app(scope, receive, send)
+
+    tokens = [create_access_token(data={"sub": str(uid), "role": "donor"}) for uid in user_ids]
+    gc.collect()
+    rss_before = rss_bytes()
+    tracemalloc.start()
+
+    start = time.perf_counter()
+    tasks = []
+    for offset in range(0, expected, connect_concurrency):
+        batch = [
+            asyncio.create_task(subscriber(uid, token))
+            for uid, token in zip(user_ids[offset:offset + connect_concurrency], tokens[offset:offset + connect_concurrency])
+        ]
+        tasks += batch
+        while notification_bus.hub.connections < len(tasks):
+            await asyncio.sleep(0.01)
+    connect_seconds = time.perf_counter() - start
+
+    gc.collect()
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = rss_bytes()
+
+    start = time.perf_counter()
+    await notification_bus.apublish("notification", user_ids, {"alert_id": 0, "title": "bench"})
+    await asyncio.wait_for(delivered.wait(), 60)
+    fanout_ms = (time.perf_counter() - start) * 1000
+
+    disconnect.set()
+    await asyncio.gather(*tasks)
+    await notification_bus.stop()
+    await async_engine.dispose()
+    return connect_seconds, rss_after - rss_before, traced, fanout_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, default=10000)
+    parser.add_argument("--connect-concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    ensure_schema()
+    db = SessionLocal()
+    user_ids = db.scalars(select(DonorProfile.user_id).limit(args.subscribers)).all()
+    if len(user_ids) < args.subscribers:
+        seed_donors(args.subscribers - len(user_ids))
+        user_ids = db.scalars(select(DonorProfile.user_id).limit(args.subscribers)).all()
+    db.close()
+
+    connect_seconds, rss_growth, traced, fanout_ms = asyncio.run(run(user_ids, args.connect_concurrency))
+    n = len(user_ids)
+    print(f"{n} idle subscribers connected in {connect_seconds:.1f} s")
+    print(f"RSS growth:        {rss_growth / n / 1024:8.2f} KiB per connection ({rss_growth / 1024 / 1024:.1f} MiB)")
+    print(f"Python heap (traced): {traced / n / 1024:5.2f} KiB per connection")
+    print(f"one event to all subscribers: {fanout_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import os
+import tempfile
+
+# Point the app at a throwaway SQLite database before anything imports settings
+_db_dir = tempfile.mkdtemp(prefix="blood_donor_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/test.db"
+os.environ["ENVIRONMENT"] = "test"
+os.environ["PUBSUB_BACKEND"] = "memory"
+os.environ["DONOR_SUGGEST_PRELOAD"] = "False"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.dependencies import user_cache
+from app.core.report_cache import report_cache
+from app.core.security import create_access_token
+from app.db.session import Base, SessionLocal, engine
+from app.main import app
+from app.services.donor_search import donor_suggest
+from app.models.donor import DonorProfile, DonorRegistration
+from app.models.user import User, UserRole
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One TestClient (and event loop) for the session; pooled async connections stay valid."""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(autouse=True)
+def _schema():
+    Base.metadata.create_all(engine)
+    yield
+    Base.metadata.drop_all(engine)
+    # Ids are reused by the next test's fresh tables
+    user_cache.clear()
+    report_cache.backend.clear()
+    donor_suggest.clear()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_user(db):
+    counter = {"n": 0}
+
+    def _make_user(role=UserRole.DONOR, **fields):
+        counter["n"] += 1
+        user = User(
+            full_name=fields.pop("full_name", f"Test User {counter['n']}"),
+            contact_number=fields.pop("contact_number", f"0917{counter['n']:07d}"),
+            role=role,
+            **fields,
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+
+    return _make_user
+
+
+@pytest.fixture
+def make_donor(db, make_user):
+    def _make_donor(blood_type="O+", municipality="Manila", availability="available", age=30, **user_fields):
+        user = make_user(**user_fields)
+        registration = DonorRegistration(
+            full_name=user.full_name,
+            contact_number=user.contact_number,
+            age=age,
+            blood_type=blood_type,
+            municipality=municipality,
+            availability=availability,
+            status="approved",
+        )
+        db.add(registration)
+        db.flush()
+        profile = DonorProfile(
+            user_id=user.id,
+            registration_id=registration.id,
+            age=age,
+            blood_type=blood_type,
+            municipality=municipality,
+            availability=availability,
+        )
+        db.add(profile)
+        db.commit()
+        db.refresh(profile)
+        return profile
+
+    return _make_donor
+
+
+@pytest.fixture
+def query_plan(db):
+    def _query_plan(query):
+        """SQLite's EXPLAIN QUERY PLAN for `query` exactly as the ORM executes it."""
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            captured.append((statement, parameters))
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            db.execute(query).all()
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        statement, parameters = captured[-1]
+        rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        return " | ".join(row[-1] for row in rows)
+
+    return _query_plan
+
+
+@pytest.fixture
+def auth_headers():
+    def _auth_headers(user):
+        token = create_access_token(data={"sub": str(user.id), "role": user.role})
+        return {"Authorization": f"Bearer {token}"}
+
+    return _auth_headers
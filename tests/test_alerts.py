@@ -0,0 +1,197 @@
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+
+from app.core.celery_app import celery_app
+from app.models.notification import Alert, Notification, NotificationInbox
+from app.models.user import User, UserRole
+from app.services import alert_service
+
+
+@pytest.fixture(autouse=True)
+def eager_celery():
+    celery_app.conf.task_always_eager = True
+    yield
+    celery_app.conf.task_always_eager = False
+
+
+ALERT = {
+    "title": "Urgent: O+ needed",
+    "message": "Please visit the Manila blood center.",
+    "alert_type": "urgent_request",
+    "priority": "high",
+    "target_audience": {"blood_type": "O+", "municipality": "Manila"},
+}
+
+
+def test_create_alert_fans_out_to_matching_donors(client, db, make_user, make_donor, auth_headers, monkeypatch):
+    monkeypatch.setattr(alert_service.settings, "alert_fanout_chunk_size", 2)
+    admin = make_user(role=UserRole.ADMIN)
+    matching = [make_donor() for _ in range(5)]
+    make_donor(blood_type="A+")
+
+    response = client.post("/api/v1/alerts", json=ALERT, headers=auth_headers(admin))
+    assert response.status_code == 201
+
+    alert = client.get(f"/api/v1/alerts/{response.json()['id']}").json()
+    assert alert["fanout_status"] == "completed"
+    assert alert["recipient_count"] == alert["recipient_total"] == 5
+    # Stored by value, the labels of the PostgreSQL enum types
+    stored = db.execute(text("SELECT fanout_status, delivery_mode FROM alerts")).one()
+    assert tuple(stored) == ("completed", "push")
+
+    notifications = db.query(Notification).all()
+    assert sorted(n.user_id for n in notifications) == sorted(p.user_id for p in matching)
+    # Recipient rows reference the alert instead of copying its text
+    assert all(n.title is None and n.message is None and not n.is_read for n in notifications)
+
+    donor_headers = auth_headers(db.get(User, matching[0].user_id))
+    [item] = client.get("/api/v1/notifications", headers=donor_headers).json()["items"]
+    assert (item["title"], item["message"], item["alert_id"]) == (ALERT["title"], ALERT["message"], alert["id"])
+    read = client.patch(f"/api/v1/notifications/{item['id']}/read", headers=donor_headers).json()
+    assert read == {**item, "is_read": True}
+
+
+def test_interrupted_fan_out_resumes_from_cursor(client, db, make_user, make_donor, auth_headers, monkeypatch):
+    admin = make_user(role=UserRole.ADMIN)
+    for _ in range(5):
+        make_donor()
+    response = client.post(
+        "/api/v1/alerts", json={**ALERT, "send_now": False}, headers=auth_headers(admin)
+    )
+    alert_id = response.json()["id"]
+
+    write_chunk = alert_service.write_chunk
+    calls = {"n": 0}
+
+    def dying_write_chunk(*args, **kwargs):
+        calls["n"] += 1
+        if calls["n"] == 3:
+            raise SystemExit("worker killed")
+        return write_chunk(*args, **kwargs)
+
+    monkeypatch.setattr(alert_service, "write_chunk", dying_write_chunk)
+    with pytest.raises(SystemExit):
+        alert_service.deliver_alert(db, alert_id, chunk_size=2)
+    db.rollback()
+
+    progress = client.get(f"/api/v1/alerts/{alert_id}").json()
+    assert progress["fanout_status"] == "running"
+    assert (progress["recipient_count"], progress["recipient_total"]) == (4, 5)
+
+    monkeypatch.setattr(alert_service, "write_chunk", write_chunk)
+    alert = alert_service.deliver_alert(db, alert_id, chunk_size=2)
+    assert alert.recipient_count == 5
+    assert db.query(Notification).count() == 5
+    assert len({n.user_id for n in db.query(Notification)}) == 5
+    # The killed chunk's counter increments rolled back with its notifications
+    assert [inbox.unread_count for inbox in db.query(NotificationInbox)] == [1] * 5
+
+
+def test_scheduled_alerts_are_sent_when_due(client, db, make_user, make_donor, auth_headers):
+    admin = make_user(role=UserRole.ADMIN)
+    make_donor()
+    response = client.post(
+        "/api/v1/alerts",
+        json={**ALERT, "send_now": False, "schedule_at": "2020-01-01T00:00:00"},
+        headers=auth_headers(admin),
+    )
+    assert response.json()["fanout_status"] == "pending"
+
+    assert alert_service.process_scheduled_alerts() == 1
+    db.expire_all()
+    alert = db.get(Alert, response.json()["id"])
+    assert alert.sent_at is not None
+    assert alert.recipient_count == 1
+
+
+def test_broadcast_above_threshold_is_pulled_into_inboxes_on_read(client, db, make_user, make_donor, auth_headers, monkeypatch):
+    monkeypatch.setattr(alert_service.settings, "alert_pull_threshold", 3)
+    admin = make_user(role=UserRole.ADMIN)
+    matching = [make_donor() for _ in range(3)]
+    outside = make_donor(municipality="Cebu City")
+    broadcast = {**ALERT, "alert_type": "general_announcement", "target_audience": {"municipality": "Manila"}}
+
+    response = client.post("/api/v1/alerts", json=broadcast, headers=auth_headers(admin))
+    alert = client.get(f"/api/v1/alerts/{response.json()['id']}").json()
+    assert (alert["delivery_mode"], alert["fanout_status"], alert["recipient_total"]) == ("pull", "completed", 3)
+    assert db.query(Notification).count() == 0
+
+    headers = auth_headers(db.get(User, matching[0].user_id))
+    assert client.get("/api/v1/notifications/unread-count", headers=headers).json() == {"unread_count": 1}
+    for _ in range(2):
+        items = client.get("/api/v1/notifications", headers=headers).json()["items"]
+        assert [(item["alert_id"], item["title"], item["is_read"]) for item in items] == [
+            (alert["id"], ALERT["title"], False)
+        ]
+
+    # Read-all before the first read: the merged row lands under the watermark
+    read_all_headers = auth_headers(db.get(User, matching[1].user_id))
+    client.patch("/api/v1/notifications/read-all", headers=read_all_headers)
+    assert client.get("/api/v1/notifications/unread-count", headers=read_all_headers).json() == {"unread_count": 0}
+    assert client.get("/api/v1/notifications", headers=read_all_headers).json()["items"][0]["is_read"] is True
+
+    # Neither a donor outside the audience nor one who registered after the send
+    late = make_donor()
+    # SQLite's server default has whole seconds; keep it clear of the send time
+    late.created_at = datetime.utcnow() + timedelta(seconds=1)
+    db.commit()
+    for donor in (outside, late):
+        assert client.get("/api/v1/notifications", headers=auth_headers(db.get(User, donor.user_id))).json()["items"] == []
+    # Two inboxes merged it; the third donor never read, so has no row
+    assert db.query(Notification).count() == 2
+
+
+def test_small_broadcast_is_still_pushed(client, db, make_user, make_donor, auth_headers, monkeypatch):
+    monkeypatch.setattr(alert_service.settings, "alert_pull_threshold", 3)
+    admin = make_user(role=UserRole.ADMIN)
+    make_donor()
+    broadcast = {**ALERT, "alert_type": "general_announcement"}
+    response = client.post("/api/v1/alerts", json=broadcast, headers=auth_headers(admin))
+    assert client.get(f"/api/v1/alerts/{response.json()['id']}").json()["delivery_mode"] == "push"
+    assert db.query(Notification).count() == 1
+
+
+def test_delivery_lost_to_a_broker_outage_is_queued_again(client, db, make_user, make_donor, auth_headers, monkeypatch):
+    admin = make_user(role=UserRole.ADMIN)
+    make_donor()
+    broker = {"up": False}
+    delay = alert_service.send_alert_notifications.delay
+
+    def flaky_delay(*args):
+        if not broker["up"]:
+            raise ConnectionError("broker unreachable")
+        return delay(*args)
+
+    monkeypatch.setattr(alert_service.send_alert_notifications, "delay", flaky_delay)
+    response = client.post("/api/v1/alerts", json=ALERT, headers=auth_headers(admin))
+    assert response.status_code == 201
+    alert_id = response.json()["id"]
+    assert client.get(f"/api/v1/alerts/{alert_id}").json()["fanout_status"] == "queued"
+
+    broker["up"] = True
+    # Not stalled yet: a worker may still be about to pick it up
+    alert_service.process_scheduled_alerts()
+    assert db.query(Notification).count() == 0
+
+    db.get(Alert, alert_id).fanout_updated_at = datetime.utcnow() - timedelta(
+        seconds=alert_service.settings.alert_fanout_stall_seconds + 1
+    )
+    db.commit()
+    alert_service.process_scheduled_alerts()
+    alert = client.get(f"/api/v1/alerts/{alert_id}").json()
+    assert (alert["fanout_status"], alert["recipient_count"]) == ("completed", 1)
+    assert db.query(Notification).count() == 1
+
+
+def test_alert_enum_columns_bind_their_migration_labels():
+    versions = Path(__file__).parent.parent / "alembic" / "versions"
+    for column, migration in ((Alert.fanout_status, "007_add_alert_fanout_progress.py"),
+                              (Alert.delivery_mode, "014_alert_pull_delivery.py")):
+        enum_type = column.property.columns[0].type
+        created = re.search(rf"CREATE TYPE {enum_type.name} AS ENUM \(([^)]*)\)", (versions / migration).read_text())
+        # enums are the strings the ORM binds for the members
+        assert [label.strip(" '") for label in created.group(1).split(",")] == enum_type.enums
@@ -0,0 +1,47 @@
+from app.models.user import UserRole
+
+
+def test_registration_approval_and_reports(client, make_user, auth_headers):
+    admin = make_user(role=UserRole.ADMIN)
+    headers = auth_headers(admin)
+
+    response = client.post(
+        "/api/v1/donor-registrations",
+        json={
+            "full_name": "Juan Dela Cruz",
+            "contact_number": "09171234567",
+            "age": 25,
+            "blood_type": "O+",
+            "municipality": "Manila",
+        },
+    )
+    assert response.status_code == 201
+    registration_id = response.json()["id"]
+
+    response = client.patch(
+        f"/api/v1/donor-registrations/{registration_id}",
+        json={"status": "approved"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == "approved"
+
+    donors = client.get("/api/v1/donors", params={"blood_type": "O+"}).json()["items"]
+    assert [d["full_name"] for d in donors] == ["Juan Dela Cruz"]
+
+    response = client.patch(
+        f"/api/v1/donors/{donors[0]['id']}/availability",
+        json={"availability": "unavailable"},
+        headers=headers,
+    )
+    assert response.json()["availability"] == "unavailable"
+
+    summary = client.get("/api/v1/reports/summary", headers=headers).json()
+    assert summary == {"total_donors": 1, "available_donors": 0, "total_donations": 0}
+
+
+def test_current_user_requires_valid_token(client, make_user, auth_headers):
+    user = make_user()
+    assert client.get("/api/v1/users/me", headers=auth_headers(user)).json()["id"] == user.id
+    response = client.get("/api/v1/users/me", headers={"Authorization": "Bearer nope"})
+    assert response.status_code == 401
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.bitmap_index import (
+    BitsetBuilder,
+    SnapshotFile,
+    bits_from_ids,
+    highest_positions,
+    positions,
+    write_snapshot,
+)
+from app.core.celery_app import celery_app
+from app.models.notification import Notification
+from app.models.user import UserRole
+from app.services import alert_service, audience_service
+
+
+@pytest.fixture(autouse=True)
+def eager_celery():
+    celery_app.conf.task_always_eager = True
+    yield
+    celery_app.conf.task_always_eager = False
+
+
+@pytest.fixture
+def snapshot_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "audience_index.bin")
+    monkeypatch.setattr(audience_service, "audience_index", SnapshotFile(path))
+    return path
+
+
+def backdate(db, profiles):
+    for profile in profiles:
+        profile.created_at = datetime.utcnow() - timedelta(days=1)
+    db.commit()
+
+
+def test_snapshot_file_round_trips_and_remaps(tmp_path):
+    path = str(tmp_path / "bitmaps.bin")
+    builder = BitsetBuilder()
+    for id_ in (1, 64, 65, 700):
+        builder.add("odd" if id_ % 2 else "even", id_)
+    write_snapshot(path, builder.bitsets, {"version": 1})
+
+    mapped = SnapshotFile(path)
+    snapshot = mapped.current()
+    assert snapshot.meta == {"version": 1}
+    assert positions(snapshot.get("odd")) == [1, 65]
+    assert positions(snapshot.get("even") | snapshot.get("odd"), after=1, limit=2) == [64, 65]
+    assert highest_positions(snapshot.get("even") | snapshot.get("odd"), 3) == [700, 65, 64]
+    assert snapshot.get("missing") == 0
+    assert mapped.current() is snapshot
+
+    write_snapshot(path, {"odd": bytearray(bits_from_ids([3]).to_bytes(1, "little"))}, {"version": 2})
+    assert mapped.current().meta == {"version": 2}
+    assert positions(mapped.current().get("odd")) == [3]
+
+
+def test_preview_is_exact_with_changes_since_the_snapshot(client, db, make_user, make_donor, auth_headers, snapshot_path):
+    admin = make_user(role=UserRole.ADMIN)
+    manila = [make_donor() for _ in range(3)]
+    backdate(db, manila + [make_donor(municipality="Cebu City"), make_donor(blood_type="A+")])
+    audience_service.build_audience_index(db, snapshot_path)
+
+    # After the snapshot: one donor stops matching, one new donor does
+    response = client.patch(
+        f"/api/v1/donors/{manila[0].id}/availability", json={"availability": "unavailable"}, headers=auth_headers(admin)
+    )
+    assert response.status_code == 200
+    newest = make_donor()
+
+    body = {"target_audience": {"blood_type": "O+", "municipality": "Manila", "availability": "available"}, "sample_size": 2}
+    preview = client.post("/api/v1/alerts/preview", json=body, headers=auth_headers(admin))
+    assert preview.status_code == 200
+    assert preview.json()["recipient_count"] == 3
+    assert [member["id"] for member in preview.json()["sample"]] == [newest.id, manila[2].id]
+    assert preview.json()["sample"][0]["full_name"] == "Test User 7"
+
+    # The SQL fallback agrees
+    audience_service.audience_index = SnapshotFile(snapshot_path + ".missing")
+    assert client.post("/api/v1/alerts/preview", json=body, headers=auth_headers(admin)).json() == preview.json()
+
+    everyone = client.post("/api/v1/alerts/preview", json={"sample_size": 0}, headers=auth_headers(admin))
+    assert everyone.json() == {"recipient_count": 6, "sample": []}
+    assert client.post("/api/v1/alerts/preview", json=body).status_code == 401
+
+
+def test_fan_out_takes_recipient_ids_from_the_index(client, db, make_user, make_donor, auth_headers, snapshot_path, monkeypatch):
+    monkeypatch.setattr(alert_service.settings, "alert_fanout_chunk_size", 2)
+    admin = make_user(role=UserRole.ADMIN)
+    donors = [make_donor() for _ in range(4)] + [make_donor(blood_type="A+")]
+    backdate(db, donors)
+    audience_service.build_audience_index(db, snapshot_path)
+    late = make_donor()
+
+    calls = []
+    positions_ = alert_service.positions
+    monkeypatch.setattr(alert_service, "positions", lambda *a, **kw: calls.append(kw) or positions_(*a, **kw))
+
+    response = client.post(
+        "/api/v1/alerts",
+        json={"title": "O+ needed", "message": "Visit us", "alert_type": "urgent_request", "target_audience": {"blood_type": "O+"}},
+        headers=auth_headers(admin),
+    )
+    alert = client.get(f"/api/v1/alerts/{response.json()['id']}").json()
+    assert alert["recipient_count"] == alert["recipient_total"] == 5
+    assert sorted(n.user_id for n in db.query(Notification)) == sorted(p.user_id for p in donors[:4] + [late])
+    assert [call["after"] for call in calls] == [0, donors[1].id, donors[3].id, late.id]
@@ -0,0 +1,53 @@
+import pytest
+
+from app.models.user import User
+from app.routers.auth import limiter
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limit():
+    limiter.enabled = False
+    yield
+    limiter.enabled = True
+
+
+def login(client, user):
+    response = client.post("/api/v1/auth/login", json={"contact_number": user.contact_number})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_refresh_rotates_token_and_stores_digest(client, db, make_user):
+    user = make_user()
+    tokens = login(client, user)
+
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    db.expire_all()
+    stored = db.get(User, user.id)
+    assert len(stored.hashed_refresh_token) == 64
+    assert rotated["refresh_token"] not in stored.hashed_refresh_token
+
+
+def test_reused_refresh_token_revokes_family(client, db, make_user):
+    user = make_user()
+    first = login(client, user)["refresh_token"]
+    second = client.post("/api/v1/auth/refresh", json={"refresh_token": first}).json()["refresh_token"]
+
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": first})
+    assert response.status_code == 401
+
+    # The legitimate holder's newer token is revoked along with the family
+    assert client.post("/api/v1/auth/refresh", json={"refresh_token": second}).status_code == 401
+    db.expire_all()
+    assert db.get(User, user.id).refresh_token_family is None
+
+
+def test_token_from_previous_login_is_rejected(client, make_user):
+    user = make_user()
+    old = login(client, user)["refresh_token"]
+    login(client, user)
+    assert client.post("/api/v1/auth/refresh", json={"refresh_token": old}).status_code == 401
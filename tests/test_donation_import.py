@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from app.models.donation import Donation
+from app.models.donor import DonorProfile
+from app.models.report import DonationMonthlyRollup
+from app.models.user import UserRole
+from app.services import donation_import
+from app.services.report_service import rebuild_monthly_rollup, reconcile_counters
+
+
+def days_ago(days):
+    return (date.today() - timedelta(days=days)).isoformat()
+
+
+def upload(client, headers, content, fmt="csv"):
+    return client.post(
+        "/api/v1/donations/donations/import",
+        params={"format": fmt},
+        files={"file": (f"drive.{fmt}", content if isinstance(content, bytes) else content.encode(), "text/plain")},
+        headers=headers,
+    )
+
+
+def rollup_rows(db):
+    return sorted(
+        (row.month, row.blood_type, row.location, row.count, row.units)
+        for row in db.scalars(select(DonationMonthlyRollup))
+    )
+
+
+def test_csv_import_records_valid_rows_and_reports_the_rest(client, db, make_user, make_donor, auth_headers, monkeypatch):
+    # Chunks of two: row checks, inserts and updates all cross chunk boundaries
+    monkeypatch.setattr(donation_import.settings, "donation_import_chunk_size", 2)
+    headers = auth_headers(make_user(role=UserRole.ADMIN))
+    recent, earlier = make_donor(), make_donor(blood_type="A+")
+    reconcile_counters(db)
+
+    content = "\n".join([
+        "donor_profile_id,donation_date,blood_type,units,location",
+        f"{recent.id},{days_ago(10)},O+,2,Manila",
+        f"{earlier.id},{days_ago(200)},A+,,Pasig",
+        f"{recent.id},{days_ago(10)},Z+,1,Manila",
+        f"{recent.id},{days_ago(40)},O+,0,",
+        f"9999,{days_ago(5)},O+,1,Manila",
+        f"{recent.id},{days_ago(300)},O+,1,Manila",
+    ])
+    response = upload(client, headers, "\ufeff" + content)
+    assert response.status_code == 200
+    assert response.json() == {"imported": 3, "rejected": 3, "errors": [
+        {"row": 3, "errors": ["blood_type: Value error, Blood type must be one of "
+                              "['A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-']"]},
+        {"row": 4, "errors": ["units: Input should be greater than or equal to 1", "location: Field required"]},
+        {"row": 5, "errors": ["donor_profile_id: Donor profile not found"]},
+    ]}
+
+    db.expire_all()
+    recent, earlier = db.get(DonorProfile, recent.id), db.get(DonorProfile, earlier.id)
+    assert (recent.availability, recent.donation_count, recent.total_units) == ("recently_donated", 2, 3)
+    assert recent.last_donation_date == date.today() - timedelta(days=10)
+    # Only an old donation: past the deferral already, so still available
+    assert (earlier.availability, earlier.donation_count, earlier.total_units) == ("available", 1, 1)
+    assert db.query(Donation).count() == 3
+
+    # Counters and the rollup moved as if each donation were recorded singly
+    assert reconcile_counters(db) == {}
+    imported = rollup_rows(db)
+    rebuild_monthly_rollup(db)
+    assert rollup_rows(db) == imported
+
+
+def test_ndjson_import_and_unreadable_uploads(client, db, make_user, make_donor, auth_headers):
+    headers = auth_headers(make_user(role=UserRole.ADMIN))
+    donor = make_donor()
+    content = "\n".join([
+        f'{{"donor_profile_id": {donor.id}, "donation_date": "{days_ago(3)}", "blood_type": "O+", "location": "Manila"}}',
+        "",
+        "{not json",
+        "[1, 2]",
+    ])
+    response = upload(client, headers, content, fmt="ndjson")
+    assert response.json() == {"imported": 1, "rejected": 2, "errors": [
+        {"row": 3, "errors": ["Row is not a JSON object"]},
+        {"row": 4, "errors": ["Row is not a JSON object"]},
+    ]}
+    assert client.get(f"/api/v1/donors/{donor.id}").json()["availability"] == "recently_donated"
+
+    response = upload(client, headers, "donor_profile_id,blood_type\n1,O+")
+    assert response.status_code == 400
+    assert response.json()["message"] == "Unreadable upload: CSV header is missing donation_date, location"
+    response = upload(client, headers, "donor_profile_id,donation_date,blood_type,location\n1,2026-01-01,O+,Para\xf1aque".encode("latin-1"))
+    assert response.status_code == 400
+    assert response.json()["message"].startswith("Unreadable upload: 'utf-8' codec can't decode")
+    assert upload(client, headers, "", fmt="xml").status_code == 422
+    assert upload(client, {}, "").status_code in (401, 403)
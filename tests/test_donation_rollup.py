@@ -0,0 +1,57 @@
+from datetime import date
+
+from app.models.donation import Donation
+from app.models.report import DonationMonthlyRollup
+from app.models.user import UserRole
+from app.services.report_service import rebuild_monthly_rollup
+
+
+def add_donation(db, profile, day, location="Manila", units=1):
+    db.add(Donation(donor_profile_id=profile.id, donation_date=day, blood_type=profile.blood_type,
+                    location=location, units=units))
+
+
+def test_create_donation_updates_rollup(client, db, make_user, make_donor, auth_headers):
+    headers = auth_headers(make_user(role=UserRole.ADMIN))
+    donor = make_donor(blood_type="A+")
+    for day, units in (("2026-03-02", 1), ("2026-03-20", 2), ("2026-04-01", 1)):
+        client.post(
+            "/api/v1/donations/donations",
+            json={"donor_profile_id": donor.id, "donation_date": day, "blood_type": "A+",
+                  "location": "Manila", "units": units},
+            headers=headers,
+        )
+
+    rows = db.query(DonationMonthlyRollup).order_by(DonationMonthlyRollup.month).all()
+    assert [(r.month, r.blood_type.value, r.count, r.units) for r in rows] == [
+        (date(2026, 3, 1), "A+", 2, 3),
+        (date(2026, 4, 1), "A+", 1, 1),
+    ]
+    data = client.get("/api/v1/reports/monthly-donations/by-blood-type", headers=headers).json()
+    assert data["monthly_data"] == [
+        {"year": 2026, "month": 3, "blood_type": "A+", "donation_count": 2, "total_units": 3},
+        {"year": 2026, "month": 4, "blood_type": "A+", "donation_count": 1, "total_units": 1},
+    ]
+
+
+def test_rebuild_and_partial_month_filters(client, db, make_user, make_donor, auth_headers):
+    headers = auth_headers(make_user(role=UserRole.ADMIN))
+    o_pos, b_neg = make_donor(blood_type="O+"), make_donor(blood_type="B-")
+    add_donation(db, o_pos, date(2026, 1, 10), location="Cebu City")
+    add_donation(db, o_pos, date(2026, 2, 5))
+    add_donation(db, b_neg, date(2026, 2, 25), units=2)
+    add_donation(db, b_neg, date(2026, 3, 15))
+    db.commit()
+    assert rebuild_monthly_rollup(db) == 4
+
+    def monthly(path="", **params):
+        return client.get(f"/api/v1/reports/monthly-donations{path}", params=params, headers=headers).json()["monthly_data"]
+
+    assert [(r["month"], r["donation_count"], r["total_units"]) for r in monthly()] == [(1, 1, 1), (2, 2, 3), (3, 1, 1)]
+    # Jan 15 and Mar 10 cut through their months: only the requested days count
+    assert [(r["month"], r["donation_count"]) for r in monthly(start_date="2026-01-15", end_date="2026-03-10")] == [(2, 2)]
+    assert [(r["month"], r["donation_count"]) for r in monthly(start_date="2026-02-10", end_date="2026-02-28")] == [(2, 1)]
+    assert [(r["month"], r["donation_count"]) for r in monthly(end_date="2026-02-20")] == [(1, 1), (2, 1)]
+    assert monthly("/by-location", start_date="2026-01-01", end_date="2026-01-31") == [
+        {"year": 2026, "month": 1, "location": "Cebu City", "donation_count": 1, "total_units": 1},
+    ]
@@ -0,0 +1,128 @@
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from app.core.pubsub import notification_bus
+from app.core.report_cache import DONORS, report_cache
+from app.models.donor import DonorProfile
+from app.models.user import UserRole, UserStatus
+from app.services.donation_service import (
+    AVAILABILITY_EVENT,
+    eligible_filters,
+    recover_available_donors,
+    recovery_batch,
+    refresh_donation_stats,
+)
+from app.services.report_service import reconcile_counters
+
+
+def record(client, headers, profile, days_ago, units=1):
+    response = client.post("/api/v1/donations/donations", headers=headers, json={
+        "donor_profile_id": profile.id,
+        "donation_date": (date.today() - timedelta(days=days_ago)).isoformat(),
+        "blood_type": profile.blood_type,
+        "units": units,
+        "location": "Manila",
+    })
+    assert response.status_code == 201
+
+
+def stats(db, profile):
+    db.expire_all()
+    profile = db.get(DonorProfile, profile.id)
+    return profile.last_donation_date, profile.next_eligible_date, profile.donation_count, profile.total_units
+
+
+def test_donations_maintain_aggregates_and_eligibility(client, db, make_user, make_donor, auth_headers):
+    headers = auth_headers(make_user(role=UserRole.ADMIN))
+    recent, rested, never = make_donor(), make_donor(), make_donor()
+
+    record(client, headers, recent, days_ago=10, units=2)
+    # Recorded late: counts, but does not move the last donation date back
+    record(client, headers, recent, days_ago=200)
+    last = date.today() - timedelta(days=10)
+    assert stats(db, recent) == (last, last + timedelta(days=90), 2, 3)
+
+    record(client, headers, rested, days_ago=120)
+    # Deferral over, but still marked recently_donated until availability is restored
+    listed = client.get("/api/v1/donors", params={"eligible": "true", "total": "exact"})
+    assert [item["id"] for item in listed.json()["items"]] == [never.id]
+    assert listed.headers["X-Total-Count"] == "1"
+
+    for profile in (recent, rested):
+        client.patch(f"/api/v1/donors/{profile.id}/availability", headers=headers, json={"availability": "available"})
+    listed = client.get("/api/v1/donors", params={"eligible": "true", "total": "exact"})
+    assert [item["id"] for item in listed.json()["items"]] == [never.id, rested.id]
+    assert listed.headers["X-Total-Count"] == "2"
+    assert [item["id"] for item in client.get("/api/v1/donors", params={"eligible": "false"}).json()["items"]] == [recent.id]
+    assert client.get(f"/api/v1/donors/{recent.id}").json()["donation_count"] == 2
+
+    # Recomputing from donations agrees with the running aggregates
+    expected = [stats(db, profile) for profile in (recent, rested, never)]
+    db.execute(refresh_donation_stats("sqlite"))
+    db.commit()
+    assert [stats(db, profile) for profile in (recent, rested, never)] == expected
+
+    # Alerts and blood request matching see eligibility too
+    preview = client.post("/api/v1/alerts/preview", headers=headers, json={"target_audience": {"eligible": True}})
+    assert preview.json()["recipient_count"] == 2
+    blood_request = client.post("/api/v1/donations/requests", headers=headers, json={
+        "patient_name": "Patient", "blood_type": "O+", "units_needed": 1, "urgency": "high",
+        "hospital": "Manila General", "contact_number": "09170000000",
+    }).json()
+    matches = client.get(f"/api/v1/donations/requests/{blood_request['id']}/matches", headers=headers).json()
+    assert [match["id"] for match in matches["matches"]] == [rested.id, never.id]
+
+
+def test_eligible_pages_read_the_partial_index(db, query_plan):
+    query = (
+        select(DonorProfile.id)
+        .where(*eligible_filters(True))
+        .order_by(DonorProfile.created_at.desc(), DonorProfile.id.desc())
+        .limit(51)
+    )
+    plan = query_plan(query)
+    assert plan.startswith("SCAN donor_profiles USING INDEX ix_donor_profiles_eligible")
+    assert "TEMP B-TREE" not in plan
+
+
+def test_recovery_makes_donors_available_after_their_deferral(client, db, make_user, make_donor, auth_headers, monkeypatch):
+    published = []
+    monkeypatch.setattr(notification_bus, "publish", lambda *args: published.append(args))
+    headers = auth_headers(make_user(role=UserRole.ADMIN))
+    rested, other, deferred, inactive = make_donor(), make_donor(), make_donor(), make_donor(status=UserStatus.INACTIVE)
+    unrecorded = make_donor(availability="recently_donated")
+    reconcile_counters(db)
+    for profile, days_ago in ((rested, 91), (other, 200), (deferred, 30), (inactive, 100)):
+        record(client, headers, profile, days_ago)
+    version = report_cache.backend._versions.get(DONORS, 0)
+
+    # Batches of one: every due donor is still reached
+    assert recover_available_donors(db, batch_size=1) == 3
+    db.expire_all()
+    availability = {p.id: db.get(DonorProfile, p.id).availability for p in (rested, other, deferred, inactive, unrecorded)}
+    assert availability == {
+        rested.id: "available", other.id: "available", deferred.id: "recently_donated",
+        inactive.id: "available", unrecorded.id: "recently_donated",
+    }
+    assert db.get(DonorProfile, rested.id).updated_at is not None
+    # The available_donors counter moved with them (the inactive donor's user is not counted)
+    assert reconcile_counters(db) == {}
+    assert report_cache.backend._versions[DONORS] == version + 1
+    # One event per batch, for the recovered donors' users
+    assert sorted(published) == sorted(
+        (AVAILABILITY_EVENT, [p.user_id], {"availability": "available"}) for p in (rested, other, inactive)
+    )
+
+    assert recover_available_donors(db) == 0
+    assert report_cache.backend._versions[DONORS] == version + 1
+    assert len(published) == 3
+
+    # An API worker hears the event (here from the lifespan's registration) and drops its donor reports
+    notification_bus.hub.dispatch({"event": AVAILABILITY_EVENT, "user_ids": [rested.user_id], "data": {}})
+    assert report_cache.backend._versions[DONORS] == version + 2
+
+
+def test_recovery_batches_read_the_partial_index(db, query_plan):
+    plan = query_plan(recovery_batch(date.today(), 1000))
+    assert "ix_donor_profiles_recovery (next_eligible_date<?)" in plan
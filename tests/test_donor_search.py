@@ -0,0 +1,107 @@
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.core.prefix_index import PrefixIndex
+from app.models.user import User, UserRole
+from app.routers.donors import relevance_order
+from app.services.donor_search import contact_digits, donor_suggest, name_keys
+
+
+def names(response):
+    assert response.status_code == 200, response.text
+    return [item["full_name"] for item in response.json()["items"]]
+
+
+def test_search_matches_names_or_phone_digits(client, make_donor):
+    make_donor(full_name="Maria Ana Lopez", contact_number="09171234567")
+    make_donor(full_name="Ana Cruz", contact_number="+639281234567")
+    make_donor(full_name="Anabel 100% Reyes", contact_number="09998880000")
+
+    assert names(client.get("/api/v1/donors", params={"search": "ANA"})) == [
+        "Anabel 100% Reyes", "Ana Cruz", "Maria Ana Lopez",
+    ]
+    # LIKE wildcards in the search are literal
+    assert names(client.get("/api/v1/donors", params={"search": "100%"})) == ["Anabel 100% Reyes"]
+    assert names(client.get("/api/v1/donors", params={"search": "a_a"})) == []
+    # Phone-shaped searches match either stored form, whatever the punctuation
+    assert names(client.get("/api/v1/donors", params={"search": "0928-123"})) == ["Ana Cruz"]
+    assert names(client.get("/api/v1/donors", params={"search": "+63 917 123"})) == ["Maria Ana Lopez"]
+    assert names(client.get("/api/v1/donors", params={"search": "1234567"})) == ["Ana Cruz", "Maria Ana Lopez"]
+    assert contact_digits("(0917) 123") == "917123"
+    assert contact_digits("Ana 0917") is None
+
+
+def test_relevance_order_ranks_matches_in_a_single_page(client, make_donor):
+    make_donor(full_name="Ana Cruz")
+    make_donor(full_name="Maria Ana Lopez")
+    make_donor(full_name="Anabel Reyes")
+
+    response = client.get("/api/v1/donors", params={"search": "ana", "order": "relevance", "limit": 2})
+    assert names(response) == ["Anabel Reyes", "Ana Cruz"]
+    assert response.json()["next_cursor"] is None
+    assert client.get("/api/v1/donors", params={"order": "relevance"}).status_code == 400
+
+    # PostgreSQL ranks by trigram similarity
+    sql = str(select(User.id).order_by(*relevance_order("postgresql", "ana")).compile(dialect=postgresql.dialect()))
+    assert "ORDER BY similarity(users.full_name, " in sql
+
+
+def test_prefix_index_merges_the_packed_run_with_later_changes():
+    index = PrefixIndex.build(
+        [(key, 1) for key in name_keys("Juan Dela Cruz")] + [(key, 2) for key in name_keys("Juana Reyes")]
+    )
+    assert name_keys("José  Dela-Cruz") == [b"jose dela cruz", b"dela cruz", b"cruz"]
+    assert index.search(b"juan", 10) == [1, 2]
+    assert index.search(b"juan dela", 10) == [1]
+    assert index.search(b"dela c", 10) == [1]
+
+    index.upsert(1, name_keys("Juan Santos"))
+    index.upsert(3, name_keys("Dela Paz"))
+    assert index.search(b"dela", 10) == [3]
+    assert index.search(b"juan", 10) == [1, 2]  # "juan santos" < "juana reyes"
+    assert index.search(b"juan", 1) == [1]
+    index.remove(2)
+    assert index.search(b"juana", 10) == []
+
+
+def test_suggest_follows_approvals_and_profile_edits(client, db, make_user, make_donor, auth_headers):
+    admin_headers = auth_headers(make_user(role=UserRole.ADMIN))
+    make_donor(full_name="Juan Dela Cruz", contact_number="09171234567", blood_type="A+")
+    juana = make_donor(full_name="Juana Reyes", contact_number="+639181234567")
+
+    def suggest(q):
+        response = client.get("/api/v1/donors/suggest", params={"q": q}, headers=admin_headers)
+        assert response.status_code == 200, response.text
+        return [(item["full_name"], item["contact_number"]) for item in response.json()]
+
+    assert suggest("juan") == [("Juan Dela Cruz", "09171234567"), ("Juana Reyes", "+639181234567")]
+    assert suggest("Dela C") == [("Juan Dela Cruz", "09171234567")]
+    assert suggest("+63 917") == [("Juan Dela Cruz", "09171234567")]
+    assert suggest("0918") == [("Juana Reyes", "+639181234567")]
+
+    # An approval made after the load is found without a reload
+    registration = client.post("/api/v1/donor-registrations", json={
+        "full_name": "Maria Dela Paz", "contact_number": "09190000001",
+        "age": 30, "blood_type": "O-", "municipality": "Cebu City",
+    }).json()
+    client.patch(f"/api/v1/donor-registrations/{registration['id']}", json={"status": "approved"}, headers=admin_headers)
+    assert suggest("dela") == [("Juan Dela Cruz", "09171234567"), ("Maria Dela Paz", "09190000001")]
+
+    # So is a donor renaming themselves
+    donor_user = db.get(User, make_donor(full_name="Pedro Penduko").user_id)
+    client.put("/api/v1/users/me", json={"full_name": "Pedro Dela Torre"}, headers=auth_headers(donor_user))
+    assert suggest("pedro") == [("Pedro Dela Torre", donor_user.contact_number)]
+    assert suggest("penduko") == []
+
+    assert client.get("/api/v1/donors/suggest", params={"q": "juan"}, headers=auth_headers(donor_user)).status_code == 403
+
+    # A deleted donor drops out at once, and stays out of every reload
+    assert client.delete(f"/api/v1/donors/{juana.id}", headers=admin_headers).status_code == 200
+    assert suggest("juan") == [("Juan Dela Cruz", "09171234567")]
+    assert suggest("0918") == []
+
+    async def reload():
+        await donor_suggest.start()
+
+    client.portal.call(reload)
+    assert suggest("juan") == [("Juan Dela Cruz", "09171234567")]
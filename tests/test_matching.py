@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+
+from sqlalchemy import update
+
+from app.models.donor import DonorProfile
+from app.models.user import User, UserRole, UserStatus
+from app.services.matching_service import COMPATIBLE_DONORS, match_query
+
+
+def test_compatibility_matrix():
+    assert COMPATIBLE_DONORS["O-"] == ("O-",)
+    assert COMPATIBLE_DONORS["A+"] == ("A+", "A-", "O+", "O-")
+    assert COMPATIBLE_DONORS["AB-"] == ("AB-", "A-", "B-", "O-")
+    assert set(COMPATIBLE_DONORS["AB+"]) == set(COMPATIBLE_DONORS)
+    assert all(donors[0] == recipient for recipient, donors in COMPATIBLE_DONORS.items())
+    assert all("O-" in donors for donors in COMPATIBLE_DONORS.values())
+
+
+def test_request_matches_rank_exact_type_then_municipality_then_latest_donation(client, db, make_user, make_donor, auth_headers):
+    headers = auth_headers(make_user(role=UserRole.ADMIN))
+    make_donor(blood_type="O+", municipality="Cebu City", full_name="O+ Cebu")
+    make_donor(blood_type="O-", municipality="Manila", full_name="O- Manila")
+    make_donor(blood_type="A+", municipality="Cebu City", full_name="A+ Cebu")
+    make_donor(blood_type="A+", municipality="Manila", full_name="A+ Manila")
+    make_donor(blood_type="B+", municipality="Manila", full_name="B+ Manila")
+    make_donor(blood_type="A+", municipality="Manila", availability="recently_donated")
+    inactive = make_donor(blood_type="A-", municipality="Manila")
+    db.execute(update(User).where(User.id == inactive.user_id).values(status=UserStatus.INACTIVE))
+    # Donated before, deferral over: ahead of donors with no donation on record, latest first
+    for name, days_ago in (("A+ Manila donated long ago", 400), ("A+ Manila donated lately", 100)):
+        profile = make_donor(blood_type="A+", municipality="Manila", full_name=name)
+        db.execute(update(DonorProfile).where(DonorProfile.id == profile.id).values(
+            last_donation_date=date.today() - timedelta(days=days_ago),
+            next_eligible_date=date.today() - timedelta(days=days_ago - 90),
+        ))
+    db.commit()
+
+    blood_request = client.post("/api/v1/donations/requests", headers=headers, json={
+        "patient_name": "Patient", "blood_type": "A+", "units_needed": 2, "urgency": "high",
+        "hospital": "Manila General", "contact_number": "09170000000",
+    }).json()
+    url = f"/api/v1/donations/requests/{blood_request['id']}/matches"
+
+    body = client.get(url, params={"municipality": "Manila"}, headers=headers).json()
+    assert body["compatible_blood_types"] == ["A+", "A-", "O+", "O-"]
+    assert [(m["full_name"], m["exact_match"], m["local"]) for m in body["matches"]] == [
+        ("A+ Manila donated lately", True, True), ("A+ Manila donated long ago", True, True),
+        ("A+ Manila", True, True), ("A+ Cebu", True, False), ("O- Manila", False, True), ("O+ Cebu", False, False),
+    ]
+    assert body["matches"][0]["last_donation_date"] == (date.today() - timedelta(days=100)).isoformat()
+    # Without a municipality: exact type first, then latest donation, then newest profile
+    names = [m["full_name"] for m in client.get(url, params={"limit": 4}, headers=headers).json()["matches"]]
+    assert names == ["A+ Manila donated lately", "A+ Manila donated long ago", "A+ Manila", "A+ Cebu"]
+    assert client.get("/api/v1/donations/requests/999/matches", headers=headers).status_code == 404
+
+
+def test_match_branches_scan_the_partial_indexes(db, query_plan):
+    plan = query_plan(match_query("O+", "Manila", 10))
+    # (O+, O-) x (Manila, elsewhere) x (donated, never donated)
+    assert plan.count("USING INDEX ix_donor_profiles_available_local") == 4
+    assert plan.count("USING INDEX ix_donor_profiles_available ") == 4
+    # Each branch reads its rows in order off the index; only its `limit` rows get sorted for the merge
+    steps = plan.split(" | ")
+    for i, step in enumerate(steps):
+        if step.startswith("SEARCH donor_profiles"):
+            assert steps[i + 1].startswith("SEARCH users") and steps[i + 2].startswith("SCAN anon_")
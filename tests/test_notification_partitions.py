@@ -0,0 +1,97 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.models.notification import Notification
+from app.services import notification_service
+from app.services.notification_service import (
+    create_partition_ddl,
+    inbox_query,
+    maintain_partitions,
+    partition_name,
+    partition_plan,
+)
+from app.utils.pagination import cursor_scope, encode_cursor
+
+
+class RecordingSession:
+    """Stands in for a PostgreSQL session: lists `partitions`, records the SQL run."""
+
+    def __init__(self, partitions):
+        self.partitions = partitions
+        self.statements = []
+        self.commits = 0
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+    def scalars(self, statement):
+        assert "pg_inherits" in str(statement)
+        return SimpleNamespace(all=lambda: list(self.partitions))
+
+    def execute(self, statement):
+        self.statements.append(" ".join(str(statement).split()))
+
+    def commit(self):
+        self.statements.append("COMMIT")
+        self.commits += 1
+
+
+def months(first: date, count: int):
+    return [partition_name(notification_service.add_months(first, n)) for n in range(count)]
+
+
+def test_partition_plan_creates_ahead_and_expires_past_retention(monkeypatch):
+    monkeypatch.setattr(notification_service.settings, "notification_retention_months", 12)
+    monkeypatch.setattr(notification_service.settings, "notification_partitions_ahead", 3)
+    existing = months(date(2025, 1, 1), 22) + ["notifications_default"]  # Jan 2025 .. Oct 2026
+
+    to_create, expired = partition_plan(existing, date(2026, 10, 18))
+    assert to_create == [date(2026, 11, 1), date(2026, 12, 1), date(2027, 1, 1)]
+    # October 2025 onwards is kept: every row is at least 12 months old when its month goes
+    assert expired == months(date(2025, 1, 1), 9)
+    assert create_partition_ddl(date(2026, 12, 1)) == (
+        "CREATE TABLE IF NOT EXISTS notifications_y2026m12 PARTITION OF notifications "
+        "FOR VALUES FROM ('2026-12-01 00:00:00+00') TO ('2027-01-01 00:00:00+00')"
+    )
+
+
+def test_maintain_partitions_runs_partition_ddl(monkeypatch):
+    monkeypatch.setattr(notification_service.settings, "notification_retention_months", 2)
+    monkeypatch.setattr(notification_service.settings, "notification_partitions_ahead", 1)
+    monkeypatch.setattr(notification_service.settings, "notification_retention_action", "drop")
+    session = RecordingSession(months(date(2026, 7, 1), 4))  # Jul .. Oct 2026
+
+    changed = maintain_partitions(session, today=date(2026, 10, 3))
+    assert changed == {"created": ["notifications_y2026m11"], "expired": ["notifications_y2026m07"]}
+    assert session.statements == [
+        create_partition_ddl(date(2026, 11, 1)),
+        "COMMIT",
+        "SET LOCAL lock_timeout = '5s'",
+        "LOCK TABLE notifications_y2026m07 IN SHARE MODE",
+        session.statements[4],
+        "ALTER TABLE notifications DETACH PARTITION notifications_y2026m07",
+        "DROP TABLE notifications_y2026m07",
+        "COMMIT",
+    ]
+    # Unread rows leaving with the partition come off the inbox counters in the same transaction
+    assert session.statements[4].startswith("UPDATE notification_inbox AS inbox SET unread_count")
+    assert "FROM notifications_y2026m07 AS p" in session.statements[4]
+
+    monkeypatch.setattr(notification_service.settings, "notification_retention_action", "detach")
+    session = RecordingSession(months(date(2026, 7, 1), 5))
+    maintain_partitions(session, today=date(2026, 10, 3))
+    assert session.statements[-2:] == ["ALTER TABLE notifications DETACH PARTITION notifications_y2026m07", "COMMIT"]
+
+
+def test_maintain_partitions_is_a_no_op_without_postgresql(db):
+    assert maintain_partitions(db) == {"created": [], "expired": []}
+
+
+def test_inbox_pages_bound_created_at_for_partition_pruning():
+    cursor = encode_cursor(datetime(2026, 10, 1, 12, 0), 42, cursor_scope(Notification.created_at))
+    sql = str(inbox_query(7, cursor=cursor).compile(dialect=postgresql.dialect()))
+    # A row comparison alone is not used for pruning; the plain bound is
+    assert "notifications.created_at <= " in sql
+    assert "(notifications.created_at, notifications.id) < " in sql
@@ -0,0 +1,89 @@
+import asyncio
+import json
+from datetime import datetime
+
+import httpx
+
+from app.core.pubsub import notification_bus
+from app.db.session import SessionLocal
+from app.main import app
+from app.models.notification import Alert
+from app.models.user import User, UserRole
+from app.services.alert_service import deliver_alert
+
+
+def parse(frame):
+    lines = dict(line.split(": ", 1) for line in frame.strip().splitlines())
+    return lines["event"], json.loads(lines["data"])
+
+
+async def open_stream(headers):
+    """Run GET /notifications/stream on the ASGI app; returns (frames queue, disconnect, task)."""
+    frames, disconnect, requested = asyncio.Queue(), asyncio.Event(), asyncio.Event()
+
+    async def receive():
+        if requested.is_set():
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+        requested.set()
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            await frames.put(message["body"].decode())
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/api/v1/notifications/stream", "raw_path": b"/api/v1/notifications/stream",
+        "query_string": b"", "root_path": "", "client": ("127.0.0.1", 1), "server": ("test", 80),
+        "headers": [(b"host", b"test")] + [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+    return frames, disconnect, asyncio.create_task(app(scope, receive, send))
+
+
+def test_stream_pushes_new_alerts_and_unread_counts(client, db, make_user, make_donor, auth_headers):
+    admin = make_user(role=UserRole.ADMIN)
+    donor = make_donor()
+    other = make_donor(blood_type="A+")
+    alert = Alert(title="O+ needed", message="Come in", alert_type="urgent_request", priority="high",
+                  target_audience={"blood_type": "O+"}, created_by=admin.id, sent_at=datetime.utcnow())
+    db.add(alert)
+    db.commit()
+    headers = auth_headers(db.get(User, donor.user_id))
+    other_headers = auth_headers(db.get(User, other.user_id))
+
+    async def scenario():
+        frames, disconnect, task = await open_stream(headers)
+        other_frames, other_disconnect, other_task = await open_stream(other_headers)
+        try:
+            assert parse(await asyncio.wait_for(frames.get(), 5)) == ("unread_count", {"unread_count": 0})
+            await asyncio.wait_for(other_frames.get(), 5)
+            assert notification_bus.hub.connections == 2
+
+            # Celery delivers from another thread
+            session = SessionLocal()
+            try:
+                await asyncio.to_thread(deliver_alert, session, alert.id)
+            finally:
+                session.close()
+            event, data = parse(await asyncio.wait_for(frames.get(), 5))
+            assert (event, data["alert_id"], data["title"]) == ("notification", alert.id, "O+ needed")
+            assert parse(await asyncio.wait_for(frames.get(), 5)) == ("unread_count", {"unread_count": 1})
+            assert other_frames.empty()
+
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                response = await http.patch("/api/v1/notifications/read-all", headers=headers)
+                assert response.status_code == 200
+            assert parse(await asyncio.wait_for(frames.get(), 5)) == ("unread_count", {"unread_count": 0})
+        finally:
+            disconnect.set()
+            other_disconnect.set()
+            await asyncio.wait_for(asyncio.gather(task, other_task), 5)
+        assert notification_bus.hub.connections == 0
+
+    client.portal.call(scenario)
+
+
+def test_stream_requires_authentication(client):
+    assert client.get("/api/v1/notifications/stream").status_code in (401, 403)
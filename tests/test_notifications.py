@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, literal, select
+
+from app.models.notification import Notification
+from app.services.notification_service import add_unread, inbox_query, unread_count_query
+from app.utils.pagination import cursor_scope, encode_cursor
+
+
+def add_notifications(db, user, count, is_read=False, created_at=None):
+    # Same statement shape as alert fan-out: created_at comes from the server default
+    db.execute(insert(Notification), [
+        {"user_id": user.id, "title": f"n{i}", "message": "m", "notification_type": "system", "is_read": is_read,
+         **({"created_at": created_at} if created_at else {})}
+        for i in range(count)
+    ])
+    if not is_read:
+        db.execute(add_unread("sqlite", select(literal(user.id), literal(count))))
+    db.commit()
+
+
+def test_inbox_pages_through_every_notification_once(client, db, make_user, auth_headers):
+    user, other = make_user(), make_user()
+    headers = auth_headers(user)
+    add_notifications(db, user, 7)
+    add_notifications(db, user, 3, is_read=True)
+    add_notifications(db, other, 4)
+
+    seen, cursor = [], None
+    for _ in range(5):
+        params = {"limit": 4, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/v1/notifications", params=params, headers=headers).json()
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert cursor is None
+    assert len(seen) == len(set(seen)) == 10
+    assert seen == sorted(seen, reverse=True)  # ties on created_at fall back to id
+
+    unread = client.get("/api/v1/notifications", params={"is_read": False, "limit": 100}, headers=headers).json()
+    assert len(unread["items"]) == 7 and unread["next_cursor"] is None
+    assert client.get("/api/v1/notifications/unread-count", headers=headers).json() == {"unread_count": 7}
+    assert client.get("/api/v1/notifications", params={"cursor": "garbage!"}, headers=headers).status_code == 400
+
+
+def test_inbox_queries_use_index_range_scans(db, make_user, query_plan):
+    user = make_user()
+    add_notifications(db, user, 3)
+    first_page = db.scalars(inbox_query(user.id, limit=2)).all()
+    cursor = encode_cursor(first_page[-1].created_at, first_page[-1].id, cursor_scope(Notification.created_at))
+
+    plans = {
+        "inbox": query_plan(inbox_query(user.id)),
+        "inbox next page": query_plan(inbox_query(user.id, cursor=cursor)),
+        "unread inbox": query_plan(inbox_query(user.id, is_read=False, cursor=cursor)),
+        "unread inbox after read-all": query_plan(
+            inbox_query(user.id, is_read=False, cursor=cursor, last_read_at=datetime(2026, 1, 1))
+        ),
+        "unread count": query_plan(unread_count_query(user.id)),
+    }
+    read_after_read_all = query_plan(inbox_query(user.id, is_read=True, cursor=cursor, last_read_at=datetime(2026, 1, 1)))
+    assert "SEARCH notifications USING INDEX ix_notifications_user_created" in plans["inbox"]
+    assert "SEARCH notifications USING INDEX ix_notifications_user_created" in plans["inbox next page"]
+    assert "SEARCH notifications USING INDEX ix_notifications_user_read_created" in plans["unread inbox"]
+    # Bounded on created_at from both sides; without statistics SQLite costs both indexes the same
+    assert "SEARCH notifications USING INDEX ix_notifications_user_" in plans["unread inbox after read-all"]
+    assert "created_at>? AND created_at<?" in plans["unread inbox after read-all"]
+    assert "SEARCH notification_inbox USING INTEGER PRIMARY KEY" in plans["unread count"]
+    for name, plan in plans.items():
+        # No full table scan and no sort step: rows come off the index in page order
+        assert "SCAN notifications" not in plan, (name, plan)
+        assert "TEMP B-TREE" not in plan, (name, plan)
+    # Flagged read, or unflagged under the watermark: one index range per branch, merged by a
+    # sort of at most 2 * (limit + 1) rows
+    assert read_after_read_all.count("SEARCH notifications USING INDEX ix_notifications_user_read_created") == 2
+    assert "SCAN notifications" not in read_after_read_all
+
+
+def test_read_all_moves_watermark_and_counter_follows(client, db, make_user, auth_headers):
+    user = make_user()
+    headers = auth_headers(user)
+    add_notifications(db, user, 5)
+
+    def unread_count():
+        return client.get("/api/v1/notifications/unread-count", headers=headers).json()["unread_count"]
+
+    first = client.get("/api/v1/notifications", headers=headers).json()["items"][0]
+    assert client.patch(f"/api/v1/notifications/{first['id']}/read", headers=headers).json()["is_read"] is True
+    assert unread_count() == 4
+    # Marking it again is not a second decrement
+    client.patch(f"/api/v1/notifications/{first['id']}/read", headers=headers)
+    assert unread_count() == 4
+
+    assert client.patch("/api/v1/notifications/read-all", headers=headers).status_code == 200
+    assert unread_count() == 0
+    # Only the individually read row carries a flag; the watermark covers the rest
+    assert db.scalar(select(Notification.id).where(Notification.is_read == True)) == first["id"]
+    items = client.get("/api/v1/notifications", headers=headers).json()["items"]
+    assert [item["is_read"] for item in items] == [True] * 5
+
+    add_notifications(db, user, 2, created_at=datetime.utcnow() + timedelta(minutes=1))
+    assert unread_count() == 2
+    unread = client.get("/api/v1/notifications", params={"is_read": False}, headers=headers).json()["items"]
+    read = client.get("/api/v1/notifications", params={"is_read": True}, headers=headers).json()["items"]
+    assert (len(unread), len(read)) == (2, 5)
+    paged, cursor = [], None
+    for _ in range(5):
+        params = {"is_read": True, "limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/v1/notifications", params=params, headers=headers).json()
+        paged += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert paged == [item["id"] for item in read]
+    assert all(item["is_read"] is False for item in unread)
+
+    # Deleting a watermark-read notification leaves the counter alone; an unread one decrements it
+    assert client.delete(f"/api/v1/notifications/{read[0]['id']}", headers=headers).status_code == 200
+    assert unread_count() == 2
+    assert client.delete(f"/api/v1/notifications/{unread[0]['id']}", headers=headers).status_code == 200
+    assert unread_count() == 1
@@ -0,0 +1,53 @@
+from app.core.report_cache import DONORS, report_cache
+from app.models.user import UserRole
+
+
+def test_reports_are_cached_until_a_write_invalidates_them(client, db, make_user, make_donor, auth_headers):
+    headers = auth_headers(make_user(role=UserRole.ADMIN))
+    donor = make_donor(blood_type="A+", municipality="Cebu City")
+    hits = report_cache.backend.entries.hits
+
+    first = client.get("/api/v1/reports/blood-type-distribution", headers=headers)
+    assert first.headers["Cache-Control"] == f"private, max-age={report_cache.ttl}"
+    assert first.headers["Age"] == "0"
+    assert first.json() == {"distribution": [{"blood_type": "A+", "count": 1}]}
+
+    # Unset and empty params share an entry; a direct write is not seen until invalidated
+    make_donor(blood_type="O+")
+    second = client.get("/api/v1/reports/blood-type-distribution", params={"municipality": ""}, headers=headers)
+    assert second.json() == first.json()
+    assert "Age" in second.headers
+    assert report_cache.backend.entries.hits == hits + 1
+
+    client.patch(f"/api/v1/donors/{donor.id}/availability", json={"availability": "unavailable"}, headers=headers)
+    third = client.get("/api/v1/reports/blood-type-distribution", headers=headers)
+    assert third.headers["Age"] == "0"
+    assert len(third.json()["distribution"]) == 2
+
+
+def test_donor_delete_invalidates_donor_entries(client, make_user, make_donor, auth_headers):
+    headers = auth_headers(make_user(role=UserRole.ADMIN))
+    donor = make_donor()
+    version = report_cache.backend._versions.get(DONORS, 0)
+    assert client.delete(f"/api/v1/donors/{donor.id}", headers=headers).status_code == 200
+    # Counters moved, so every cached donor report and count is dropped
+    assert report_cache.backend._versions[DONORS] == version + 1
+
+
+def test_donation_invalidates_monthly_report(client, make_user, make_donor, auth_headers):
+    headers = auth_headers(make_user(role=UserRole.ADMIN))
+    donor = make_donor()
+    params = {"start_date": "2026-01-01"}
+    assert client.get("/api/v1/reports/monthly-donations", params=params, headers=headers).json() == {"monthly_data": []}
+
+    hits = report_cache.backend.entries.hits
+    assert client.get("/api/v1/reports/monthly-donations", params=params, headers=headers).json() == {"monthly_data": []}
+    assert report_cache.backend.entries.hits == hits + 1
+
+    client.post(
+        "/api/v1/donations/donations",
+        json={"donor_profile_id": donor.id, "donation_date": "2026-03-15", "blood_type": "O+", "location": "Manila"},
+        headers=headers,
+    )
+    data = client.get("/api/v1/reports/monthly-donations", params=params, headers=headers).json()["monthly_data"]
+    assert data == [{"year": 2026, "month": 3, "donation_count": 1, "total_units": 1}]
@@ -0,0 +1,58 @@
+from datetime import date
+
+from app.models.donation import Donation
+from app.models.report import ReportCounter
+from app.models.user import UserRole
+from app.services.report_service import reconcile_counters
+
+
+def summary(client, headers):
+    return client.get("/api/v1/reports/summary", headers=headers).json()
+
+
+def test_counters_follow_writes(client, db, make_user, make_donor, auth_headers):
+    headers = auth_headers(make_user(role=UserRole.ADMIN))
+    donor = make_donor()
+    make_donor(availability="unavailable")
+    assert reconcile_counters(db) == {}
+    assert db.get(ReportCounter, "total_donors").value == 2
+
+    registration_id = client.post(
+        "/api/v1/donor-registrations",
+        json={"full_name": "Ana Reyes", "contact_number": "09179999999", "age": 30,
+              "blood_type": "A+", "municipality": "Cebu City"},
+    ).json()["id"]
+    client.patch(f"/api/v1/donor-registrations/{registration_id}", json={"status": "approved"}, headers=headers)
+    assert summary(client, headers) == {"total_donors": 3, "available_donors": 2, "total_donations": 0}
+
+    client.post(
+        "/api/v1/donations/donations",
+        json={"donor_profile_id": donor.id, "donation_date": "2026-10-01", "blood_type": "O+",
+              "units": 1, "location": "Manila"},
+        headers=headers,
+    )
+    assert summary(client, headers) == {"total_donors": 3, "available_donors": 1, "total_donations": 1}
+
+    client.patch(f"/api/v1/donors/{donor.id}/availability", json={"availability": "available"}, headers=headers)
+    assert summary(client, headers)["available_donors"] == 2
+
+    client.delete(f"/api/v1/donors/{donor.id}", headers=headers)
+    client.delete(f"/api/v1/donors/{donor.id}", headers=headers)
+    assert summary(client, headers) == {"total_donors": 2, "available_donors": 1, "total_donations": 1}
+
+    db.expire_all()
+    assert reconcile_counters(db) == {}
+
+
+def test_reconcile_fixes_drift(client, db, make_user, make_donor, auth_headers):
+    headers = auth_headers(make_user(role=UserRole.ADMIN))
+    donor = make_donor()
+    reconcile_counters(db)
+
+    # Written behind the API's back
+    db.add(Donation(donor_profile_id=donor.id, donation_date=date(2026, 10, 1), blood_type="O+", location="Manila"))
+    db.commit()
+    assert summary(client, headers)["total_donations"] == 0
+
+    assert reconcile_counters(db) == {"total_donations": 1}
+    assert summary(client, headers)["total_donations"] == 1
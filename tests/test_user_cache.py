@@ -0,0 +1,45 @@
+from app.core.dependencies import user_cache
+from app.models.user import User, UserRole
+
+
+def test_authenticated_requests_hit_the_user_cache(client, make_user, auth_headers):
+    user = make_user()
+    headers = auth_headers(user)
+    hits, misses = user_cache.hits, user_cache.misses
+
+    for _ in range(3):
+        assert client.get("/api/v1/notifications/unread-count", headers=headers).status_code == 200
+
+    assert user_cache.misses - misses == 1
+    assert user_cache.hits - hits == 2
+
+
+def test_profile_update_refreshes_cached_user(client, make_user, auth_headers):
+    user = make_user()
+    headers = auth_headers(user)
+    client.get("/api/v1/users/me", headers=headers)
+
+    response = client.put("/api/v1/users/me", json={"full_name": "Maria Santos"}, headers=headers)
+    assert response.json()["full_name"] == "Maria Santos"
+    assert user_cache.get(user.id) is None
+
+
+def test_deleted_donor_is_locked_out_immediately(client, db, make_user, make_donor, auth_headers):
+    admin = make_user(role=UserRole.ADMIN)
+    profile = make_donor()
+    donor_headers = auth_headers(db.get(User, profile.user_id))
+    assert client.get("/api/v1/notifications/unread-count", headers=donor_headers).status_code == 200
+
+    response = client.delete(f"/api/v1/donors/{profile.id}", headers=auth_headers(admin))
+    assert response.status_code == 200
+    assert client.get("/api/v1/notifications/unread-count", headers=donor_headers).status_code == 403
+
+
+def test_logout_invalidates_cached_user(client, make_user, auth_headers):
+    user = make_user()
+    headers = auth_headers(user)
+    client.get("/api/v1/users/me", headers=headers)
+    assert user_cache.get(user.id) is not None
+
+    assert client.post("/api/v1/auth/logout", headers=headers).status_code == 200
+    assert user_cache.get(user.id) is None